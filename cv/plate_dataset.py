@@ -0,0 +1,208 @@
+"""
+Plaka Veri Seti - Hazırlık (Bölme + Görüntü Önbelleği)
+`data.yaml` içindeki sabit Windows yolu ve aynı klasörü gösteren train/val
+yerine veri seti klasörünü bu dosyanın konumuna göre (veya PLATE_DATASET ortam
+değişkeninden) çözer, dosya adına göre deterministik bir train/val bölmesi
+üretir ve görüntüleri bir kez çözüp `imgsz` boyutuna küçülterek bellek
+eşlemeli (memmap) uint8 bir önbelleğe yazar. Eğitim her epoch'ta JPEG çözmek
+yerine bu önbellekten okur (bkz. plate_train.py).
+
+Kullanım:
+    from plate_dataset import prepare_dataset
+    data_yaml, cache = prepare_dataset()   # train.txt, val.txt, data_split.yaml + önbellek
+"""
+
+import hashlib
+import json
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+# Varsayılan veri seti klasörü: cv/dataset (images/ ve labels/ içerir)
+DATASET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dataset")
+
+IMG_SIZE = 640
+VAL_FRACTION = 0.2
+
+# Bölmeyi belirleyen sabit tohum; değiştirilirse bölme de değişir
+SPLIT_SEED = "plaka"
+
+CLASS_NAMES = {0: "plaka"}
+
+CACHE_DIRNAME = ".image_cache"
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+def resolve_dataset_dir(dataset_dir=None):
+    """Veri seti klasörünü çöz: parametre > PLATE_DATASET ortam değişkeni > cv/dataset"""
+    path = dataset_dir or os.environ.get("PLATE_DATASET") or DATASET_DIR
+    path = os.path.abspath(os.path.expanduser(path))
+    if not os.path.isdir(os.path.join(path, "images")):
+        raise FileNotFoundError(f"{path} altında 'images' klasörü bulunamadı")
+    return path
+
+def list_images(images_dir):
+    """Klasördeki görüntü dosyalarının mutlak yollarını sıralı listele"""
+    return sorted(
+        os.path.join(images_dir, name) for name in os.listdir(images_dir)
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+
+def is_val(path, val_fraction=VAL_FRACTION, seed=SPLIT_SEED):
+    """Dosya adının özetine göre görüntünün doğrulama kümesinde olup olmadığı
+
+    Karar yalnızca dosya adına bağlıdır: yeni görüntüler eklendiğinde mevcut
+    görüntüler küme değiştirmez ve sonuç her makinede aynıdır.
+    """
+    digest = hashlib.sha1(f"{seed}:{os.path.basename(path)}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") / 2 ** 64 < val_fraction
+
+def split_images(paths, val_fraction=VAL_FRACTION, seed=SPLIT_SEED):
+    """Görüntü yollarını (train, val) listelerine ayır"""
+    train, val = [], []
+    for path in paths:
+        (val if is_val(path, val_fraction, seed) else train).append(path)
+    return train, val
+
+def write_split(dataset_dir=None, val_fraction=VAL_FRACTION, seed=SPLIT_SEED):
+    """train.txt, val.txt ve mutlak yollu data_split.yaml dosyalarını yaz; yaml yolunu döndür"""
+    dataset_dir = resolve_dataset_dir(dataset_dir)
+    train, val = split_images(list_images(os.path.join(dataset_dir, "images")), val_fraction, seed)
+
+    for name, paths in (("train.txt", train), ("val.txt", val)):
+        with open(os.path.join(dataset_dir, name), "w", encoding="utf-8") as f:
+            f.write("\n".join(paths) + "\n")
+
+    yaml_path = os.path.join(dataset_dir, "data_split.yaml")
+    with open(yaml_path, "w", encoding="utf-8") as f:
+        # JSON dizgileri geçerli YAML'dır; Windows yollarındaki \ karakterleri de kaçışlanır
+        f.write(f"path: {json.dumps(dataset_dir)}\n")
+        f.write("train: train.txt\n")
+        f.write("val: val.txt\n\n")
+        f.write(f"nc: {len(CLASS_NAMES)}\n")
+        f.write("names:\n")
+        for idx, name in CLASS_NAMES.items():
+            f.write(f"  {idx}: {name}\n")
+
+    print(f"Bölme: {len(train)} train, {len(val)} val -> {yaml_path}")
+    return yaml_path
+
+def _resized(path, imgsz):
+    """Görüntüyü çöz ve uzun kenarı imgsz olacak şekilde küçült (Ultralytics load_image ile aynı)"""
+    img = cv2.imread(path)
+    if img is None:
+        raise FileNotFoundError(f"{path} okunamadı")
+    h0, w0 = img.shape[:2]
+    r = imgsz / max(h0, w0)
+    if r != 1:
+        w, h = min(math.ceil(w0 * r), imgsz), min(math.ceil(h0 * r), imgsz)
+        interpolation = cv2.INTER_LINEAR if r > 1 else cv2.INTER_AREA
+        img = cv2.resize(img, (w, h), interpolation=interpolation)
+    return img, h0, w0
+
+def _file_state(path):
+    """Önbelleğin geçerliliği için dosya boyutu ve değişiklik zamanı"""
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+class ImageCache:
+    """Küçültülmüş görüntüleri (N, S, S, 3) uint8 memmap dosyasında tutan önbellek
+
+    Her görüntü kendi satırının sol üst köşesine yazılır; orijinal ve küçültülmüş
+    boyutlar ayrı bir dizide tutulur. Memmap her süreçte ilk erişimde açılır,
+    böylece DataLoader işçilerine dizi kopyalanmadan yalnızca yol aktarılır.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self._images = None
+        self._shapes = None
+        self._slots = None
+
+    @property
+    def index_path(self):
+        return os.path.join(self.cache_dir, "index.json")
+
+    def is_valid(self, paths, imgsz):
+        """Önbellek bu görüntü listesi ve boyut için güncel mi?"""
+        if not os.path.exists(self.index_path):
+            return False
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        return index["imgsz"] == imgsz and index["files"] == [[p] + _file_state(p) for p in paths]
+
+    def build(self, paths, imgsz=IMG_SIZE, workers=None):
+        """Görüntüleri paralel çözüp önbelleğe yaz (güncelse hiçbir şey yapma)"""
+        paths = [os.path.abspath(p) for p in paths]
+        if self.is_valid(paths, imgsz):
+            return self
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        images_path = os.path.join(self.cache_dir, "images.npy")
+        tmp_path = images_path + ".tmp.npy"
+        images = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.uint8,
+                                           shape=(len(paths), imgsz, imgsz, 3))
+        shapes = np.zeros((len(paths), 4), dtype=np.int32)
+
+        def fill(slot):
+            img, h0, w0 = _resized(paths[slot], imgsz)
+            h, w = img.shape[:2]
+            images[slot, :h, :w] = img
+            shapes[slot] = (h0, w0, h, w)
+
+        # cv2.imread / resize GIL'i bıraktığı için iş parçacıkları yeterlidir
+        with ThreadPoolExecutor(max_workers=workers or min(8, os.cpu_count() or 1)) as pool:
+            list(pool.map(fill, range(len(paths))))
+
+        images.flush()
+        del images
+        os.replace(tmp_path, images_path)
+        np.save(os.path.join(self.cache_dir, "shapes.npy"), shapes)
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            json.dump({"imgsz": imgsz, "files": [[p] + _file_state(p) for p in paths]}, f)
+
+        self._images = self._shapes = self._slots = None
+        print(f"Önbellek: {len(paths)} görüntü -> {images_path}")
+        return self
+
+    def _open(self):
+        """Memmap ve yardımcı dizileri (bu süreçte ilk kez) aç"""
+        if self._images is None:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                files = json.load(f)["files"]
+            self._slots = {os.path.normcase(p): i for i, (p, _, _) in enumerate(files)}
+            self._shapes = np.load(os.path.join(self.cache_dir, "shapes.npy"))
+            self._images = np.load(os.path.join(self.cache_dir, "images.npy"), mmap_mode="r")
+
+    @property
+    def imgsz(self):
+        """Önbellekteki görüntülerin uzun kenar boyutu"""
+        self._open()
+        return self._images.shape[1]
+
+    def slot(self, path):
+        """Görüntünün önbellekteki satırı (yoksa -1)"""
+        self._open()
+        return self._slots.get(os.path.normcase(os.path.abspath(path)), -1)
+
+    def get(self, slot):
+        """Önbellekteki görüntüyü (kopya), orijinal (h, w) ve küçültülmüş (h, w) ile döndür"""
+        self._open()
+        h0, w0, h, w = (int(v) for v in self._shapes[slot])
+        # Augmentasyonlar görüntüyü yerinde değiştirebildiği için kopya döner
+        return np.array(self._images[slot, :h, :w]), (h0, w0), (h, w)
+
+    def __getstate__(self):
+        # Süreçler arasında yalnızca klasör yolu taşınır
+        return {"cache_dir": self.cache_dir, "_images": None, "_shapes": None, "_slots": None}
+
+def prepare_dataset(dataset_dir=None, val_fraction=VAL_FRACTION, imgsz=IMG_SIZE, workers=None):
+    """Bölmeyi yaz ve görüntü önbelleğini hazırla; (data yaml yolu, ImageCache) döndür"""
+    dataset_dir = resolve_dataset_dir(dataset_dir)
+    yaml_path = write_split(dataset_dir, val_fraction)
+    paths = list_images(os.path.join(dataset_dir, "images"))
+    cache = ImageCache(os.path.join(dataset_dir, CACHE_DIRNAME)).build(paths, imgsz, workers)
+    return yaml_path, cache
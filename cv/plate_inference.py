@@ -0,0 +1,250 @@
+"""
+Plaka Tespiti - Toplu (Batch) CPU Çıkarım Hattı
+Notebook'taki `model2.predict(source=cv2.imread(...), conf=0.5)` tek görüntü
+döngüsü yerine görüntüleri iş parçacığı havuzunda çözer, `imgsz=640` kare
+letterbox ile önceden ayrılmış tek bir batch dizisine yerleştirir ve tek bir
+predict çağrısıyla tespit eder. Kutular orijinal görüntü koordinatlarında
+NumPy dizileri olarak döner. İstenirse model ONNX'e aktarılıp ONNX Runtime ile
+çalıştırılır (daha düşük gecikme).
+
+Kullanım (notebook içinden):
+    from plate_inference import PlateDetector
+    detector = PlateDetector("runs/detect/train/weights/best.pt", conf=0.5)
+    for path, boxes, scores in detector.detect_directory("dataset/images"):
+        ...
+
+Komut satırından:
+    python plate_inference.py dataset/images --batch-size 16 --onnx
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+# Notebook'ta eğitilen modelin yolu ve ayarları
+WEIGHTS_PATH = "runs/detect/train/weights/best.pt"
+IMG_SIZE = 640
+CONF_THRESHOLD = 0.5
+IOU_THRESHOLD = 0.7
+MAX_DETECTIONS = 300
+
+# Bir predict çağrısına giren görüntü sayısı
+BATCH_SIZE = 16
+
+# Ultralytics letterbox dolgu rengi
+PAD_VALUE = 114
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+def list_images(directory):
+    """Klasördeki görüntü dosyalarını sıralı olarak listele"""
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+
+def letterbox_into(img, out, pad_value=PAD_VALUE):
+    """Görüntüyü en-boy oranını koruyarak (S, S, 3) `out` dizisine ortalanmış yerleştir
+
+    Geri dönüşte kutuları orijinal koordinatlara çevirmek için (oran, sol, üst) döner.
+    """
+    size = out.shape[0]
+    h, w = img.shape[:2]
+    ratio = min(size / h, size / w)
+    new_w, new_h = int(round(w * ratio)), int(round(h * ratio))
+    left, top = (size - new_w) // 2, (size - new_h) // 2
+
+    out[...] = pad_value
+    if (new_w, new_h) != (w, h):
+        img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    out[top:top + new_h, left:left + new_w] = img
+    return ratio, left, top
+
+def scale_boxes(boxes, ratio, left, top, shape):
+    """Letterbox koordinatlarındaki xyxy kutuları orijinal görüntüye çevir ve kırp"""
+    boxes = (boxes - np.array([left, top, left, top], dtype=np.float32)) / ratio
+    h, w = shape[:2]
+    # Gelişmiş indeksleme kopya döndürdüğünden kırpılan değerler geri atanır
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, w)
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, h)
+    return boxes.astype(np.float32)
+
+def draw_boxes(img, boxes, color=(255, 0, 0), thickness=15):
+    """Kutuları görüntünün bir kopyası üzerine çiz (notebook'taki çizimle aynı)"""
+    img = img.copy()
+    for x1, y1, x2, y2 in boxes.astype(np.int32):
+        cv2.rectangle(img, (x1, y1), (x2, y2), color=color, thickness=thickness)
+    return img
+
+def _nms_output(pred, conf, iou, max_det):
+    """ONNX çıktısını (4 + nc, A) tek görüntü için eşikleyip NMS uygula; xyxy ve skor döndür"""
+    pred = pred.T
+    scores = pred[:, 4:].max(axis=1)
+    keep = scores > conf
+    pred, scores = pred[keep], scores[keep]
+    if len(pred) == 0:
+        return np.zeros((0, 4), np.float32), np.zeros(0, np.float32)
+
+    cx, cy, w, h = pred[:, 0], pred[:, 1], pred[:, 2], pred[:, 3]
+    xywh = np.stack([cx - w / 2, cy - h / 2, w, h], axis=1)
+    idx = np.asarray(cv2.dnn.NMSBoxes(xywh.tolist(), scores.tolist(), conf, iou), dtype=np.int64).ravel()
+    idx = idx[:max_det]
+
+    boxes = xywh[idx].copy()
+    boxes[:, 2:] += boxes[:, :2]
+    return boxes.astype(np.float32), scores[idx].astype(np.float32)
+
+class PlateDetector:
+    """YOLO plaka modelini görüntü batch'leri üzerinde CPU'da çalıştıran dedektör
+
+    backend="torch" Ultralytics modelini doğrudan kullanır; backend="onnx" modeli
+    (yoksa) ONNX'e aktarır ve ONNX Runtime CPU oturumuyla çalıştırır.
+    """
+
+    def __init__(self, weights=WEIGHTS_PATH, imgsz=IMG_SIZE, conf=CONF_THRESHOLD,
+                 iou=IOU_THRESHOLD, batch_size=BATCH_SIZE, workers=None,
+                 backend="torch", threads=None, max_det=MAX_DETECTIONS):
+        if backend not in ("torch", "onnx"):
+            raise ValueError("backend 'torch' veya 'onnx' olmalıdır")
+
+        self.imgsz = imgsz
+        self.conf = conf
+        self.iou = iou
+        self.batch_size = batch_size
+        self.max_det = max_det
+        self.backend = backend
+        self.workers = workers or min(8, os.cpu_count() or 1)
+
+        if backend == "torch":
+            import torch
+            from ultralytics import YOLO
+
+            if threads:
+                torch.set_num_threads(threads)
+            self.model = YOLO(weights)
+        else:
+            self.session = self._onnx_session(weights, threads)
+
+        # Batch dizisi bir kez ayrılır ve her batch'te yeniden kullanılır
+        self._batch = np.empty((batch_size, imgsz, imgsz, 3), dtype=np.uint8)
+
+    def _onnx_session(self, weights, threads):
+        """ONNX modelini (gerekirse dışa aktararak) CPU oturumu olarak aç"""
+        import onnxruntime as ort
+
+        onnx_path = weights if weights.endswith(".onnx") else os.path.splitext(weights)[0] + ".onnx"
+        if not os.path.exists(onnx_path):
+            from ultralytics import YOLO
+            onnx_path = YOLO(weights).export(format="onnx", imgsz=self.imgsz, dynamic=True)
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self._onnx_input = session.get_inputs()[0].name
+        return session
+
+    def _to_input(self, n):
+        """İlk n letterbox görüntüsünü BGR HWC uint8'den RGB NCHW float32 [0, 1]'e çevir"""
+        return np.ascontiguousarray(self._batch[:n, :, :, ::-1].transpose(0, 3, 1, 2), dtype=np.float32) / 255.0
+
+    def _predict(self, n):
+        """Batch'teki ilk n görüntü için letterbox koordinatlarında (kutular, skorlar) listesi"""
+        x = self._to_input(n)
+        if self.backend == "onnx":
+            out = self.session.run(None, {self._onnx_input: x})[0]
+            return [_nms_output(pred, self.conf, self.iou, self.max_det) for pred in out]
+
+        import torch
+
+        results = self.model.predict(
+            source=torch.from_numpy(x), imgsz=self.imgsz, conf=self.conf, iou=self.iou,
+            max_det=self.max_det, device="cpu", verbose=False
+        )
+        return [
+            (r.boxes.xyxy.numpy().astype(np.float32), r.boxes.conf.numpy().astype(np.float32))
+            for r in results
+        ]
+
+    def detect_images(self, images):
+        """Bellekteki BGR görüntüler için (kutular, skorlar) listesi döndür"""
+        detections = []
+        for start in range(0, len(images), self.batch_size):
+            chunk = images[start:start + self.batch_size]
+            detections.extend(self._detect_chunk(chunk))
+        return detections
+
+    def _detect_chunk(self, images):
+        """En fazla batch_size görüntüyü letterbox'layıp tek çağrıda tespit et"""
+        transforms = [letterbox_into(img, self._batch[i]) for i, img in enumerate(images)]
+        detections = []
+        for img, (ratio, left, top), (boxes, scores) in zip(images, transforms, self._predict(len(images))):
+            detections.append((scale_boxes(boxes, ratio, left, top, img.shape), scores))
+        return detections
+
+    def detect_paths(self, paths):
+        """Dosya yollarındaki görüntüleri tespit et; (yol, kutular, skorlar) üretir
+
+        Bir sonraki batch'in görüntüleri, mevcut batch tahmin edilirken arka
+        planda çözülür (cv2.imread GIL'i bırakır).
+        """
+        paths = list(paths)
+        batches = [paths[i:i + self.batch_size] for i in range(0, len(paths), self.batch_size)]
+        if not batches:
+            return
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = pool.map(cv2.imread, batches[0])
+            for i, batch_paths in enumerate(batches):
+                images = list(pending)
+                if i + 1 < len(batches):
+                    pending = pool.map(cv2.imread, batches[i + 1])
+
+                readable = [(p, img) for p, img in zip(batch_paths, images) if img is not None]
+                for p, img in zip(batch_paths, images):
+                    if img is None:
+                        print(f"Uyarı: {p} okunamadı, atlanıyor")
+                if not readable:
+                    continue
+
+                detections = self._detect_chunk([img for _, img in readable])
+                for (p, _), (boxes, scores) in zip(readable, detections):
+                    yield p, boxes, scores
+
+    def detect_directory(self, directory):
+        """Klasördeki tüm görüntüleri tespit et"""
+        return self.detect_paths(list_images(directory))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Plaka tespiti - toplu CPU çıkarımı")
+    parser.add_argument("directory", nargs="?", default="dataset/images")
+    parser.add_argument("--weights", default=WEIGHTS_PATH)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--conf", type=float, default=CONF_THRESHOLD)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--onnx", action="store_true", help="ONNX Runtime ile çalıştır")
+    parser.add_argument("--output", default=None, help="Kutuları .npz olarak kaydet")
+    args = parser.parse_args()
+
+    detector = PlateDetector(args.weights, conf=args.conf, batch_size=args.batch_size,
+                             backend="onnx" if args.onnx else "torch", threads=args.threads)
+
+    start = time.perf_counter()
+    results = list(detector.detect_directory(args.directory))
+    elapsed = time.perf_counter() - start
+
+    n_boxes = sum(len(boxes) for _, boxes, _ in results)
+    print(f"{len(results)} görüntü, {n_boxes} plaka, {elapsed:.2f} sn "
+          f"({len(results) / max(elapsed, 1e-9):.1f} görüntü/sn)")
+
+    if args.output:
+        np.savez_compressed(
+            args.output,
+            paths=np.array([p for p, _, _ in results]),
+            boxes=np.array([boxes for _, boxes, _ in results], dtype=object),
+            scores=np.array([scores for _, _, scores in results], dtype=object),
+        )
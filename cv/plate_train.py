@@ -0,0 +1,96 @@
+"""
+Plaka Modeli - Önbellekli Eğitim
+Notebook'taki `model.train(data="data.yaml", epochs=1, imgsz=640, batch=8)`
+çağrısının karşılığıdır; ancak veri seti `plate_dataset.prepare_dataset` ile
+taşınabilir yollarla train/val olarak bölünür ve görüntüler her epoch'ta JPEG'ten
+çözülmek yerine memmap önbellekten çok işçili (multi-worker) DataLoader ile okunur.
+İlk hazırlıktan sonra epoch'lar disk üzerinde görüntü çözme işi yapmaz.
+
+Kullanım:
+    python plate_train.py --epochs 1 --batch 8 --workers 4
+"""
+
+import argparse
+import os
+
+from ultralytics.data.dataset import YOLODataset
+from ultralytics.models.yolo.detect import DetectionTrainer
+
+from plate_dataset import IMG_SIZE, VAL_FRACTION, prepare_dataset
+
+class CachedYOLODataset(YOLODataset):
+    """Görüntüleri ImageCache'ten okuyan YOLODataset
+
+    Önbellekte olmayan görüntüler ya da farklı boyut istekleri için Ultralytics'in
+    kendi okuma yoluna düşülür. Sınıf modül seviyesinde tanımlıdır; böylece spawn
+    kullanan DataLoader işçilerine (Windows) pickle ile aktarılabilir.
+    """
+
+    def attach_cache(self, cache):
+        """Önbelleği bağla ve veri setindeki her görüntünün önbellek satırını hesapla"""
+        imgsz = max(self.imgsz) if isinstance(self.imgsz, (tuple, list)) else self.imgsz
+        self.image_cache = cache
+        self.cache_slots = [cache.slot(f) for f in self.im_files]
+        self.cache_enabled = cache.imgsz == imgsz
+        return self
+
+    def load_image(self, i, rect_mode=True, *args, **kwargs):
+        slot = self.cache_slots[i] if self.cache_enabled else -1
+        if slot < 0 or not rect_mode or args or kwargs.get("resize_short") or self.ims[i] is not None:
+            return super().load_image(i, rect_mode, *args, **kwargs)
+        im, hw0, hw = self.image_cache.get(slot)
+        if self.augment and self.cache != "ram":
+            self._buffer_image(i, im, hw0, hw)
+        return im, hw0, hw
+
+    def _buffer_image(self, i, im, hw0, hw):
+        """Görüntüyü mozaik tamponuna ekle (BaseDataset.load_image ile aynı kayıt)
+
+        Mosaic augmentasyonu diğer görüntüleri yalnızca bu tampondan seçer; tampon
+        boş kalırsa ilk augmentasyonlu batch'te IndexError oluşur.
+        """
+        self.ims[i], self.im_hw0[i], self.im_hw[i] = im, hw0, hw
+        self.buffer.append(i)
+        if 1 < len(self.buffer) >= self.max_buffer_length:
+            j = self.buffer.pop(0)
+            self.ims[j], self.im_hw0[j], self.im_hw[j] = None, None, None
+
+class CachedTrainer(DetectionTrainer):
+    """Veri setlerini ImageCache'e bağlayan DetectionTrainer"""
+
+    image_cache = None
+
+    def build_dataset(self, img_path, mode="train", batch=None):
+        dataset = super().build_dataset(img_path, mode, batch)
+        if self.image_cache is not None and type(dataset) is YOLODataset:
+            dataset.__class__ = CachedYOLODataset
+            dataset.attach_cache(self.image_cache)
+        return dataset
+
+def train_plates(model="yolov8n.pt", epochs=1, imgsz=IMG_SIZE, batch=8, workers=None,
+                 dataset_dir=None, val_fraction=VAL_FRACTION, **overrides):
+    """Veri setini hazırla ve modeli CPU'da önbellekten okuyarak eğit; trainer'ı döndür"""
+    data_yaml, cache = prepare_dataset(dataset_dir, val_fraction, imgsz, workers)
+
+    trainer = CachedTrainer(overrides=dict(
+        model=model, data=data_yaml, epochs=epochs, imgsz=imgsz, batch=batch,
+        workers=workers if workers is not None else min(8, os.cpu_count() or 1),
+        device="cpu", cache=False, **overrides
+    ))
+    trainer.image_cache = cache
+    trainer.train()
+    return trainer
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Plaka modeli eğitimi (memmap önbellekli)")
+    parser.add_argument("--model", default="yolov8n.pt")
+    parser.add_argument("--dataset", default=None, help="images/ ve labels/ içeren klasör")
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--imgsz", type=int, default=IMG_SIZE)
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--val-fraction", type=float, default=VAL_FRACTION)
+    args = parser.parse_args()
+
+    train_plates(args.model, args.epochs, args.imgsz, args.batch, args.workers,
+                 args.dataset, args.val_fraction)
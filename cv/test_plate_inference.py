@@ -0,0 +1,36 @@
+"""
+plate_inference yardımcılarının testleri (model ağırlığı gerektirmez)
+
+Kullanım:
+    python -m pytest test_plate_inference.py
+"""
+
+import numpy as np
+
+from plate_inference import letterbox_into, scale_boxes
+
+def test_scale_boxes_letterbox_geri_donusumu():
+    """Letterbox koordinatındaki kutu orijinal görüntü koordinatına döner"""
+    img = np.zeros((480, 960, 3), dtype=np.uint8)
+    out = np.empty((640, 640, 3), dtype=np.uint8)
+    ratio, left, top = letterbox_into(img, out)
+
+    offset = np.array([left, top, left, top], dtype=np.float32)
+    boxes = np.array([[100, 100, 300, 200]], dtype=np.float32) * ratio + offset
+    scaled = scale_boxes(boxes, ratio, left, top, img.shape)
+
+    np.testing.assert_allclose(scaled, [[100, 100, 300, 200]], atol=1e-3)
+    assert scaled.dtype == np.float32
+
+def test_scale_boxes_goruntu_disina_tasan_kutu_kirpilir():
+    """Görüntü sınırlarını aşan kutu (0, 0, w, h) aralığına kırpılır"""
+    img = np.zeros((480, 960, 3), dtype=np.uint8)
+    out = np.empty((640, 640, 3), dtype=np.uint8)
+    ratio, left, top = letterbox_into(img, out)
+
+    # Dolgu bölgesine ve sağ kenarın ötesine taşan kutu
+    boxes = np.array([[-50, top - 40, 700, top + 400]], dtype=np.float32)
+    scaled = scale_boxes(boxes, ratio, left, top, img.shape)
+
+    h, w = img.shape[:2]
+    np.testing.assert_allclose(scaled, [[0, 0, w, h]])
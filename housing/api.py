@@ -3,15 +3,66 @@ Türkiye Ev Fiyat Tahmini API
 FastAPI kullanarak eğitilen Random Forest modelini web üzerinden erişilebilir hale getirir.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, ValidationError, field_validator
+from datetime import datetime
+import asyncio
 import pickle
+import time
 import numpy as np
-import pandas as pd
-from typing import List, Optional
+from typing import Annotated, Any, Dict, List, Literal, Optional, Union
 import os
-import uvicorn
+
+# Not: pandas ve scikit-learn burada import edilmez. Dışa aktarılmış model
+# formatı ile servis yapılırken hiç yüklenmezler; pickle formatında ise
+# scikit-learn yalnızca model açılırken (pickle.load sırasında) yüklenir.
+from binary_format import (
+    MAX_ROWS, PREDICTION_COLUMN, VALUE_KINDS, PayloadError, decode_columns, encode_predictions, media_type_of
+)
+from bulk_jobs import JobManager, input_hash
+from comparables import DEFAULT_K, MAX_K, comparables_index_available, load_comparables_index
+from drift_monitor import drift_reference_available, load_drift_monitor
+from fast_json import FastJSONResponse, StaticJSON
+from forest_export import EXPORT_ARRAYS_PATH, EXPORT_META_PATH, ExportedForest, load_exported_forest
+from forest_inference import (
+    DEFAULT_QUANTILES, DEFAULT_TOLERANCE, build_leaf_value_table, early_exit_predictions,
+    per_tree_predictions, prediction_quantiles, quantile_label, tree_range_predictions
+)
+from forest_quantized import (
+    QUANTIZED_ARRAYS_PATH, QUANTIZED_META_PATH, QuantizedForest, load_quantized_forest, quantized_model_available
+)
+from model_shards import SHARD_MANIFEST_PATH, load_shard_router, shards_available
+from request_tracing import (
+    DEFAULT_CAPACITY, DEFAULT_PROFILE_INTERVAL_MS, MAX_PROFILE_SECONDS, RequestTracer, TracingMiddleware,
+    current_trace, sample_cpu_profile
+)
+
+# Kategorik değerlerin kaydedildiği dosya (girdi şeması bu dosyadan üretilir)
+CATEGORICAL_VALUES_PATH = 'model/categorical_values.pkl'
+
+# Model formatı: "auto" (varsa nicemlenmiş, yoksa dışa aktarılmış format), "quantized", "export" veya "pickle"
+MODEL_FORMAT = os.environ.get("MODEL_FORMAT", "auto")
+
+# Dışa aktarılmış ya da nicemlenmiş model kullanılırken genel modelin bu sayıda ve daha
+# fazla satırlık grupları scikit-learn ile tahmin edilir (isteğe bağlı; varsayılan "0" kapalı)
+SKLEARN_BATCH_ROWS = int(os.environ.get("SKLEARN_BATCH_ROWS", 0))
+
+# Şehir modelleri: "auto" (varsa kullan) veya "0" (yalnızca genel model)
+MODEL_SHARDS = os.environ.get("MODEL_SHARDS", "auto")
+
+# Bellekte tutulan şehir modellerinin toplam boyut bütçesi (MB)
+SHARD_MEMORY_MB = float(os.environ.get("SHARD_MEMORY_MB", 128))
+
+# Profil yüzeyi (istek izleri ve /profil uç noktaları): "1" ile açılır
+PROFILING = os.environ.get("PROFILING", "0") == "1"
+
+# Profil açıkken izlenen tahmin isteklerinin oranı (0-1) ve tutulan en fazla iz sayısı
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 0.01))
+PROFILE_BUFFER_SIZE = int(os.environ.get("PROFILE_BUFFER_SIZE", DEFAULT_CAPACITY))
+
+# İzlenen uç noktalar
+IZLENEN_YOLLAR = ('/tahmin', '/toplu-tahmin')
 
 # FastAPI uygulaması oluştur
 app = FastAPI(
@@ -31,17 +82,82 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# İstek izleme yalnızca profil açıkken eklenir; kapalıyken istek yolu değişmez
+istek_izleyici = RequestTracer(PROFILE_SAMPLE_RATE, PROFILE_BUFFER_SIZE) if PROFILING else None
+if istek_izleyici is not None:
+    app.add_middleware(TracingMiddleware, tracer=istek_izleyici, paths=IZLENEN_YOLLAR)
+
 # Global değişkenler
 model = None
 label_encoders = None
+kategori_kodlari = None
 feature_names = None
 categorical_values = None
+leaf_values = None
+statik_yanitlar = {}
+ozellik_kodlayicilari = None
+is_yoneticisi = None
+emsal_indeksi = None
+drift_izleyici = None
+sehir_yonlendirici = None
+sklearn_modeli = None
+cpu_profil_kilidi = asyncio.Lock()
 
-def load_model_components():
-    """Model ve gerekli bileşenleri yükle"""
-    global model, label_encoders, feature_names, categorical_values
+def kategorik_degerleri_yukle():
+    """Kategorik alanların geçerli değerlerini yükle (dosya yoksa boş sözlük)"""
+    if not os.path.exists(CATEGORICAL_VALUES_PATH):
+        return {}
+    with open(CATEGORICAL_VALUES_PATH, 'rb') as f:
+        return pickle.load(f)
+
+def kat_kodlari_olustur(kat_degerleri):
+    """Bulunduğu kat değerlerini sayısal koda çeviren sözlüğü üret (Bahçe Katı = 0)"""
+    return {kat: 0 if kat == 'Bahçe Katı' else int(kat) for kat in kat_degerleri}
+
+def model_anahtari():
+    """Yüklü model dosyalarını tanımlayan anahtar (model değişince toplu iş sonuçları yeniden kullanılmaz)"""
+    if isinstance(model, QuantizedForest):
+        paths = [QUANTIZED_ARRAYS_PATH, QUANTIZED_META_PATH]
+    elif isinstance(model, ExportedForest):
+        paths = [EXPORT_ARRAYS_PATH, EXPORT_META_PATH]
+    else:
+        paths = ['model/random_forest_model.pkl']
+    if sehir_yonlendirici is not None:
+        paths.append(SHARD_MANIFEST_PATH)
+    return [(os.path.basename(p), os.path.getsize(p), os.stat(p).st_mtime_ns) for p in paths]
+
+def exported_model_available():
+    """Dışa aktarılmış model dosyalarının var olup olmadığını kontrol et"""
+    return os.path.exists(EXPORT_ARRAYS_PATH) and os.path.exists(EXPORT_META_PATH)
+
+def orman_bilesenlerini_yukle():
+    """Tahmin için gereken ormanı ve varsa şehir modeli listesini yükle; (format, encoder sınıfları) döner
+
+    Toplu iş işçileri yalnızca bunu çağırır; emsal indeksi, drift referansı ve
+    sabit yanıtlar yüklenmez. Şehir modelleri liste okunarak hazırlanır,
+    parçalar ilk ihtiyaçta yüklenir.
+    """
+    global model, label_encoders, feature_names, leaf_values, sehir_yonlendirici, sklearn_modeli
     
-    try:
+    # Büyük gruplar için scikit-learn modeli gerektiğinde yeniden yüklenir
+    sklearn_modeli = None
+    
+    if MODEL_FORMAT == "auto":
+        if quantized_model_available():
+            model_format = "quantized"
+        elif exported_model_available():
+            model_format = "export"
+        else:
+            model_format = "pickle"
+    else:
+        model_format = MODEL_FORMAT
+    
+    if model_format in ("quantized", "export"):
+        # Nicemlenmiş ya da dışa aktarılmış formatı yükle (scikit-learn gerekmez)
+        model = load_quantized_forest() if model_format == "quantized" else load_exported_forest()
+        feature_names = model.feature_names
+        encoder_classes = model.encoder_classes
+    else:
         # Modeli yükle
         with open('model/random_forest_model.pkl', 'rb') as f:
             model = pickle.load(f)
@@ -54,11 +170,65 @@ def load_model_components():
         with open('model/feature_names.pkl', 'rb') as f:
             feature_names = pickle.load(f)
         
-        # Kategorik değerleri yükle
-        with open('model/categorical_values.pkl', 'rb') as f:
-            categorical_values = pickle.load(f)
+        encoder_classes = {col: list(le.classes_) for col, le in label_encoders.items()}
+        
+        # Tahmin aralıkları için ağaç yaprak değerleri tablosunu hazırla
+        leaf_values = build_leaf_value_table(model)
+    
+    # Şehir modelleri yalnızca liste okunarak hazırlanır; parçalar ilk istekte yüklenir
+    if MODEL_SHARDS != "0" and shards_available():
+        sehir_yonlendirici = load_shard_router(feature_names, SHARD_MEMORY_MB)
+    
+    return model_format, encoder_classes
+
+def load_model_components():
+    """Model ve gerekli bileşenleri yükle"""
+    global kategori_kodlari, categorical_values, statik_yanitlar, ozellik_kodlayicilari, emsal_indeksi, drift_izleyici
+    
+    try:
+        model_format, encoder_classes = orman_bilesenlerini_yukle()
+        
+        # Kategori -> kod sözlükleri (LabelEncoder.transform ile aynı kodlar)
+        kategori_kodlari = {
+            col: {str(value): code for code, value in enumerate(classes)}
+            for col, classes in encoder_classes.items()
+        }
+        
+        # Kategorik değerleri yükle (girdi şeması ile aynı kaynak)
+        categorical_values = KATEGORIK_DEGERLER or kategorik_degerleri_yukle()
+        
+        # Her özellik için kodlama sözlüğü (sayısal alanlar için None)
+        kodlayicilar = dict(kategori_kodlari)
+        kodlayicilar['bulundugu_kat'] = kat_kodlari_olustur(categorical_values.get('bulundugu_kat', []))
+        ozellik_kodlayicilari = [(feature, kodlayicilar.get(feature)) for feature in feature_names]
+        
+        # Sabit yanıtları bir kez serileştir (ETag ile sunulur)
+        statik_yanitlar = {
+            "model-info": StaticJSON(ModelBilgileri(
+                algoritma_tipi="Random Forest Regressor",
+                ozellik_sayisi=len(feature_names),
+                desteklenen_sehirler=categorical_values.get('sehir', [])[:20],  # İlk 20 şehir
+                desteklenen_ev_tipleri=categorical_values.get('ev_tipi', [])
+            ).model_dump()),
+            "kategorik-degerler": StaticJSON(categorical_values)
+        }
             
-        print("✅ Model bileşenleri başarıyla yüklendi")
+        # Emsal indeksi isteğe bağlıdır; yoksa yalnızca /benzer-evler kapalı olur
+        if comparables_index_available():
+            emsal_indeksi = load_comparables_index()
+        else:
+            print("⚠️  Emsal indeksi bulunamadı, /benzer-evler devre dışı ('python comparables.py' ile oluşturun)")
+        
+        # Drift izleme de isteğe bağlıdır; referans yoksa istekler sayılmaz
+        if drift_reference_available():
+            drift_izleyici = load_drift_monitor()
+        else:
+            print("⚠️  Drift referansı bulunamadı, /drift devre dışı ('python drift_monitor.py' ile oluşturun)")
+        
+        if sehir_yonlendirici is not None:
+            print(f"🏙️  {len(sehir_yonlendirici.entries)} şehir modeli kullanılabilir (bütçe {SHARD_MEMORY_MB:g} MB)")
+            
+        print(f"✅ Model bileşenleri başarıyla yüklendi ({model_format} formatı)")
         
     except FileNotFoundError as e:
         print(f"❌ Model dosyaları bulunamadı: {e}")
@@ -68,30 +238,52 @@ def load_model_components():
         print(f"❌ Model yükleme hatası: {e}")
         raise
 
+# Girdi şeması import sırasında categorical_values.pkl'den üretilir; böylece
+# kategorik doğrulama istek gövdesi çözülürken tek geçişte yapılır ve
+# geçerli değerler OpenAPI şemasında listelenir.
+KATEGORIK_DEGERLER = kategorik_degerleri_yukle()
+
+def kategorik_tip(alan: str):
+    """Alanın geçerli değerlerinden Literal tip üret (değerler yoksa str)"""
+    degerler = KATEGORIK_DEGERLER.get(alan)
+    if not degerler:
+        return str
+    return Literal[tuple(degerler)]
+
 # Pydantic modelleri
 class EvBilgileri(BaseModel):
     """Ev bilgileri için veri modeli"""
-    sehir: str = Field(..., description="Şehir adı")
-    semt: str = Field(..., description="Semt adı")
-    ev_tipi: str = Field(..., description="Ev tipi (Daire, Villa, vb.)")
-    oda_sayisi: str = Field(..., description="Oda sayısı")
+    sehir: kategorik_tip('sehir') = Field(..., description="Şehir adı")
+    semt: kategorik_tip('semt') = Field(..., description="Semt adı")
+    ev_tipi: kategorik_tip('ev_tipi') = Field(..., description="Ev tipi (Daire, Villa, vb.)")
+    oda_sayisi: kategorik_tip('oda_sayisi') = Field(..., description="Oda sayısı")
     net_metrekare: float = Field(..., gt=0, description="Net metrekare (m²)")
     brut_metrekare: float = Field(..., gt=0, description="Brüt metrekare (m²)")
-    bina_yasi: str = Field(..., description="Bina yaşı")
-    bulundugu_kat: str = Field(..., description="Bulunduğu kat")
+    bina_yasi: kategorik_tip('bina_yasi') = Field(..., description="Bina yaşı")
+    bulundugu_kat: kategorik_tip('bulundugu_kat') = Field(..., description="Bulunduğu kat")
     kat_sayisi: int = Field(..., gt=0, description="Kat sayısı")
     banyo_sayisi: int = Field(..., gt=0, description="Banyo sayısı")
-    balkon: str = Field(..., description="Balkon durumu")
-    isitma_tipi: str = Field(..., description="Isıtma tipi")
-    otopark: str = Field(..., description="Otopark durumu")
-    site_ici: str = Field(..., description="Site içi durumu")
-    esyali_durum: str = Field(..., description="Eşyalı durumu")
+    balkon: kategorik_tip('balkon') = Field(..., description="Balkon durumu")
+    isitma_tipi: kategorik_tip('isitma_tipi') = Field(..., description="Isıtma tipi")
+    otopark: kategorik_tip('otopark') = Field(..., description="Otopark durumu")
+    site_ici: kategorik_tip('site_ici') = Field(..., description="Site içi durumu")
+    esyali_durum: kategorik_tip('esyali_durum') = Field(..., description="Eşyalı durumu")
+
+# Toplu tahminde geçersiz bir ev tüm isteği reddetmemeli: önce EvBilgileri
+# denenir, olmazsa ham sözlük olarak alınıp o ev için hata raporlanır.
+TopluEvGirdisi = Annotated[Union[EvBilgileri, Dict[str, Any]], Field(union_mode='left_to_right')]
+
+# İkili girdide tam sayı olması gereken alanlar (diğer sayısal alanlar float)
+TAM_SAYI_ALANLARI = {alan for alan, bilgi in EvBilgileri.model_fields.items() if bilgi.annotation is int}
 
 class TahminSonucu(BaseModel):
     """Tahmin sonucu için veri modeli"""
     tahmin_fiyat: float = Field(..., description="Tahmini fiyat (TL)")
     tahmin_fiyat_formatted: str = Field(..., description="Formatlanmış tahmini fiyat")
     tahmin_bilgileri: dict = Field(..., description="Tahmin hakkında bilgiler")
+    tahmin_araligi: Optional[Dict[str, float]] = Field(
+        None, description="Ağaç tahminlerinden hesaplanan yüzdelikler (örn. P10, P50, P90)"
+    )
 
 class ModelBilgileri(BaseModel):
     """Model bilgileri için veri modeli"""
@@ -100,11 +292,63 @@ class ModelBilgileri(BaseModel):
     desteklenen_sehirler: List[str]
     desteklenen_ev_tipleri: List[str]
 
+# API'yi test etmek için örnek veriler (bir kez serileştirilir)
+ORNEK_VERI = {
+    "ornek_ev_1": {
+        "sehir": "İstanbul",
+        "semt": "Kadıköy",
+        "ev_tipi": "Daire",
+        "oda_sayisi": "3+1",
+        "net_metrekare": 120.0,
+        "brut_metrekare": 140.0,
+        "bina_yasi": "6-10",
+        "bulundugu_kat": "5",
+        "kat_sayisi": 8,
+        "banyo_sayisi": 2,
+        "balkon": "Var",
+        "isitma_tipi": "Kombi",
+        "otopark": "Var",
+        "site_ici": "Evet",
+        "esyali_durum": "Eşyasız"
+    },
+    "ornek_ev_2": {
+        "sehir": "Ankara",
+        "semt": "Çankaya",
+        "ev_tipi": "Villa",
+        "oda_sayisi": "4+1",
+        "net_metrekare": 200.0,
+        "brut_metrekare": 250.0,
+        "bina_yasi": "0-5",
+        "bulundugu_kat": "Bahçe Katı",
+        "kat_sayisi": 3,
+        "banyo_sayisi": 3,
+        "balkon": "Var",
+        "isitma_tipi": "Merkezi",
+        "otopark": "Var",
+        "site_ici": "Evet",
+        "esyali_durum": "Eşyalı"
+    }
+}
+ornek_veri_yaniti = StaticJSON(ORNEK_VERI)
+
 # API endpoint'leri
 @app.on_event("startup")
 async def startup_event():
     """Uygulama başlatıldığında model bileşenlerini yükle"""
+    global is_yoneticisi
     load_model_components()
+    
+    # Toplu tahmin işleri: önceki çalışmadan yarım kalan parçalar devam ettirilir
+    is_yoneticisi = JobManager()
+    yarim_kalan = is_yoneticisi.resume()
+    if yarim_kalan:
+        print(f"🔁 {yarim_kalan} yarım kalmış toplu tahmin parçası yeniden kuyruğa alındı")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Toplu tahmin işçilerini durdur"""
+    if is_yoneticisi is not None:
+        is_yoneticisi.shutdown()
 
 @app.get("/", summary="Ana Sayfa")
 async def ana_sayfa():
@@ -125,106 +369,340 @@ async def saglik_kontrolu():
     return {
         "durum": "sağlıklı",
         "model_yuklendi": model is not None,
-        "timestamp": pd.Timestamp.now().isoformat()
+        "sehir_modelleri": sehir_yonlendirici.stats() if sehir_yonlendirici is not None else None,
+        "timestamp": datetime.now().isoformat()
     }
 
 @app.get("/model-info", response_model=ModelBilgileri, summary="Model Bilgileri")
-async def model_bilgileri():
+async def model_bilgileri(if_none_match: Optional[str] = Header(None)):
     """Model hakkında bilgi ver"""
     if model is None:
         raise HTTPException(status_code=503, detail="Model yüklenmedi")
     
-    return ModelBilgileri(
-        algoritma_tipi="Random Forest Regressor",
-        ozellik_sayisi=len(feature_names),
-        desteklenen_sehirler=categorical_values.get('sehir', [])[:20],  # İlk 20 şehir
-        desteklenen_ev_tipleri=categorical_values.get('ev_tipi', [])
-    )
+    return statik_yanitlar["model-info"].response(if_none_match)
 
 @app.get("/kategorik-degerler", summary="Kategorik Değerler")
-async def kategorik_degerler():
+async def kategorik_degerler(if_none_match: Optional[str] = Header(None)):
     """Tüm kategorik alanlar için geçerli değerleri listele"""
     if categorical_values is None:
         raise HTTPException(status_code=503, detail="Kategorik değerler yüklenmedi")
     
-    return categorical_values
+    return statik_yanitlar["kategorik-degerler"].response(if_none_match)
 
-@app.post("/tahmin", response_model=TahminSonucu, summary="Ev Fiyat Tahmini")
-async def ev_fiyat_tahmini(ev_bilgileri: EvBilgileri):
-    """Verilen ev bilgilerine göre fiyat tahmini yap"""
-    if model is None or label_encoders is None:
-        raise HTTPException(status_code=503, detail="Model veya encoder'lar yüklenmedi")
-    
+def ozellik_vektoru_olustur(ev_verisi: dict) -> list:
+    """Doğrulanmış ev bilgilerini modelin beklediği sırada özellik vektörüne çevir"""
     try:
-        # Giriş verilerini dict'e çevir
-        input_data = ev_bilgileri.dict()
+        return [
+            ev_verisi[feature] if kodlar is None else kodlar[ev_verisi[feature]]
+            for feature, kodlar in ozellik_kodlayicilari
+        ]
+    except KeyError:
+        # Yalnızca hata durumunda hangi alanın sorunlu olduğu aranır
+        for feature, kodlar in ozellik_kodlayicilari:
+            if feature not in ev_verisi:
+                raise HTTPException(status_code=400, detail=f"Eksik özellik: {feature}")
+            if kodlar is not None and ev_verisi[feature] not in kodlar:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"{feature} için geçersiz değer: {ev_verisi[feature]}"
+                )
+        raise
+
+def dogrulama_hatasi_mesaji(hata: ValidationError) -> str:
+    """Pydantic doğrulama hatasını kısa bir Türkçe mesaja çevir"""
+    ilk_hata = hata.errors()[0]
+    alan = ".".join(str(parca) for parca in ilk_hata['loc'])
+    if ilk_hata['type'] == 'missing':
+        return f"Eksik özellik: {alan}"
+    return f"{alan} için geçersiz değer: {ilk_hata.get('input')}. {ilk_hata['msg']}"
+
+def evleri_kodla(ev_listesi: list):
+    """Toplu girdideki evleri doğrula ve kodla
+
+    (sonuclar, gecerli_indeksler, gecerli_satirlar) döner; geçersiz evler
+    sonuclar listesinde `hata` alanıyla yer alır.
+    """
+    sonuclar = []
+    gecerli_indeksler = []
+    gecerli_satirlar = []
+    for i, ev in enumerate(ev_listesi):
+        if isinstance(ev, dict):
+            # Şemaya uymayan ev: hatanın ayrıntısı için yeniden doğrula
+            try:
+                ev = EvBilgileri.model_validate(ev)
+            except ValidationError as e:
+                sonuclar.append({"index": i, "ev_bilgileri": ev, "hata": dogrulama_hatasi_mesaji(e)})
+                continue
         
-        # Kategorik değerleri validate et
-        if categorical_values:
-            for field_name, value in input_data.items():
-                if field_name in categorical_values:
-                    if str(value) not in categorical_values[field_name]:
-                        valid_values = ", ".join(categorical_values[field_name][:10])
-                        if len(categorical_values[field_name]) > 10:
-                            valid_values += "..."
-                        raise HTTPException(
-                            status_code=400,
-                            detail=f"{field_name} için geçersiz değer: {value}. Geçerli değerler: {valid_values}"
-                        )
+        # Her ev yalnızca bir kez sözlüğe çevrilir
+        ev_verisi = ev.model_dump()
+        try:
+            gecerli_satirlar.append(ozellik_vektoru_olustur(ev_verisi))
+            gecerli_indeksler.append(i)
+            sonuclar.append({"index": i, "ev_bilgileri": ev_verisi})
+        except HTTPException as e:
+            sonuclar.append({
+                "index": i,
+                "ev_bilgileri": ev_verisi,
+                "hata": e.detail
+            })
+    return sonuclar, gecerli_indeksler, gecerli_satirlar
+
+def ikili_girdiyi_kodla(n_ev: int, kolonlar: dict):
+    """İkili gövdeden çözülen sütunları doğrudan özellik matrisine çevir
+
+    Kategorik sütunlarda yalnızca sözlükteki benzersiz değerler kodlanır, satırlar
+    tek bir indeksleme ile eşlenir. (X_input, hatalar) döner; hatalar her geçersiz
+    satır için ilk hatalı alanın mesajıdır. Eksik ya da yanlış tipteki sütun
+    tüm isteği 400 ile reddeder.
+    """
+    X_input = np.empty((n_ev, len(ozellik_kodlayicilari)), dtype=np.float64)
+    hatalar = {}
+    for j, (feature, kodlar) in enumerate(ozellik_kodlayicilari):
+        if feature not in kolonlar:
+            raise HTTPException(status_code=400, detail=f"Eksik özellik: {feature}")
+        kolon = kolonlar[feature]
         
-        # Kategorik değişkenleri encode et
-        categorical_columns = ['sehir', 'semt', 'ev_tipi', 'oda_sayisi', 'bina_yasi', 
-                              'balkon', 'isitma_tipi', 'otopark', 'site_ici', 'esyali_durum']
+        if kodlar is not None:
+            if not isinstance(kolon, tuple):
+                raise HTTPException(status_code=400, detail=f"{feature} metin (sözlük kodlu) sütun olmalıdır")
+            sozluk, indeksler = kolon
+            # Sözlük dışı indeksler son elemana (geçersiz kod -1) düşer
+            indeksler = indeksler.astype(np.int64)
+            indeksler[(indeksler < 0) | (indeksler > len(sozluk))] = len(sozluk)
+            tablo = np.array([kodlar.get(deger, -1) for deger in sozluk] + [-1], dtype=np.int64)
+            degerler = tablo[indeksler]
+            for i in np.flatnonzero(degerler < 0):
+                deger = sozluk[indeksler[i]] if indeksler[i] < len(sozluk) else None
+                hatalar.setdefault(int(i), f"{feature} için geçersiz değer: {deger}")
+        else:
+            if isinstance(kolon, tuple) or kolon.dtype.kind not in VALUE_KINDS:
+                raise HTTPException(status_code=400, detail=f"{feature} sayısal sütun olmalıdır")
+            degerler = kolon.astype(np.float64)
+            # EvBilgileri ile aynı kurallar: sıfırdan büyük, gerekirse tam sayı (NaN geçersiz)
+            gecersiz = ~(degerler > 0)
+            if feature in TAM_SAYI_ALANLARI:
+                gecersiz |= degerler != np.floor(degerler)
+            for i in np.flatnonzero(gecersiz):
+                hatalar.setdefault(int(i), f"{feature} için geçersiz değer: {degerler[i]:g}")
         
-        for col in categorical_columns:
-            if col in input_data:
-                try:
-                    input_data[col] = label_encoders[col].transform([input_data[col]])[0]
-                except ValueError as e:
-                    raise HTTPException(
-                        status_code=400, 
-                        detail=f"{col} için geçersiz değer: {ev_bilgileri.dict()[col]}"
-                    )
+        X_input[:, j] = degerler
+    return X_input, hatalar
+
+def yuzdelikleri_dogrula(aralik: bool, yuzdelikler: List[float]) -> Optional[List[float]]:
+    """İstenen yüzdelikleri kontrol et; aralık istenmediyse None döndür"""
+    if not aralik:
+        return None
+    if not yuzdelikler or any(q < 0 or q > 100 for q in yuzdelikler):
+        raise HTTPException(
+            status_code=400,
+            detail="Yüzdelikler 0 ile 100 arasında olmalıdır"
+        )
+    return sorted(set(yuzdelikler))
+
+def agac_tahminleri(X_input: np.ndarray, aktif_model=None) -> np.ndarray:
+    """Tüm ağaçların tahminlerini (n_ornek, n_agac) matrisi olarak döndür"""
+    aktif_model = model if aktif_model is None else aktif_model
+    if isinstance(aktif_model, ExportedForest):
+        return aktif_model.tree_predictions(X_input)
+    return per_tree_predictions(aktif_model, leaf_values, X_input)
+
+def agac_sayisi(aktif_model) -> int:
+    """Modeldeki ağaç sayısı"""
+    if isinstance(aktif_model, ExportedForest):
+        return aktif_model.n_trees
+    return len(aktif_model.estimators_)
+
+def model_gruplari(X_input: np.ndarray):
+    """Satırları tahmin edecek modele göre grupla; (model, satır indeksleri) üret
+
+    Şehir modelleri varsa satırlar şehre göre gruplanır ve her grup kendi
+    şehrinin modeline (yoksa genel modele) yönlendirilir.
+    """
+    if sehir_yonlendirici is None:
+        yield model, slice(None)
+        return
+    for parca, satirlar in sehir_yonlendirici.groups(X_input):
+        yield (model if parca is None else parca), satirlar
+
+def toplu_model_tahmini(X_input: np.ndarray, yuzdelikler: Optional[List[float]] = None):
+    """Özellik matrisi için nokta tahmini ve isteğe bağlı yüzdelikleri hesapla
+
+    Her model grubu (bkz. model_gruplari) tek geçişte tahmin edilir.
+    """
+    tahminler = np.empty(len(X_input), dtype=np.float64)
+    araliklar = [None] * len(X_input) if yuzdelikler is not None else None
+    for aktif_model, satirlar in model_gruplari(X_input):
+        grup_tahminleri, grup_araliklari = model_tahmini(aktif_model, X_input[satirlar], yuzdelikler)
+        tahminler[satirlar] = grup_tahminleri
+        if araliklar is not None:
+            for i, aralik in zip(np.arange(len(X_input))[satirlar], grup_araliklari):
+                araliklar[i] = aralik
+    return tahminler, araliklar
+
+def yuzdelik_araliklari(tree_predictions: np.ndarray, yuzdelikler: List[float]):
+    """Ağaç tahminlerinden nokta tahminleri ve her ev için yüzdelik sözlüklerini üret"""
+    tahminler, yuzdelik_degerleri = prediction_quantiles(tree_predictions, yuzdelikler)
+    araliklar = [
+        {quantile_label(q): float(yuzdelik_degerleri[j, i]) for j, q in enumerate(yuzdelikler)}
+        for i in range(len(tahminler))
+    ]
+    return tahminler, araliklar
+
+def buyuk_grup_modeli():
+    """Büyük gruplar için scikit-learn modeli; yüklenemiyorsa None
+
+    NumPy değerlendiricisi tek ev ve küçük gruplarda scikit-learn'den hızlıdır,
+    binlerce satırda ise derlenmiş ağaç dolaşması öne geçer. Açılış süresi
+    etkilenmesin diye pickle ilk büyük grupta yüklenir; yaprak tablosu da
+    ağaç tahminleri (yüzdelikler) için o zaman hazırlanır.
+    """
+    global sklearn_modeli, leaf_values
+    if sklearn_modeli is None:
+        try:
+            with open('model/random_forest_model.pkl', 'rb') as f:
+                sklearn_modeli = pickle.load(f)
+            leaf_values = build_leaf_value_table(sklearn_modeli)
+            print("✅ Büyük gruplar için scikit-learn modeli yüklendi")
+        except (ImportError, OSError) as e:
+            print(f"⚠️  scikit-learn modeli yüklenemedi, büyük gruplar NumPy ile tahmin edilecek: {e}")
+            sklearn_modeli = False
+    return sklearn_modeli or None
+
+def model_tahmini(aktif_model, X_input: np.ndarray, yuzdelikler: Optional[List[float]] = None):
+    """Tek bir model ile tek geçişte nokta tahmini ve isteğe bağlı yüzdelikleri hesapla"""
+    if (aktif_model is model and isinstance(model, ExportedForest)
+            and 0 < SKLEARN_BATCH_ROWS <= len(X_input)):
+        aktif_model = buyuk_grup_modeli() or aktif_model
+    
+    if yuzdelikler is None:
+        return aktif_model.predict(X_input), None
+    
+    # Tüm ağaçların tahminleri tek toplu değerlendirmede toplanır
+    return yuzdelik_araliklari(agac_tahminleri(X_input, aktif_model), yuzdelikler)
+
+def erken_cikisli_tahmin(X_input: np.ndarray, yuzdelikler: Optional[List[float]], tolerans: float,
+                         agac_butcesi: Optional[int] = None, bitis: Optional[float] = None):
+    """Ağaçları sırayla değerlendirip her ev için yeterli kesinliğe ulaşınca dur
+
+    bitis `time.perf_counter()` cinsinden süre bütçesinin dolduğu andır.
+    (tahminler, araliklar, agac_bilgileri) döner; agac_bilgileri her ev için
+    kullanılan ağaç sayısı ve ortalamanın standart hatasıdır.
+    """
+    tahminler = np.empty(len(X_input), dtype=np.float64)
+    araliklar = [None] * len(X_input) if yuzdelikler is not None else None
+    agac_bilgileri = [None] * len(X_input)
+    for aktif_model, satirlar in model_gruplari(X_input):
+        X_grup = X_input[satirlar]
+        if isinstance(aktif_model, ExportedForest):
+            def agac_blogu(baslangic, bitis_agaci, aktif, orman=aktif_model, X=X_grup):
+                return orman.tree_predictions(X[aktif], slice(baslangic, bitis_agaci))
+        else:
+            def agac_blogu(baslangic, bitis_agaci, aktif, orman=aktif_model, X=X_grup):
+                return tree_range_predictions(orman, leaf_values, X[aktif], baslangic, bitis_agaci)
         
-        # Bulunduğu kat özel işlemi
-        if input_data['bulundugu_kat'] == 'Bahçe Katı':
-            input_data['bulundugu_kat'] = 0
+        toplam_agac = agac_sayisi(aktif_model)
+        tree_predictions, kullanilan, standart_hata = early_exit_predictions(
+            agac_blogu, toplam_agac, len(X_grup), tolerans, agac_butcesi, bitis
+        )
+        if yuzdelikler is None:
+            grup_tahminleri, grup_araliklari = np.nanmean(tree_predictions, axis=1), None
         else:
-            try:
-                input_data['bulundugu_kat'] = int(input_data['bulundugu_kat'])
-            except ValueError:
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"Geçersiz kat değeri: {ev_bilgileri.bulundugu_kat}"
-                )
+            grup_tahminleri, grup_araliklari = yuzdelik_araliklari(tree_predictions, yuzdelikler)
         
-        # Özellik sırasını doğru şekilde düzenle
-        feature_values = []
-        for feature in feature_names:
-            if feature in input_data:
-                feature_values.append(input_data[feature])
-            else:
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"Eksik özellik: {feature}"
-                )
+        tahminler[satirlar] = grup_tahminleri
+        for j, i in enumerate(np.arange(len(X_input))[satirlar]):
+            agac_bilgileri[i] = {
+                "kullanilan_agac": int(kullanilan[j]),
+                "toplam_agac": toplam_agac,
+                "standart_hata": float(standart_hata[j]),
+            }
+            if araliklar is not None:
+                araliklar[i] = grup_araliklari[j]
+    return tahminler, araliklar, agac_bilgileri
+
+def tahmin_et(X_input: np.ndarray, yuzdelikler: Optional[List[float]], erken_cikis: bool, tolerans: float,
+              agac_butcesi: Optional[int], sure_butcesi_ms: Optional[float], baslangic: float):
+    """Varsayılan olarak tüm ormanla, erken çıkış istendiyse ağaç ve süre bütçesiyle tahmin et
+
+    Ağaç ya da süre bütçesi verilmesi de erken çıkışı açar. Süre bütçesi
+    isteğin işlenmeye başladığı andan (baslangic) itibaren sayılır.
+    (tahminler, araliklar, agac_bilgileri) döner; tam ormanda agac_bilgileri None'dır.
+    """
+    if not erken_cikis and agac_butcesi is None and sure_butcesi_ms is None:
+        return (*toplu_model_tahmini(X_input, yuzdelikler), None)
+    bitis = None if sure_butcesi_ms is None else baslangic + sure_butcesi_ms / 1000
+    return erken_cikisli_tahmin(X_input, yuzdelikler, tolerans, agac_butcesi, bitis)
+
+def tahmin_sonucu_olustur(tahmin: float, tahmin_araligi: Optional[Dict[str, float]] = None,
+                          timestamp: Optional[str] = None, agac_bilgisi: Optional[dict] = None) -> dict:
+    """Model çıktısını TahminSonucu şemasındaki yanıt sözlüğüne çevir"""
+    # Sonucu formatla
+    tahmin_formatted = f"{tahmin:,.0f} TL"
+    
+    tahmin_bilgileri = {
+        "algoritma_tipi": "Random Forest",
+        "ozellik_sayisi": len(feature_names),
+        "tahmin_timestamp": timestamp or datetime.now().isoformat()
+    }
+    # Erken çıkışta kullanılan ağaç sayısı ve standart hata da raporlanır
+    if agac_bilgisi is not None:
+        tahmin_bilgileri.update(agac_bilgisi)
+    
+    return {
+        "tahmin_fiyat": float(tahmin),
+        "tahmin_fiyat_formatted": tahmin_formatted,
+        "tahmin_bilgileri": tahmin_bilgileri,
+        "tahmin_araligi": tahmin_araligi
+    }
+
+def benzer_evleri_bul(X_input: np.ndarray, k: int) -> List[List[dict]]:
+    """Her ev için aynı şehirdeki en benzer k evi (fiyatlarıyla) döndür"""
+    return [
+        [emsal_indeksi.describe(i, mesafe) for i, mesafe in zip(satirlar, mesafeler)]
+        for satirlar, mesafeler in emsal_indeksi.query(X_input, k)
+    ]
+
+@app.post("/tahmin", response_model=TahminSonucu, summary="Ev Fiyat Tahmini")
+async def ev_fiyat_tahmini(
+    ev_bilgileri: EvBilgileri,
+    aralik: bool = Query(False, description="Ağaç tahminlerinden yüzdelik aralığı da döndür"),
+    yuzdelikler: List[float] = Query(list(DEFAULT_QUANTILES), description="Hesaplanacak yüzdelikler (0-100)"),
+    erken_cikis: bool = Query(False, description="Ağaçları sırayla değerlendir, tahmin yeterince kesinleşince dur"),
+    tolerans: float = Query(DEFAULT_TOLERANCE, gt=0, le=1, description="Erken çıkış: standart hatanın tahmine oranı için eşik"),
+    agac_butcesi: Optional[int] = Query(None, ge=1, description="Erken çıkış: en fazla değerlendirilecek ağaç sayısı"),
+    sure_butcesi_ms: Optional[float] = Query(None, gt=0, description="Erken çıkış: tahmin için süre bütçesi (ms)")
+):
+    """Verilen ev bilgilerine göre fiyat tahmini yap"""
+    baslangic = time.perf_counter()
+    iz = current_trace()
+    iz.mark("dogrulama")
+    if model is None or kategori_kodlari is None:
+        raise HTTPException(status_code=503, detail="Model veya encoder'lar yüklenmedi")
+    
+    secili_yuzdelikler = yuzdelikleri_dogrula(aralik, yuzdelikler)
+    
+    try:
+        feature_values = ozellik_vektoru_olustur(ev_bilgileri.model_dump())
+        iz.mark("kodlama")
         
         # Tahmin yap
         X_input = np.array(feature_values).reshape(1, -1)
-        tahmin = model.predict(X_input)[0]
-        
-        # Sonucu formatla
-        tahmin_formatted = f"{tahmin:,.0f} TL"
-        
-        return TahminSonucu(
-            tahmin_fiyat=float(tahmin),
-            tahmin_fiyat_formatted=tahmin_formatted,
-            tahmin_bilgileri={
-                "algoritma_tipi": "Random Forest",
-                "ozellik_sayisi": len(feature_names),
-                "tahmin_timestamp": pd.Timestamp.now().isoformat()
-            }
+        iz.mark("matris")
+        tahminler, araliklar, agac_bilgileri = tahmin_et(
+            X_input, secili_yuzdelikler, erken_cikis, tolerans, agac_butcesi, sure_butcesi_ms, baslangic
         )
+        if drift_izleyici is not None:
+            drift_izleyici.record(X_input, tahminler)
+        iz.mark("tahmin")
+        
+        # Yanıt şeması sabit olduğundan genel encoder yerine doğrudan serileştirilir
+        yanit = FastJSONResponse(tahmin_sonucu_olustur(
+            tahminler[0], araliklar[0] if araliklar else None,
+            agac_bilgisi=agac_bilgileri[0] if agac_bilgileri else None
+        ))
+        iz.mark("serilestirme")
+        return yanit
         
     except HTTPException:
         raise
@@ -232,77 +710,310 @@ async def ev_fiyat_tahmini(ev_bilgileri: EvBilgileri):
         raise HTTPException(status_code=500, detail=f"Tahmin hatası: {str(e)}")
 
 @app.post("/toplu-tahmin", summary="Toplu Ev Fiyat Tahmini")
-async def toplu_ev_fiyat_tahmini(ev_listesi: List[EvBilgileri]):
+async def toplu_ev_fiyat_tahmini(
+    ev_listesi: List[TopluEvGirdisi],
+    aralik: bool = Query(False, description="Ağaç tahminlerinden yüzdelik aralığı da döndür"),
+    yuzdelikler: List[float] = Query(list(DEFAULT_QUANTILES), description="Hesaplanacak yüzdelikler (0-100)"),
+    erken_cikis: bool = Query(False, description="Ağaçları sırayla değerlendir, tahmin yeterince kesinleşince dur"),
+    tolerans: float = Query(DEFAULT_TOLERANCE, gt=0, le=1, description="Erken çıkış: standart hatanın tahmine oranı için eşik"),
+    agac_butcesi: Optional[int] = Query(None, ge=1, description="Erken çıkış: en fazla değerlendirilecek ağaç sayısı"),
+    sure_butcesi_ms: Optional[float] = Query(None, gt=0, description="Erken çıkış: tahmin için süre bütçesi (ms)")
+):
     """Birden fazla ev için fiyat tahmini yap"""
+    baslangic = time.perf_counter()
+    iz = current_trace()
+    iz.mark("dogrulama")
+    iz.note(ev_sayisi=len(ev_listesi))
     if len(ev_listesi) > 100:
         raise HTTPException(status_code=400, detail="Maksimum 100 ev için tahmin yapılabilir")
+    if model is None or kategori_kodlari is None:
+        raise HTTPException(status_code=503, detail="Model veya encoder'lar yüklenmedi")
     
-    sonuclar = []
-    for i, ev in enumerate(ev_listesi):
+    secili_yuzdelikler = yuzdelikleri_dogrula(aralik, yuzdelikler)
+    
+    # Önce tüm evleri doğrula, geçerli olanları tek matriste topla
+    sonuclar, gecerli_indeksler, gecerli_satirlar = evleri_kodla(ev_listesi)
+    iz.mark("kodlama")
+    
+    # Geçerli evler için tek seferde tahmin yap
+    if gecerli_satirlar:
         try:
-            sonuc = await ev_fiyat_tahmini(ev)
-            sonuclar.append({
-                "index": i,
-                "ev_bilgileri": ev.dict(),
-                "tahmin": sonuc.dict()
-            })
-        except HTTPException as e:
-            sonuclar.append({
-                "index": i,
-                "ev_bilgileri": ev.dict(),
-                "hata": e.detail
-            })
+            X_input = np.array(gecerli_satirlar)
+            iz.mark("matris")
+            tahminler, araliklar, agac_bilgileri = tahmin_et(
+                X_input, secili_yuzdelikler, erken_cikis, tolerans, agac_butcesi, sure_butcesi_ms, baslangic
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Tahmin hatası: {str(e)}")
+        if drift_izleyici is not None:
+            drift_izleyici.record(X_input, tahminler)
+        iz.mark("tahmin")
+        
+        # Aynı geçişte tahmin edilen evler ortak zaman damgasını paylaşır
+        timestamp = datetime.now().isoformat()
+        for j, i in enumerate(gecerli_indeksler):
+            sonuclar[i]["tahmin"] = tahmin_sonucu_olustur(
+                tahminler[j], araliklar[j] if araliklar else None, timestamp,
+                agac_bilgileri[j] if agac_bilgileri else None
+            )
     
-    return {
+    yanit = FastJSONResponse({
+        "toplam_ev": len(ev_listesi),
+        "basarili_tahmin": len(gecerli_indeksler),
+        "hatali_tahmin": len(ev_listesi) - len(gecerli_indeksler),
+        "sonuclar": sonuclar
+    })
+    iz.mark("serilestirme")
+    return yanit
+
+@app.post("/toplu-tahmin/ikili", summary="İkili Formatta Toplu Ev Fiyat Tahmini")
+async def ikili_toplu_tahmin(
+    request: Request,
+    aralik: bool = Query(False, description="Ağaç tahminlerinden yüzdelik aralığı da döndür"),
+    yuzdelikler: List[float] = Query(list(DEFAULT_QUANTILES), description="Hesaplanacak yüzdelikler (0-100)")
+):
+    """msgpack ya da Arrow IPC sütun gövdesiyle toplu tahmin (en fazla MAX_ROWS ev)
+
+    Gövde satır satır doğrulanmadan doğrudan özellik matrisine çevrilir. Yanıt
+    istekle aynı formatta sütunlardır: tahmin_fiyat (geçersiz evlerde NaN),
+    istenirse yüzdelik sütunları ve satır hataları.
+    """
+    if model is None or kategori_kodlari is None:
+        raise HTTPException(status_code=503, detail="Model veya encoder'lar yüklenmedi")
+    try:
+        media_type = media_type_of(request.headers.get("content-type"))
+    except PayloadError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    
+    secili_yuzdelikler = yuzdelikleri_dogrula(aralik, yuzdelikler)
+    
+    try:
+        n_ev, kolonlar = decode_columns(await request.body(), media_type)
+    except PayloadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if n_ev > MAX_ROWS:
+        raise HTTPException(status_code=400, detail=f"Maksimum {MAX_ROWS} ev için tahmin yapılabilir")
+    
+    X_input, hatalar = ikili_girdiyi_kodla(n_ev, kolonlar)
+    gecerli = np.setdiff1d(np.arange(n_ev), np.fromiter(hatalar, dtype=np.int64, count=len(hatalar)))
+    
+    sutunlar = {PREDICTION_COLUMN: np.full(n_ev, np.nan)}
+    for q in secili_yuzdelikler or []:
+        sutunlar[quantile_label(q)] = np.full(n_ev, np.nan)
+    
+    if len(gecerli):
+        X_gecerli = X_input[gecerli]
+        try:
+            tahminler, araliklar = toplu_model_tahmini(X_gecerli, secili_yuzdelikler)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Tahmin hatası: {str(e)}")
+        if drift_izleyici is not None:
+            drift_izleyici.record(X_gecerli, tahminler)
+        
+        sutunlar[PREDICTION_COLUMN][gecerli] = tahminler
+        for q in secili_yuzdelikler or []:
+            etiket = quantile_label(q)
+            sutunlar[etiket][gecerli] = [aralik_degerleri[etiket] for aralik_degerleri in araliklar]
+    
+    return Response(content=encode_predictions(sutunlar, hatalar, media_type), media_type=media_type)
+
+@app.post("/toplu-tahmin/isler", status_code=202, summary="Toplu Tahmin İşi Oluştur")
+async def toplu_tahmin_isi_olustur(
+    ev_listesi: List[TopluEvGirdisi],
+    aralik: bool = Query(False, description="Ağaç tahminlerinden yüzdelik aralığı da döndür"),
+    yuzdelikler: List[float] = Query(list(DEFAULT_QUANTILES), description="Hesaplanacak yüzdelikler (0-100)")
+):
+    """Büyük toplu tahminleri arka planda işlemek için iş oluştur; iş kimliği hemen döner
+
+    Aynı girdilerle (aynı model ve yüzdeliklerle) daha önce oluşturulmuş bir iş
+    varsa yeni iş açılmaz, mevcut işin kimliği döner.
+    """
+    if model is None or kategori_kodlari is None or is_yoneticisi is None:
+        raise HTTPException(status_code=503, detail="Model veya encoder'lar yüklenmedi")
+    if not ev_listesi:
+        raise HTTPException(status_code=422, detail="Ev listesi boş olamaz")
+    
+    secili_yuzdelikler = yuzdelikleri_dogrula(aralik, yuzdelikler)
+    girdiler = [ev.model_dump() if isinstance(ev, EvBilgileri) else ev for ev in ev_listesi]
+    ozet = input_hash(girdiler, secili_yuzdelikler, model_anahtari())
+    
+    is_id = is_yoneticisi.find(ozet)
+    yeniden_kullanildi = is_id is not None
+    if not yeniden_kullanildi:
+        sonuclar, gecerli_indeksler, gecerli_satirlar = evleri_kodla(ev_listesi)
+        hatalar = {s["index"]: s["hata"] for s in sonuclar if "hata" in s}
+        # Tüm evler geçersizse de matris (0, özellik sayısı) boyutundadır
+        X_input = np.array(gecerli_satirlar, dtype=np.float64).reshape(len(gecerli_satirlar), len(feature_names))
+        is_id = is_yoneticisi.submit(
+            ozet, X_input, gecerli_indeksler, hatalar, len(ev_listesi), secili_yuzdelikler
+        )
+        # Tahminler işçilerde hesaplandığından burada yalnızca girdi dağılımı sayılır
+        if drift_izleyici is not None and len(X_input):
+            drift_izleyici.record(X_input)
+    
+    return FastJSONResponse(
+        dict(is_yoneticisi.status(is_id), yeniden_kullanildi=yeniden_kullanildi), status_code=202
+    )
+
+@app.get("/toplu-tahmin/isler/{is_id}", summary="Toplu Tahmin İşi Durumu")
+async def toplu_tahmin_isi_durumu(is_id: str):
+    """İşin durumunu ve ilerlemesini döndür"""
+    if is_yoneticisi is None:
+        raise HTTPException(status_code=503, detail="İş yöneticisi başlatılmadı")
+    
+    durum = is_yoneticisi.status(is_id)
+    if durum is None:
+        raise HTTPException(status_code=404, detail=f"İş bulunamadı: {is_id}")
+    return FastJSONResponse(durum)
+
+@app.get("/toplu-tahmin/isler/{is_id}/sonuclar", summary="Toplu Tahmin İşi Sonuçları")
+async def toplu_tahmin_isi_sonuclari(
+    is_id: str,
+    baslangic: int = Query(0, ge=0, description="İlk evin istek içindeki sırası"),
+    adet: int = Query(1000, ge=1, le=10000, description="Sayfa başına sonuç sayısı")
+):
+    """İşin hazır sonuçlarını sıra numarasına göre sayfa sayfa döndür
+
+    İş sürerken sonraki_baslangic henüz bitmemiş parçalardaki evlerin sırasında
+    kalır; tüm sonuçlar okunduğunda None olur.
+    """
+    if is_yoneticisi is None:
+        raise HTTPException(status_code=503, detail="İş yöneticisi başlatılmadı")
+    
+    durum = is_yoneticisi.status(is_id)
+    if durum is None:
+        raise HTTPException(status_code=404, detail=f"İş bulunamadı: {is_id}")
+    
+    sonuclar, sonraki_baslangic = is_yoneticisi.results(is_id, baslangic, adet)
+    return FastJSONResponse({
+        "is_id": is_id,
+        "durum": durum["durum"],
+        "sonuclar": sonuclar,
+        "sonraki_baslangic": sonraki_baslangic
+    })
+
+@app.post("/benzer-evler", summary="Benzer Evler (Emsaller)")
+async def benzer_evler(
+    ev_bilgileri: EvBilgileri,
+    k: int = Query(DEFAULT_K, ge=1, le=MAX_K, description="Döndürülecek emsal sayısı")
+):
+    """Aynı şehirdeki en benzer k evi fiyatlarıyla ve modelin tahminiyle birlikte döndür"""
+    if model is None or kategori_kodlari is None:
+        raise HTTPException(status_code=503, detail="Model veya encoder'lar yüklenmedi")
+    if emsal_indeksi is None:
+        raise HTTPException(status_code=503, detail="Emsal indeksi yüklenmedi")
+    
+    X_input = np.array(ozellik_vektoru_olustur(ev_bilgileri.model_dump())).reshape(1, -1)
+    tahminler, _ = toplu_model_tahmini(X_input)
+    return FastJSONResponse({
+        "tahmin_fiyat": float(tahminler[0]),
+        "benzer_evler": benzer_evleri_bul(X_input, k)[0]
+    })
+
+@app.post("/toplu-benzer-evler", summary="Toplu Benzer Evler (Emsaller)")
+async def toplu_benzer_evler(
+    ev_listesi: List[TopluEvGirdisi],
+    k: int = Query(DEFAULT_K, ge=1, le=MAX_K, description="Her ev için döndürülecek emsal sayısı")
+):
+    """Birden fazla ev için emsalleri tek istekte döndür (sorgular şehre göre gruplanır)"""
+    if len(ev_listesi) > 100:
+        raise HTTPException(status_code=400, detail="Maksimum 100 ev için emsal aranabilir")
+    if model is None or kategori_kodlari is None:
+        raise HTTPException(status_code=503, detail="Model veya encoder'lar yüklenmedi")
+    if emsal_indeksi is None:
+        raise HTTPException(status_code=503, detail="Emsal indeksi yüklenmedi")
+    
+    sonuclar, gecerli_indeksler, gecerli_satirlar = evleri_kodla(ev_listesi)
+    if gecerli_satirlar:
+        X_input = np.array(gecerli_satirlar)
+        tahminler, _ = toplu_model_tahmini(X_input)
+        for j, (i, emsaller) in enumerate(zip(gecerli_indeksler, benzer_evleri_bul(X_input, k))):
+            sonuclar[i]["tahmin_fiyat"] = float(tahminler[j])
+            sonuclar[i]["benzer_evler"] = emsaller
+    
+    return FastJSONResponse({
         "toplam_ev": len(ev_listesi),
-        "basarili_tahmin": len([s for s in sonuclar if "tahmin" in s]),
-        "hatali_tahmin": len([s for s in sonuclar if "hata" in s]),
+        "basarili": len(gecerli_indeksler),
+        "hatali": len(ev_listesi) - len(gecerli_indeksler),
         "sonuclar": sonuclar
+    })
+
+@app.get("/drift", summary="Girdi ve Tahmin Dağılımı Kayması")
+async def drift_raporu(
+    sifirla: bool = Query(False, description="Rapordan sonra canlı istatistikleri sıfırla")
+):
+    """Gelen evlerin ve tahminlerin dağılımını eğitim verisiyle karşılaştır (PSI / KS)"""
+    if drift_izleyici is None:
+        raise HTTPException(status_code=503, detail="Drift referansı yüklenmedi")
+    
+    rapor = drift_izleyici.report()
+    if sifirla:
+        drift_izleyici.reset()
+    return FastJSONResponse(rapor)
+
+def profil_yuzeyi():
+    """Profil kapalıysa 404 döndür (uç noktalar varsayılan olarak görünmez)"""
+    if istek_izleyici is None:
+        raise HTTPException(status_code=404, detail="Profil yüzeyi kapalı (PROFILING=1 ile açılır)")
+    return istek_izleyici
+
+@app.get("/profil/izler", summary="En Yavaş İstek İzleri")
+async def profil_izleri(
+    adet: int = Query(20, ge=1, le=PROFILE_BUFFER_SIZE, description="Döndürülecek en yavaş iz sayısı"),
+    endpoint: Optional[Literal[IZLENEN_YOLLAR]] = Query(None, description="Yalnızca bu uç noktanın izleri"),
+    sifirla: bool = Query(False, description="Rapordan sonra izleri sil")
+):
+    """Örneklenen tahmin isteklerinden en yavaş olanlar ve aşama bazında p50 / p99 süreleri"""
+    izleyici = profil_yuzeyi()
+    rapor = {
+        "ornekleme_orani": izleyici.sample_rate,
+        "ornek_sayisi": izleyici.sampled,
+        "tampondaki_iz": len(izleyici.traces),
+        "asama_ozeti": izleyici.stage_summary(endpoint),
+        "en_yavas": izleyici.slowest(adet, endpoint)
     }
+    if sifirla:
+        izleyici.reset()
+    return FastJSONResponse(rapor)
+
+@app.put("/profil/ornekleme", summary="İz Örnekleme Oranını Değiştir")
+async def profil_ornekleme(
+    oran: float = Query(..., ge=0, le=1, description="İzlenecek tahmin isteklerinin oranı (0 izlemeyi durdurur)")
+):
+    """Örnekleme oranını yeniden başlatmadan değiştir"""
+    izleyici = profil_yuzeyi()
+    izleyici.sample_rate = oran
+    return FastJSONResponse({"ornekleme_orani": oran})
+
+@app.post("/profil/cpu", summary="CPU Profili")
+async def cpu_profili(
+    sure: float = Query(10, gt=0, le=MAX_PROFILE_SECONDS, description="Profil süresi (saniye)"),
+    aralik_ms: float = Query(DEFAULT_PROFILE_INTERVAL_MS, ge=1, le=1000, description="Yığın örnekleme aralığı (ms)")
+):
+    """Belirtilen süre boyunca istatistiksel CPU profili al ve folded metin dosyası olarak indir
+
+    Örnekleyici ayrı bir iş parçacığında çalışır; bu sürede API istekleri
+    karşılamaya devam eder. Çıktı flamegraph.pl ya da speedscope ile açılabilir.
+    """
+    profil_yuzeyi()
+    if cpu_profil_kilidi.locked():
+        raise HTTPException(status_code=409, detail="Başka bir CPU profili sürüyor")
+    async with cpu_profil_kilidi:
+        profil = await asyncio.to_thread(sample_cpu_profile, sure, aralik_ms)
+    dosya_adi = f"cpu_profil_{datetime.now():%Y%m%d_%H%M%S}.folded"
+    return Response(profil, media_type="text/plain; charset=utf-8",
+                    headers={"Content-Disposition": f'attachment; filename="{dosya_adi}"'})
 
 @app.get("/ornek-veri", summary="Örnek Veri")
-async def ornek_veri():
+async def ornek_veri(if_none_match: Optional[str] = Header(None)):
     """API'yi test etmek için örnek veri döndür"""
-    return {
-        "ornek_ev_1": {
-            "sehir": "İstanbul",
-            "semt": "Kadıköy",
-            "ev_tipi": "Daire",
-            "oda_sayisi": "3+1",
-            "net_metrekare": 120.0,
-            "brut_metrekare": 140.0,
-            "bina_yasi": "6-10",
-            "bulundugu_kat": "5",
-            "kat_sayisi": 8,
-            "banyo_sayisi": 2,
-            "balkon": "Var",
-            "isitma_tipi": "Kombi",
-            "otopark": "Var",
-            "site_ici": "Evet",
-            "esyali_durum": "Eşyasız"
-        },
-        "ornek_ev_2": {
-            "sehir": "Ankara",
-            "semt": "Çankaya",
-            "ev_tipi": "Villa",
-            "oda_sayisi": "4+1",
-            "net_metrekare": 200.0,
-            "brut_metrekare": 250.0,
-            "bina_yasi": "0-5",
-            "bulundugu_kat": "Bahçe Katı",
-            "kat_sayisi": 3,
-            "banyo_sayisi": 3,
-            "balkon": "Var",
-            "isitma_tipi": "Merkezi",
-            "otopark": "Var",
-            "site_ici": "Evet",
-            "esyali_durum": "Eşyalı"
-        }
-    }
+    return ornek_veri_yaniti.response(if_none_match)
 
 if __name__ == "__main__":
+    import uvicorn
+    
     # Model dosyalarının varlığını kontrol et
-    if not os.path.exists('model/random_forest_model.pkl'):
+    if not os.path.exists('model/random_forest_model.pkl') and not exported_model_available():
         print("❌ Model dosyaları bulunamadı!")
         print("   Önce 'python train_and_save_model.py' komutunu çalıştırın.")
         exit(1)
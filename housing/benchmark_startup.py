@@ -0,0 +1,94 @@
+"""
+API Açılış Süresi Ölçümü
+`python -X importtime` ile api.py'nin import ve model yükleme süresini ölçer,
+en pahalı modülleri ve pandas/scikit-learn'ün yüklenip yüklenmediğini raporlar.
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+# Alt süreçte çalıştırılacak kod: API'yi import et ve modeli yükle
+STARTUP_CODE = (
+    "import sys, api; api.load_model_components(); "
+    "print('HEAVY_MODULES=' + ','.join(m for m in ('pandas', 'sklearn') if m in sys.modules))"
+)
+
+def parse_importtime(stderr):
+    """-X importtime çıktısını (modül, kümülatif_us, seviye) listesine çevir"""
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line.split('|')
+        # Üst seviye importlar tek boşlukla, iç içe olanlar +2 boşlukla girintilenir
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        records.append((name.strip(), int(cumulative_us), level))
+    return records
+
+def measure_startup(model_format):
+    """Verilen model formatı ile API açılışını ayrı bir süreçte ölç"""
+    env = dict(os.environ, MODEL_FORMAT=model_format)
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_CODE],
+        capture_output=True, text=True, env=env
+    )
+    wall_time = time.perf_counter() - start
+
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    records = parse_importtime(result.stderr)
+    top_level = [r for r in records if r[2] == 0]
+    heavy = ''
+    for line in result.stdout.splitlines():
+        if line.startswith('HEAVY_MODULES='):
+            heavy = line.split('=', 1)[1]
+
+    return {
+        'wall_time': wall_time,
+        'import_time': sum(r[1] for r in top_level) / 1e6,
+        'top_modules': sorted(
+            [r for r in records if r[2] <= 1], key=lambda r: r[1], reverse=True
+        )[:10],
+        'heavy_modules': heavy.split(',') if heavy else []
+    }
+
+def main():
+    """Ana fonksiyon"""
+    print("⏱️ API Açılış Süresi Ölçümü")
+    print("=" * 50)
+
+    formats = []
+    if os.path.exists('model/forest_quantized.npz'):
+        formats.append('quantized')
+    if os.path.exists('model/forest_export.npz'):
+        formats.append('export')
+    if os.path.exists('model/random_forest_model.pkl'):
+        formats.append('pickle')
+
+    if not formats:
+        print("❌ Model dosyaları bulunamadı!")
+        print("   Önce 'python train_and_save_model.py' komutunu çalıştırın.")
+        return
+
+    for model_format in formats:
+        try:
+            sonuc = measure_startup(model_format)
+        except RuntimeError as e:
+            print(f"\n❌ {model_format} formatı ölçülemedi: {e}")
+            continue
+
+        print(f"\n📦 Model formatı: {model_format}")
+        print(f"   • Toplam açılış (import + model yükleme): {sonuc['wall_time']:.2f} sn")
+        print(f"   • Import süresi: {sonuc['import_time']:.2f} sn")
+        yuklu = ', '.join(sonuc['heavy_modules']) or 'yok'
+        print(f"   • Yüklenen ağır modüller (pandas/sklearn): {yuklu}")
+        print("   • En pahalı 10 import:")
+        for name, cumulative_us, _ in sonuc['top_modules']:
+            print(f"      {cumulative_us / 1000:8.1f} ms  {name}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+İkili (Binary) Toplu Tahmin Formatı
+Toplu çağıranlar için JSON yerine sütun bazlı ikili gövde: her alan bir kez
+adlandırılır, metin alanları sözlük kodlamalı (benzersiz değerler + uint8/uint16
+kodlar), sayısal alanlar ise ham float32 dizileridir. Sunucu gövdeyi satır satır
+sözlüğe çevirmeden doğrudan özellik matrisine dönüştürür; yanıt da aynı biçimde
+sütun dizileri olarak döner. İki kodlama desteklenir:
+
+    application/msgpack                   msgpack (hafif, opsiyonel bağımlılık)
+    application/vnd.apache.arrow.stream   Arrow IPC akışı (pyarrow gerekir)
+
+msgpack gövdesi:
+    {"n": N, "kolonlar": {alan: {"sozluk": [...], "kodlar": <bayt>, "tip": "<u1"}
+                               | {"degerler": <bayt>, "tip": "<f4"}}}
+Arrow gövdesinde metin alanları dictionary, sayısal alanlar float32 sütunlardır.
+
+Kullanım:
+    from binary_format import MSGPACK_MEDIA_TYPE, encode_houses, decode_predictions
+    govde = encode_houses(evler, MSGPACK_MEDIA_TYPE)
+    sonuc = decode_predictions(yanit_govdesi, MSGPACK_MEDIA_TYPE)   # {"tahmin_fiyat": ndarray, ...}
+"""
+
+import numpy as np
+
+try:
+    import msgpack
+except ImportError:  # msgpack opsiyoneldir
+    msgpack = None
+
+# Desteklenen içerik tipleri
+MSGPACK_MEDIA_TYPE = 'application/msgpack'
+ARROW_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, ARROW_MEDIA_TYPE)
+
+# Bir ikili istekte gönderilebilecek en fazla ev sayısı (istemci bu boyutta parçalar)
+MAX_ROWS = 10000
+
+# Yanıttaki nokta tahmini sütunu ve hata sütunu
+PREDICTION_COLUMN = 'tahmin_fiyat'
+ERROR_COLUMN = 'hata'
+
+# msgpack sütunlarında kabul edilen dtype türleri: kodlar işaretsiz tam sayı,
+# sayısal değerler tam sayı ya da ondalıklı olmalıdır
+CODE_KINDS = 'u'
+VALUE_KINDS = 'iuf'
+
+class PayloadError(ValueError):
+    """Gövde çözülemediğinde ya da format desteklenmediğinde"""
+
+def _pyarrow():
+    """pyarrow'u ilk ihtiyaçta yükle (açılış süresini etkilemesin)"""
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        raise PayloadError("Arrow formatı için pyarrow yüklü olmalıdır") from None
+    return pyarrow
+
+def _check_msgpack():
+    if msgpack is None:
+        raise PayloadError("msgpack formatı için msgpack yüklü olmalıdır")
+
+def media_type_of(content_type):
+    """Content-Type başlığından desteklenen içerik tipini seç (parametreler atılır)"""
+    media_type = (content_type or '').split(';')[0].strip().lower()
+    if media_type not in MEDIA_TYPES:
+        raise PayloadError(f"Desteklenmeyen içerik tipi: {media_type or 'yok'}")
+    return media_type
+
+def _code_dtype(n_values):
+    # Sunucu geçersiz kodlar için sözlük uzunluğunu kullandığından sınırlar dahil değildir
+    return np.uint8 if n_values < 256 else np.uint16 if n_values < 65536 else np.uint32
+
+def _factorize(values):
+    """Metin değerlerini (sözlük, kodlar) çiftine çevir; sözlük ilk görülme sırasındadır"""
+    positions = {}
+    codes = [positions.setdefault(v, len(positions)) for v in values]
+    return list(positions), np.asarray(codes, dtype=_code_dtype(len(positions)))
+
+def _columns_of(houses):
+    """Ev listesini, sütun sözlüğünü ya da DataFrame'i {alan: değerler} sözlüğüne çevir"""
+    if isinstance(houses, dict) or hasattr(houses, 'columns'):
+        return {str(name): houses[name] for name in (houses.columns if hasattr(houses, 'columns') else houses)}
+    if not houses:
+        return {}
+    return {name: [house[name] for house in houses] for name in houses[0]}
+
+def encode_houses(houses, media_type=MSGPACK_MEDIA_TYPE):
+    """Evleri sütun bazlı ikili gövdeye çevir (istemci tarafı)
+
+    houses ev sözlüklerinin listesi, {alan: değerler} sözlüğü ya da pandas
+    DataFrame olabilir. Metin sütunları sözlük kodlanır, diğerleri float32 olur.
+    """
+    columns = {}
+    n_rows = 0
+    for name, values in _columns_of(houses).items():
+        values = values.tolist() if hasattr(values, 'tolist') else list(values)
+        n_rows = len(values)
+        if values and isinstance(values[0], str):
+            columns[name] = _factorize(values)
+        else:
+            columns[name] = np.asarray(values, dtype=np.float32)
+
+    if media_type == MSGPACK_MEDIA_TYPE:
+        _check_msgpack()
+        kolonlar = {}
+        for name, column in columns.items():
+            if isinstance(column, tuple):
+                sozluk, kodlar = column
+                kolonlar[name] = {'sozluk': sozluk, 'kodlar': kodlar.tobytes(), 'tip': kodlar.dtype.str}
+            else:
+                kolonlar[name] = {'degerler': column.tobytes(), 'tip': column.dtype.str}
+        return msgpack.packb({'n': n_rows, 'kolonlar': kolonlar})
+
+    if media_type == ARROW_MEDIA_TYPE:
+        pa = _pyarrow()
+        arrays = [
+            pa.DictionaryArray.from_arrays(column[1], pa.array(column[0], type=pa.string()))
+            if isinstance(column, tuple) else pa.array(column)
+            for column in columns.values()
+        ]
+        return _arrow_stream(pa, pa.RecordBatch.from_arrays(arrays, names=list(columns)))
+
+    raise PayloadError(f"Desteklenmeyen içerik tipi: {media_type}")
+
+def _arrow_stream(pa, batch):
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+def _read_arrow(pa, body):
+    try:
+        return pa.ipc.open_stream(body).read_all()
+    except (pa.ArrowInvalid, OSError) as e:
+        raise PayloadError(f"Arrow gövdesi çözülemedi: {e}") from None
+
+def _column_array(name, data, tip, kinds):
+    """msgpack sütun baytlarını istemcinin bildirdiği tipte diziye çevir
+
+    Tip istemciden geldiği için yalnızca izin verilen türler (kinds) kabul edilir;
+    metin, nesne, tarih gibi tipler ya da öğe boyutuna bölünmeyen bayt uzunlukları
+    PayloadError ile reddedilir.
+    """
+    try:
+        dtype = np.dtype(tip)
+    except TypeError:
+        raise PayloadError(f"{name} sütununun tipi geçersiz: {tip!r}") from None
+    if dtype.kind not in kinds or dtype.itemsize == 0:
+        raise PayloadError(f"{name} sütununun tipi desteklenmiyor: {tip!r}")
+    if not isinstance(data, bytes):
+        raise PayloadError(f"{name} sütunu bayt dizisi olmalıdır")
+    if len(data) % dtype.itemsize:
+        raise PayloadError(f"{name} sütununun uzunluğu ({len(data)} bayt) {dtype.itemsize} baytın katı değil")
+    return np.frombuffer(data, dtype=dtype)
+
+def decode_columns(body, media_type):
+    """İkili gövdeyi (satır sayısı, {alan: sütun}) olarak çöz (sunucu tarafı)
+
+    Sözlük kodlu sütunlar (sözlük, kodlar), sayısal sütunlar ndarray olarak döner.
+    Arrow'daki boş (null) değerler sayısal sütunlarda NaN, sözlük sütunlarında
+    geçersiz kod (sözlük uzunluğu) olur.
+    """
+    if media_type == MSGPACK_MEDIA_TYPE:
+        _check_msgpack()
+        try:
+            payload = msgpack.unpackb(body)
+            n_rows = int(payload['n'])
+            columns = {}
+            for name, column in payload['kolonlar'].items():
+                if 'sozluk' in column:
+                    codes = _column_array(name, column['kodlar'], column['tip'], CODE_KINDS)
+                    columns[name] = ([str(v) for v in column['sozluk']], codes)
+                else:
+                    columns[name] = _column_array(name, column['degerler'], column['tip'], VALUE_KINDS)
+        except PayloadError:
+            raise
+        except (ValueError, KeyError, TypeError, AttributeError, msgpack.UnpackException) as e:
+            raise PayloadError(f"msgpack gövdesi çözülemedi: {e}") from None
+        if n_rows < 0:
+            raise PayloadError(f"Geçersiz satır sayısı: {n_rows}")
+    else:
+        pa = _pyarrow()
+        table = _read_arrow(pa, body)
+        n_rows = table.num_rows
+        columns = {}
+        for name, column in zip(table.column_names, table.columns):
+            column = column.combine_chunks() if column.num_chunks != 1 else column.chunk(0)
+            if pa.types.is_dictionary(column.type):
+                dictionary = [str(v) for v in column.dictionary.to_pylist()]
+                codes = column.indices.fill_null(len(dictionary)).to_numpy(zero_copy_only=False)
+                columns[name] = (dictionary, codes)
+            elif pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+                # Sözlük kodlanmamış metin sütunu: sunucuda bir kez kodlanır
+                encoded = column.dictionary_encode()
+                dictionary = [str(v) for v in encoded.dictionary.to_pylist()]
+                columns[name] = (dictionary, encoded.indices.fill_null(len(dictionary)).to_numpy(zero_copy_only=False))
+            else:
+                try:
+                    columns[name] = column.cast(pa.float64()).to_numpy(zero_copy_only=False)
+                except pa.ArrowException:
+                    raise PayloadError(f"{name} sütunu sayıya çevrilemiyor: {column.type}") from None
+
+    for name, column in columns.items():
+        length = len(column[1]) if isinstance(column, tuple) else len(column)
+        if length != n_rows:
+            raise PayloadError(f"{name} sütununda {length} değer var, {n_rows} bekleniyordu")
+    return n_rows, columns
+
+def encode_predictions(columns, errors, media_type):
+    """Tahmin sütunlarını ve satır hatalarını yanıt gövdesine çevir (sunucu tarafı)
+
+    columns {ad: float64 dizi} sözlüğüdür (hatalı satırlarda NaN); errors
+    {satır: mesaj} sözlüğüdür.
+    """
+    if media_type == MSGPACK_MEDIA_TYPE:
+        _check_msgpack()
+        n_rows = len(next(iter(columns.values())))
+        return msgpack.packb({
+            'n': n_rows,
+            'kolonlar': {name: {'degerler': np.ascontiguousarray(values, dtype='<f8').tobytes(), 'tip': '<f8'}
+                         for name, values in columns.items()},
+            'hatalar': {str(i): message for i, message in errors.items()},
+        })
+
+    pa = _pyarrow()
+    n_rows = len(next(iter(columns.values())))
+    messages = [None] * n_rows
+    for i, message in errors.items():
+        messages[i] = message
+    arrays = [pa.array(values, type=pa.float64(), from_pandas=True) for values in columns.values()]
+    arrays.append(pa.array(messages, type=pa.string()))
+    return _arrow_stream(pa, pa.RecordBatch.from_arrays(arrays, names=list(columns) + [ERROR_COLUMN]))
+
+def decode_predictions(body, media_type):
+    """Yanıt gövdesini {sütun: float64 dizi, "hatalar": {satır: mesaj}} olarak çöz (istemci tarafı)"""
+    if media_type == MSGPACK_MEDIA_TYPE:
+        _check_msgpack()
+        payload = msgpack.unpackb(body)
+        result = {name: np.frombuffer(column['degerler'], dtype=np.dtype(column['tip']))
+                  for name, column in payload['kolonlar'].items()}
+        result['hatalar'] = {int(i): message for i, message in payload['hatalar'].items()}
+        return result
+
+    pa = _pyarrow()
+    table = _read_arrow(pa, body)
+    result = {name: table.column(name).to_numpy() for name in table.column_names if name != ERROR_COLUMN}
+    messages = table.column(ERROR_COLUMN)
+    result['hatalar'] = {i: message for i, message in enumerate(messages.to_pylist()) if message is not None}
+    return result
@@ -0,0 +1,309 @@
+"""
+Toplu Tahmin İşleri - Kalıcı İş Kuyruğu
+Büyük yeniden fiyatlama istekleri HTTP bağlantısını açık tutmadan iş olarak
+alınır: girdiler bir kez doğrulanıp özellik matrisine çevrilir ve diske yazılır,
+yerel işçi süreçleri (ProcessPoolExecutor) matrisi parça parça vektörel olarak
+tahmin eder, sonuçlar SQLite veritabanına yazılır. Harici bir mesaj kuyruğu
+gerekmez. API yeniden başladığında yarım kalan parçalar kaldığı yerden devam
+eder; aynı girdilerle (ve aynı modelle) gelen işler yeniden hesaplanmaz.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+# İş dosyalarının ve veritabanının tutulduğu klasör
+JOBS_DIR = os.environ.get("BULK_JOBS_DIR", "jobs")
+
+# Bir işçiye tek seferde verilen satır sayısı
+CHUNK_SIZE = 10_000
+
+# İşçi süreç sayısı
+WORKERS = int(os.environ.get("BULK_WORKERS", min(4, os.cpu_count() or 1)))
+
+# İş durumları
+BEKLIYOR = "bekliyor"
+CALISIYOR = "calisiyor"
+TAMAMLANDI = "tamamlandi"
+HATA = "hata"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    input_hash TEXT NOT NULL,
+    status TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    quantiles TEXT,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_input_hash ON jobs (input_hash);
+CREATE TABLE IF NOT EXISTS chunks (
+    job_id TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    end INTEGER NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (job_id, start)
+);
+CREATE TABLE IF NOT EXISTS results (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    price REAL,
+    interval TEXT,
+    error TEXT,
+    PRIMARY KEY (job_id, idx)
+);
+"""
+
+def input_hash(items, quantiles, model_key):
+    """Girdi listesi, yüzdelikler ve model sürümünden işi tanımlayan özet"""
+    raw = json.dumps([items, quantiles, model_key], ensure_ascii=False, sort_keys=True,
+                     separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+# İşçi süreçlerinde bir kez yüklenen API modülü (yalnızca orman bileşenleri)
+_api = None
+
+def _worker_init():
+    """İşçi süreci başlarken yalnızca tahmin için gereken ormanı API ile aynı şekilde yükle"""
+    global _api
+    import api
+    api.orman_bilesenlerini_yukle()
+    _api = api
+
+def _score_chunk(job_dir, start, end, quantiles):
+    """Matrisin [start, end) satırlarını tahmin et (işçi sürecinde çalışır)"""
+    X = np.load(os.path.join(job_dir, "X.npy"), mmap_mode="r")
+    tahminler, araliklar = _api.toplu_model_tahmini(np.asarray(X[start:end]), quantiles)
+    return np.asarray(tahminler, dtype=np.float64).tolist(), araliklar
+
+class JobManager:
+    """Toplu tahmin işlerini kabul eden, işçilere dağıtan ve sonuçları saklayan yönetici"""
+
+    def __init__(self, jobs_dir=JOBS_DIR, workers=WORKERS, chunk_size=CHUNK_SIZE):
+        self.jobs_dir = jobs_dir
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._pool = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+        os.makedirs(jobs_dir, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(jobs_dir, "jobs.db"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def _job_dir(self, job_id):
+        return os.path.join(self.jobs_dir, job_id)
+
+    def _executor(self):
+        if self._pool is not None and getattr(self._pool, "_broken", False):
+            # Bir işçi beklenmedik şekilde öldüyse havuz kullanılamaz; yenisi açılır
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._pool is None:
+            # spawn: işçiler API sürecinin iş parçacıklarını ve açık bağlantılarını devralmaz
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_worker_init,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def find(self, digest):
+        """Aynı girdilerle bekleyen, çalışan ya da tamamlanmış iş varsa kimliğini döndür"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id FROM jobs WHERE input_hash = ? AND status != ? ORDER BY created_at DESC LIMIT 1",
+                (digest, HATA)
+            ).fetchone()
+        return row[0] if row else None
+
+    def submit(self, digest, X, indices, errors, total, quantiles=None):
+        """Yeni iş oluştur ve parçalarını işçilere gönder; iş kimliğini döndür
+
+        X: geçerli evlerin (n, özellik sayısı) matrisi, indices: bu satırların istek
+        içindeki sıraları, errors: {sıra: hata mesajı} (doğrulamada elenen evler).
+        Geçerli ev yoksa iş parça oluşturulmadan tamamlanmış olarak kaydedilir.
+        """
+        job_id = uuid.uuid4().hex
+        job_dir = self._job_dir(job_id)
+        os.makedirs(job_dir, exist_ok=True)
+        np.save(os.path.join(job_dir, "X.npy"), np.asarray(X, dtype=np.float64))
+        np.save(os.path.join(job_dir, "indices.npy"), np.asarray(indices, dtype=np.int64))
+
+        chunks = [(job_id, s, min(s + self.chunk_size, len(indices)))
+                  for s in range(0, len(indices), self.chunk_size)]
+        status = BEKLIYOR if chunks else TAMAMLANDI
+        now = datetime.now().isoformat()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO jobs (id, input_hash, status, total, quantiles, created_at, finished_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, digest, status, total, json.dumps(quantiles), now, None if chunks else now)
+            )
+            self._db.executemany("INSERT INTO chunks (job_id, start, end) VALUES (?, ?, ?)", chunks)
+            self._db.executemany(
+                "INSERT INTO results (job_id, idx, error) VALUES (?, ?, ?)",
+                [(job_id, i, msg) for i, msg in errors.items()]
+            )
+
+        for _, start, end in chunks:
+            self._dispatch(job_id, start, end, quantiles)
+        return job_id
+
+    def _dispatch(self, job_id, start, end, quantiles):
+        future = self._executor().submit(_score_chunk, self._job_dir(job_id), start, end, quantiles)
+        future.add_done_callback(lambda f: self._store_chunk(job_id, start, end, f))
+
+    def _store_chunk(self, job_id, start, end, future):
+        """Bir parçanın sonuçlarını tek transaction'da yaz ve iş durumunu güncelle"""
+        if future.cancelled():
+            # Kapanışta iptal edilen parça bir sonraki resume'da işlenir
+            return
+        try:
+            tahminler, araliklar = future.result()
+        except Exception as e:
+            with self._lock:
+                if self._closed:
+                    return
+                with self._db:
+                    self._db.execute(
+                        "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                        (HATA, str(e), datetime.now().isoformat(), job_id)
+                    )
+            return
+
+        indices = np.load(os.path.join(self._job_dir(job_id), "indices.npy"), mmap_mode="r")[start:end]
+        rows = [
+            (job_id, int(i), p, json.dumps(araliklar[k], ensure_ascii=False) if araliklar else None)
+            for k, (i, p) in enumerate(zip(indices, tahminler))
+        ]
+        with self._lock:
+            if self._closed:
+                # Veritabanı kapandıktan sonra gelen parça bir sonraki resume'da yeniden işlenir
+                return
+            with self._db:
+                # Yeniden başlatmada aynı parça tekrar işlenirse satırlar üzerine yazılır
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO results (job_id, idx, price, interval) VALUES (?, ?, ?, ?)", rows
+                )
+                self._db.execute("UPDATE chunks SET done = 1 WHERE job_id = ? AND start = ?", (job_id, start))
+                remaining = self._db.execute(
+                    "SELECT COUNT(*) FROM chunks WHERE job_id = ? AND done = 0", (job_id,)
+                ).fetchone()[0]
+                if remaining:
+                    self._db.execute("UPDATE jobs SET status = ? WHERE id = ? AND status = ?",
+                                     (CALISIYOR, job_id, BEKLIYOR))
+                else:
+                    self._db.execute("UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status != ?",
+                                     (TAMAMLANDI, datetime.now().isoformat(), job_id, HATA))
+
+    def resume(self):
+        """Önceki çalışmadan yarım kalan parçaları yeniden işçilere gönder; gönderilen parça sayısını döndür"""
+        with self._lock:
+            pending = self._db.execute(
+                "SELECT c.job_id, c.start, c.end, j.quantiles FROM chunks c JOIN jobs j ON j.id = c.job_id "
+                "WHERE c.done = 0 AND j.status IN (?, ?)", (BEKLIYOR, CALISIYOR)
+            ).fetchall()
+        for job_id, start, end, quantiles in pending:
+            self._dispatch(job_id, start, end, json.loads(quantiles))
+        return len(pending)
+
+    def status(self, job_id):
+        """İşin durumunu ve ilerlemesini döndür (iş yoksa None)"""
+        with self._lock:
+            job = self._db.execute(
+                "SELECT status, total, error, created_at, finished_at FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if job is None:
+                return None
+            done_rows, errors = self._db.execute(
+                "SELECT COUNT(*), COUNT(error) FROM results WHERE job_id = ?", (job_id,)
+            ).fetchone()
+
+        status, total, error, created_at, finished_at = job
+        return {
+            "is_id": job_id,
+            "durum": status,
+            "toplam_ev": total,
+            "islenen_ev": done_rows,
+            "hatali_ev": errors,
+            "ilerleme": round(done_rows / total, 4) if total else 1.0,
+            "hata": error,
+            "olusturulma": created_at,
+            "tamamlanma": finished_at,
+        }
+
+    def _ready_bound(self, job_id):
+        """Sonuçları kesin olarak yazılmış ilk sıra numarasından sonraki sıra (iş bittiyse None)
+
+        Parçalar sırasız tamamlanır; ilk bitmemiş parçanın ilk evinden önceki
+        tüm sıralar (tahminler ve doğrulama hataları) hazırdır.
+        """
+        first_pending = self._db.execute(
+            "SELECT MIN(start) FROM chunks WHERE job_id = ? AND done = 0", (job_id,)
+        ).fetchone()[0]
+        if first_pending is None:
+            return None
+        indices = np.load(os.path.join(self._job_dir(job_id), "indices.npy"), mmap_mode="r")
+        return int(indices[first_pending])
+
+    def results(self, job_id, offset=0, limit=1000):
+        """İşin sonuçlarını sıra numarasına göre sayfa sayfa döndür; (sonuçlar, sonraki başlangıç)
+
+        İş sürerken yalnızca kesintisiz hazır olan baştaki kısım sayfalanır; böylece
+        sonraki başlangıcı izleyen istemci henüz bitmemiş parçaların evlerini
+        atlamaz. Sonraki başlangıç tüm sonuçlar okunduysa None'dır.
+        """
+        with self._lock:
+            bound = self._ready_bound(job_id)
+            if bound is None:
+                rows = self._db.execute(
+                    "SELECT idx, price, interval, error FROM results WHERE job_id = ? AND idx >= ? "
+                    "ORDER BY idx LIMIT ?", (job_id, offset, limit)
+                ).fetchall()
+            else:
+                rows = self._db.execute(
+                    "SELECT idx, price, interval, error FROM results WHERE job_id = ? AND idx >= ? AND idx < ? "
+                    "ORDER BY idx LIMIT ?", (job_id, offset, bound, limit)
+                ).fetchall()
+
+        sonuclar = []
+        for idx, price, interval, error in rows:
+            if error is not None:
+                sonuclar.append({"index": idx, "hata": error})
+            else:
+                sonuclar.append({
+                    "index": idx,
+                    "tahmin_fiyat": price,
+                    "tahmin_araligi": json.loads(interval) if interval else None,
+                })
+
+        if len(rows) == limit:
+            next_offset = rows[-1][0] + 1
+        elif bound is not None:
+            # İş sürüyor: hazır kısmın sonundan tekrar sorulmalı
+            next_offset = max(offset, bound)
+        else:
+            next_offset = None
+        return sonuclar, next_offset
+
+    def shutdown(self):
+        """İşçileri durdur (yarım kalan parçalar bir sonraki resume'da işlenir)
+
+        Bekleyen parçalar iptal edilir, çalışanların bitmesi ve sonuçlarının
+        yazılması beklenir; veritabanı ancak ondan sonra kapatılır.
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        with self._lock:
+            self._closed = True
+            self._db.close()
@@ -0,0 +1,235 @@
+"""
+Benzer Evler (Emsal) İndeksi
+Eğitim sırasında `turkiye_ev_fiyatlari.csv` satırlarından şehre göre bölümlenmiş
+düz NumPy dizileri oluşturur: her bölümde ölçeklenmiş sayısal özellikler,
+kategorik kodlar ve fiyatlar art arda tutulur. Sorgu yalnızca evin şehrine ait
+bölümde vektörel mesafe hesabı yapar; böylece tüm veri seti taranmaz ve toplu
+sorgular şehir bazında tek seferde cevaplanır. API bu indeksi pandas veya
+scikit-learn olmadan yükler.
+
+Mesafe: ağırlıklı z-skor farklarının karesi + farklı olan her kategorik alan
+için o alanın ağırlığı.
+
+Kullanım:
+    python comparables.py          # mevcut model için indeksi yeniden oluştur
+
+    from comparables import load_comparables_index
+    index = load_comparables_index()
+    [(satirlar, mesafeler)] = index.query(X, k=5)
+"""
+
+import json
+import os
+
+import numpy as np
+
+# İndeks dosyalarının varsayılan yolları
+COMPARABLES_ARRAYS_PATH = 'model/comparables.npz'
+COMPARABLES_META_PATH = 'model/comparables.json'
+
+# Bölümleme alanı: emsaller her zaman aynı şehirden seçilir
+PARTITION_FEATURE = 'sehir'
+
+# Sayısal özellikler ve mesafedeki ağırlıkları (z-skor üzerinden)
+NUMERIC_WEIGHTS = {
+    'net_metrekare': 2.0,
+    'brut_metrekare': 1.0,
+    'bulundugu_kat': 0.5,
+    'kat_sayisi': 0.5,
+    'banyo_sayisi': 0.5,
+}
+
+# Kategorik özellikler: değer farklıysa mesafeye eklenen ağırlık
+CATEGORICAL_WEIGHTS = {
+    'semt': 2.0,
+    'ev_tipi': 1.5,
+    'oda_sayisi': 1.0,
+    'bina_yasi': 1.0,
+    'balkon': 0.25,
+    'isitma_tipi': 0.25,
+    'otopark': 0.25,
+    'site_ici': 0.25,
+    'esyali_durum': 0.25,
+}
+
+# Varsayılan ve en fazla emsal sayısı
+DEFAULT_K = 5
+MAX_K = 50
+
+def encode_frame(df, encoder_classes, feature_names):
+    """Ham veri setini API ile aynı kodlamayla (n, n_ozellik) float32 matrise çevir
+
+    LabelEncoder sınıfları sıralı olduğundan kod, değerin sınıf listesindeki sırasıdır.
+    """
+    import pandas as pd
+
+    columns = []
+    for feature in feature_names:
+        col = df[feature]
+        if feature in encoder_classes:
+            codes = pd.Categorical(col.astype(str), categories=encoder_classes[feature]).codes
+            if (codes < 0).any():
+                raise ValueError(f"{feature} sütununda encoder'da olmayan değerler var")
+            columns.append(codes)
+        elif feature == 'bulundugu_kat':
+            columns.append(pd.to_numeric(col.astype(str).replace('Bahçe Katı', '0')).to_numpy())
+        else:
+            columns.append(col.to_numpy())
+    return np.column_stack(columns).astype(np.float32)
+
+def build_comparables_index(X, prices, feature_names, encoder_classes,
+                            arrays_path=COMPARABLES_ARRAYS_PATH, meta_path=COMPARABLES_META_PATH):
+    """Kodlanmış özellik matrisi ve fiyatlardan şehre göre bölümlenmiş emsal indeksini kaydet"""
+    X = np.asarray(X, dtype=np.float32)
+    prices = np.asarray(prices, dtype=np.float64)
+    feature_index = {name: i for i, name in enumerate(feature_names)}
+
+    # Satırları şehir koduna göre sırala; her şehir ardışık bir bölüm olur
+    city = X[:, feature_index[PARTITION_FEATURE]].astype(np.int64)
+    order = np.argsort(city, kind='stable')
+    n_cities = len(encoder_classes[PARTITION_FEATURE])
+    offsets = np.searchsorted(city[order], np.arange(n_cities + 1)).astype(np.int64)
+
+    numeric_cols = [feature_index[f] for f in NUMERIC_WEIGHTS]
+    mean = X[:, numeric_cols].mean(axis=0)
+    std = X[:, numeric_cols].std(axis=0)
+    std[std == 0] = 1.0
+
+    np.savez(
+        arrays_path,
+        offsets=offsets,
+        features=X[order],
+        numeric=((X[order][:, numeric_cols] - mean) / std).astype(np.float32),
+        categorical=X[order][:, [feature_index[f] for f in CATEGORICAL_WEIGHTS]].astype(np.int32),
+        prices=prices[order],
+    )
+
+    meta = {
+        'format_version': 1,
+        'n_rows': int(len(X)),
+        'feature_names': list(feature_names),
+        'encoder_classes': encoder_classes,
+        'numeric_features': list(NUMERIC_WEIGHTS),
+        'numeric_weights': list(NUMERIC_WEIGHTS.values()),
+        'numeric_mean': mean.tolist(),
+        'numeric_std': std.tolist(),
+        'categorical_features': list(CATEGORICAL_WEIGHTS),
+        'categorical_weights': list(CATEGORICAL_WEIGHTS.values()),
+    }
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    return meta
+
+class ComparablesIndex:
+    """Şehre göre bölümlenmiş emsal indeksinde k en yakın ev araması"""
+
+    def __init__(self, arrays, meta):
+        self.offsets = arrays['offsets']
+        self.features = arrays['features']
+        self.numeric = arrays['numeric']
+        self.categorical = arrays['categorical']
+        self.prices = arrays['prices']
+        self.feature_names = meta['feature_names']
+        self.encoder_classes = meta['encoder_classes']
+
+        feature_index = {name: i for i, name in enumerate(self.feature_names)}
+        self._city_col = feature_index[PARTITION_FEATURE]
+        self._numeric_cols = [feature_index[f] for f in meta['numeric_features']]
+        self._categorical_cols = [feature_index[f] for f in meta['categorical_features']]
+        self._mean = np.asarray(meta['numeric_mean'], dtype=np.float32)
+        self._std = np.asarray(meta['numeric_std'], dtype=np.float32)
+        # Karekök ağırlıklar: (w * z)^2 yerine (sqrt(w) * z)^2 ile tek çarpım
+        self._numeric_weights = np.sqrt(np.asarray(meta['numeric_weights'], dtype=np.float32))
+        self._categorical_weights = np.asarray(meta['categorical_weights'], dtype=np.float32)
+
+    def query(self, X, k=DEFAULT_K):
+        """Her sorgu satırı için (indeksler, mesafeler) listesi döndür
+
+        X API'deki özellik sırasıyla kodlanmış (n, n_ozellik) matristir. Sorgular
+        şehre göre gruplanır ve her şehir için tek bir vektörel hesap yapılır.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        numeric = (X[:, self._numeric_cols] - self._mean) / self._std * self._numeric_weights
+        categorical = X[:, self._categorical_cols].astype(np.int32)
+        cities = X[:, self._city_col].astype(np.int64)
+
+        results = [None] * len(X)
+        for city in np.unique(cities):
+            rows = np.flatnonzero(cities == city)
+            start, end = self.offsets[city], self.offsets[city + 1]
+            if end == start:
+                for r in rows:
+                    results[r] = (np.empty(0, np.int64), np.empty(0, np.float32))
+                continue
+
+            part_numeric = self.numeric[start:end] * self._numeric_weights
+            diff = numeric[rows, None, :] - part_numeric[None, :, :]
+            dist = np.einsum('qpf,qpf->qp', diff, diff)
+            mismatch = categorical[rows, None, :] != self.categorical[None, start:end, :]
+            dist += mismatch @ self._categorical_weights
+
+            kk = min(k, end - start)
+            top = np.argpartition(dist, kk - 1, axis=1)[:, :kk]
+            top_dist = np.take_along_axis(dist, top, axis=1)
+            order = np.argsort(top_dist, axis=1, kind='stable')
+            top = np.take_along_axis(top, order, axis=1)
+            top_dist = np.sqrt(np.take_along_axis(top_dist, order, axis=1))
+            for j, r in enumerate(rows):
+                results[r] = (top[j] + start, top_dist[j])
+        return results
+
+    def describe(self, i, distance):
+        """İndeksteki bir evi API alan adlarıyla ve fiyatıyla sözlük olarak döndür"""
+        row = self.features[i]
+        ev = {}
+        for j, name in enumerate(self.feature_names):
+            value = row[j]
+            if name in self.encoder_classes:
+                ev[name] = self.encoder_classes[name][int(value)]
+            elif name == 'bulundugu_kat':
+                ev[name] = 'Bahçe Katı' if value == 0 else str(int(value))
+            else:
+                ev[name] = int(value)
+        ev['fiyat_tl'] = float(self.prices[i])
+        ev['benzerlik_mesafesi'] = round(float(distance), 4)
+        return ev
+
+def load_comparables_index(arrays_path=COMPARABLES_ARRAYS_PATH, meta_path=COMPARABLES_META_PATH):
+    """Kaydedilmiş emsal indeksini yükle"""
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+
+    with np.load(arrays_path) as data:
+        arrays = {key: data[key] for key in data.files}
+
+    return ComparablesIndex(arrays, meta)
+
+def comparables_index_available():
+    """Emsal indeksi dosyalarının var olup olmadığını kontrol et"""
+    return os.path.exists(COMPARABLES_ARRAYS_PATH) and os.path.exists(COMPARABLES_META_PATH)
+
+def main():
+    """Mevcut model için emsal indeksini veri setinden oluştur (yeniden eğitim gerekmez)"""
+    import pandas as pd
+    from forest_export import EXPORT_META_PATH
+
+    print("🏘️  Emsal indeksi oluşturuluyor...")
+    try:
+        with open(EXPORT_META_PATH, 'r', encoding='utf-8') as f:
+            export_meta = json.load(f)
+        df = pd.read_csv('turkiye_ev_fiyatlari.csv')
+    except FileNotFoundError as e:
+        print(f"❌ Dosya bulunamadı: {e}")
+        print("   Önce 'python train_and_save_model.py' komutunu çalıştırın.")
+        return
+
+    feature_names = export_meta['feature_names']
+    encoder_classes = export_meta['encoder_classes']
+    X = encode_frame(df, encoder_classes, feature_names)
+    meta = build_comparables_index(X, df['fiyat_tl'].to_numpy(), feature_names, encoder_classes)
+    print(f"   ✅ {meta['n_rows']} ev indekslendi:")
+    print(f"      • {COMPARABLES_ARRAYS_PATH}")
+    print(f"      • {COMPARABLES_META_PATH}")
+
+if __name__ == "__main__":
+    main()
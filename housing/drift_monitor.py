@@ -0,0 +1,240 @@
+"""
+Girdi ve Tahmin Dağılımı İzleme (Drift)
+API'ye gelen evlerin dağılımını eğitim verisiyle karşılaştırmak için sabit
+bellekli akış istatistikleri tutar. Eğitim sırasında her kategorik alanın
+değer sayıları ve `net_metrekare` ile tahmin fiyatı için ondalık (decile)
+sınırlı histogramlar referans olarak kaydedilir. Serviste her istek yalnızca
+zaten kodlanmış özellik matrisinin ve tahminlerin referansını bir listeye
+ekler (kopyalama yok); BUFFER_ROWS satır biriktiğinde ya da rapor istendiğinde
+satırlar tek matriste toplu olarak (bincount / searchsorted) histogramlara
+işlenir, böylece bellek kullanımı sabit kalır. Rapor her alan için PSI, sayısal alanlar
+için histogram üzerinden KS değeri ve en sık değerlerin payındaki değişimi verir.
+
+Kullanım:
+    python drift_monitor.py        # mevcut model için referans histogramları oluştur
+
+    from drift_monitor import load_drift_monitor
+    izleyici = load_drift_monitor()
+    izleyici.record(X, tahminler)   # (n, n_ozellik) kodlanmış matris
+    izleyici.report()
+"""
+
+import json
+import os
+
+import numpy as np
+
+# Referans histogramlarının varsayılan yolu
+DRIFT_REFERENCE_PATH = 'model/drift_reference.json'
+
+# Histogramı tutulan sayısal özellikler (tahmin fiyatı ayrıca eklenir)
+NUMERIC_FEATURES = ('net_metrekare',)
+PREDICTION_FIELD = 'tahmin_fiyat'
+
+# Sayısal histogramların kutu sayısı (eğitim verisinin ondalıkları)
+NUMERIC_BINS = 10
+
+# Histogramlara işlenmeden önce satırların biriktirildiği tampon boyutu
+BUFFER_ROWS = 4096
+
+# Raporda listelenen en sık değer sayısı
+TOP_VALUES = 5
+
+# PSI eşikleri: < 0.1 kararlı, < 0.25 orta, üzeri yüksek kayma
+PSI_THRESHOLDS = (0.1, 0.25)
+
+# Boş kutularda log(0) olmaması için oranlara eklenen küçük pay
+EPSILON = 1e-4
+
+def _numeric_edges(values, bins=NUMERIC_BINS):
+    """Eğitim değerlerinin iç yüzdelik sınırları (tekrarlananlar atılır)"""
+    quantiles = np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1])
+    return np.unique(quantiles)
+
+def _bin_counts(values, edges):
+    """Değerleri sınırlara göre len(edges) + 1 kutuya say"""
+    return np.bincount(np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1)
+
+def build_drift_reference(X, predictions, feature_names, encoder_classes, path=DRIFT_REFERENCE_PATH):
+    """Eğitim matrisi ve model tahminlerinden referans histogramlarını kaydet
+
+    Kategorik alanlar (bulundugu_kat kodu dahil) kod başına sayılır; sayısal
+    alanlar ve tahmin fiyatı eğitim ondalıklarına göre kutulanır.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    predictions = np.asarray(predictions, dtype=np.float64)
+    fields = {}
+
+    for j, name in enumerate(feature_names):
+        if name in NUMERIC_FEATURES:
+            edges = _numeric_edges(X[:, j])
+            fields[name] = {'column': j, 'kind': 'numeric', 'edges': edges.tolist(),
+                            'counts': _bin_counts(X[:, j], edges).tolist()}
+        elif name in encoder_classes or name == 'bulundugu_kat':
+            codes = X[:, j].astype(np.int64)
+            if name in encoder_classes:
+                labels = [str(v) for v in encoder_classes[name]]
+            else:
+                labels = ['Bahçe Katı' if code == 0 else str(code) for code in range(codes.max() + 1)]
+            fields[name] = {'column': j, 'kind': 'categorical', 'labels': labels,
+                            'counts': np.bincount(codes, minlength=len(labels)).tolist()}
+
+    edges = _numeric_edges(predictions)
+    fields[PREDICTION_FIELD] = {'column': None, 'kind': 'numeric', 'edges': edges.tolist(),
+                                'counts': _bin_counts(predictions, edges).tolist()}
+
+    reference = {'format_version': 1, 'n_rows': int(len(X)), 'fields': fields}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(reference, f, ensure_ascii=False)
+    return reference
+
+def psi(expected, actual):
+    """Population Stability Index: iki sayım dizisi arasındaki dağılım kayması"""
+    e = np.asarray(expected, dtype=np.float64)
+    a = np.asarray(actual, dtype=np.float64)
+    e = e / e.sum() + EPSILON
+    a = a / a.sum() + EPSILON
+    return float(np.sum((a - e) * np.log(a / e)))
+
+def ks_from_counts(expected, actual):
+    """Aynı kutulardaki iki histogramın birikimli dağılımları arasındaki en büyük fark (KS)"""
+    e = np.cumsum(expected) / np.sum(expected)
+    a = np.cumsum(actual) / np.sum(actual)
+    return float(np.max(np.abs(a - e)))
+
+def drift_level(value):
+    """PSI değerini kararlı / orta / yüksek olarak sınıflandır"""
+    if value < PSI_THRESHOLDS[0]:
+        return 'kararli'
+    if value < PSI_THRESHOLDS[1]:
+        return 'orta'
+    return 'yuksek'
+
+class DriftMonitor:
+    """Gelen istekleri sabit bellekte histogramlara işleyen ve referansla karşılaştıran izleyici
+
+    record() yalnızca listeye referans ekler. API uç noktaları olay döngüsünde
+    (tek iş parçacığında) çağırdığından kilit kullanılmaz.
+    """
+
+    def __init__(self, reference, buffer_rows=BUFFER_ROWS):
+        self.reference = reference
+        self.fields = reference['fields']
+        self.buffer_rows = buffer_rows
+        self._edges = {name: np.asarray(f['edges']) for name, f in self.fields.items() if f['kind'] == 'numeric'}
+        self.reset()
+
+    def reset(self):
+        """Toplanan canlı istatistikleri sıfırla"""
+        self._rows = []
+        self._predictions = []
+        self._pending = 0
+        self.n_rows = 0
+        self.n_predictions = 0
+        self.counts = {name: np.zeros(len(f['counts']), dtype=np.int64) for name, f in self.fields.items()}
+
+    def record(self, X, predictions=None):
+        """Kodlanmış özellik satırlarını (ve varsa tahminleri) tampona ekle
+
+        Diziler kopyalanmaz, yalnızca referansları tutulur; çağıran bu dizileri
+        sonradan değiştirmemelidir. predictions None ise (ör. henüz tahmin
+        edilmemiş toplu iş girdileri) satırlar yalnızca girdi dağılımına sayılır.
+        """
+        self._rows.append(X)
+        self._predictions.append(predictions)
+        self._pending += len(X)
+        if self._pending >= self.buffer_rows:
+            self.flush()
+
+    def flush(self):
+        """Tampondaki satırları tek matriste birleştirip histogramlara işle"""
+        if not self._rows:
+            return
+        X = np.concatenate(self._rows).astype(np.float64, copy=False)
+        predictions = np.concatenate([
+            np.full(len(x), np.nan) if p is None else np.asarray(p, dtype=np.float64)
+            for x, p in zip(self._rows, self._predictions)
+        ])
+        self._rows = []
+        self._predictions = []
+        self._pending = 0
+        self._fold(X, predictions)
+
+    def _fold(self, X, predictions):
+        self.n_rows += len(X)
+        for name, field in self.fields.items():
+            if name == PREDICTION_FIELD:
+                values = predictions[~np.isnan(predictions)]
+                self.n_predictions += len(values)
+                self.counts[name] += _bin_counts(values, self._edges[name])
+            elif field['kind'] == 'numeric':
+                self.counts[name] += _bin_counts(X[:, field['column']], self._edges[name])
+            else:
+                # Bilinmeyen kodlar son kutuya sayılır (girdi doğrulaması bunları zaten eler)
+                codes = np.clip(X[:, field['column']].astype(np.int64), 0, len(self.counts[name]) - 1)
+                self.counts[name] += np.bincount(codes, minlength=len(self.counts[name]))
+
+    def report(self):
+        """Her alan için referansa göre PSI (sayısal alanlarda KS) ve en sık değer paylarını döndür"""
+        self.flush()
+        alanlar = {}
+        for name, field in self.fields.items():
+            live = self.counts[name]
+            if not live.sum():
+                continue
+            expected = np.asarray(field['counts'])
+            value = psi(expected, live)
+            sonuc = {'psi': round(value, 4), 'seviye': drift_level(value), 'gozlem': int(live.sum())}
+
+            if field['kind'] == 'numeric':
+                sonuc['ks'] = round(ks_from_counts(expected, live), 4)
+            else:
+                live_share = live / live.sum()
+                expected_share = expected / expected.sum()
+                sonuc['en_sik_degerler'] = [
+                    {'deger': field['labels'][i], 'canli_pay': round(float(live_share[i]), 4),
+                     'egitim_pay': round(float(expected_share[i]), 4)}
+                    for i in np.argsort(-live)[:TOP_VALUES] if live[i]
+                ]
+            alanlar[name] = sonuc
+
+        en_yuksek = max(alanlar.items(), key=lambda item: item[1]['psi'], default=(None, None))
+        return {
+            'gozlenen_ev': self.n_rows,
+            'gozlenen_tahmin': self.n_predictions,
+            'referans_ev': self.reference['n_rows'],
+            'en_yuksek_kayma': en_yuksek[0],
+            'genel_seviye': en_yuksek[1]['seviye'] if en_yuksek[1] else None,
+            'alanlar': alanlar,
+        }
+
+def load_drift_monitor(path=DRIFT_REFERENCE_PATH):
+    """Kaydedilmiş referans histogramlarıyla izleyici oluştur"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return DriftMonitor(json.load(f))
+
+def drift_reference_available():
+    """Referans histogram dosyasının var olup olmadığını kontrol et"""
+    return os.path.exists(DRIFT_REFERENCE_PATH)
+
+def main():
+    """Mevcut model için referans histogramlarını veri setinden oluştur (yeniden eğitim gerekmez)"""
+    import pandas as pd
+    from comparables import encode_frame
+    from forest_export import load_exported_forest
+
+    print("📈 Drift referans histogramları oluşturuluyor...")
+    try:
+        model = load_exported_forest()
+        df = pd.read_csv('turkiye_ev_fiyatlari.csv')
+    except FileNotFoundError as e:
+        print(f"❌ Dosya bulunamadı: {e}")
+        print("   Önce 'python train_and_save_model.py' komutunu çalıştırın.")
+        return
+
+    X = encode_frame(df, model.encoder_classes, model.feature_names)
+    reference = build_drift_reference(X, model.predict(X), model.feature_names, model.encoder_classes)
+    print(f"   ✅ {reference['n_rows']} ev, {len(reference['fields'])} alan: {DRIFT_REFERENCE_PATH}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Hızlı JSON Yanıt Yardımcıları
+Tahmin yanıtlarını orjson ile serileştirir (yoksa standart json kullanılır) ve
+değişmeyen yanıtları bir kez serileştirip ETag ile sunar.
+"""
+
+import hashlib
+import json
+
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # orjson opsiyoneldir
+    orjson = None
+
+def dumps(content) -> bytes:
+    """Python nesnesini UTF-8 JSON baytlarına çevir"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """FastAPI'nin genel encoder'ını atlayarak doğrudan orjson/json ile yanıt üret"""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+class StaticJSON:
+    """Bir kez serileştirilmiş, ETag'i önceden hesaplanmış sabit yanıt"""
+
+    def __init__(self, content):
+        self.body = dumps(content)
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest()[:20] + '"'
+
+    def response(self, if_none_match=None) -> Response:
+        """İstemcideki kopya güncelse 304, değilse önceden hazırlanmış gövdeyi döndür"""
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        if if_none_match is not None:
+            etags = [tag.strip() for tag in if_none_match.split(",")]
+            if "*" in etags or self.etag in etags or f"W/{self.etag}" in etags:
+                return Response(status_code=304, headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
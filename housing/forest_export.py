@@ -0,0 +1,155 @@
+"""
+Random Forest Modelini Dışa Aktarma ve Hafif Değerlendirici
+Eğitilmiş RandomForestRegressor'ı düz NumPy dizilerine (struct-of-arrays) çevirir.
+API bu format ile pandas veya scikit-learn import etmeden tahmin yapabilir.
+"""
+
+import json
+import numpy as np
+
+# Dışa aktarılan dosyaların varsayılan yolları
+EXPORT_ARRAYS_PATH = 'model/forest_export.npz'
+EXPORT_META_PATH = 'model/forest_export.json'
+
+def export_forest(model, label_encoders, feature_names,
+                  arrays_path=EXPORT_ARRAYS_PATH, meta_path=EXPORT_META_PATH):
+    """Ormanı ve encoder sınıflarını scikit-learn gerektirmeyen formatta kaydet
+
+    Tüm ağaçların düğümleri tek bir dizide art arda tutulur. Çocuk indeksleri
+    global düğüm indeksine çevrilir; yapraklar kendilerini gösterir, böylece
+    değerlendirme sırasında yaprak kontrolü gerekmez.
+    """
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    node_counts = np.array([tree.node_count for tree in trees], dtype=np.int64)
+    roots = np.concatenate([[0], np.cumsum(node_counts)[:-1]]).astype(np.int32)
+    total_nodes = int(node_counts.sum())
+
+    left = np.empty(total_nodes, dtype=np.int32)
+    right = np.empty(total_nodes, dtype=np.int32)
+    feature = np.empty(total_nodes, dtype=np.int32)
+    threshold = np.empty(total_nodes, dtype=np.float64)
+    value = np.empty(total_nodes, dtype=np.float64)
+
+    for tree, root in zip(trees, roots):
+        nodes = slice(root, root + tree.node_count)
+        own = np.arange(tree.node_count, dtype=np.int32) + root
+        is_leaf = tree.children_left < 0
+
+        left[nodes] = np.where(is_leaf, own, tree.children_left + root)
+        right[nodes] = np.where(is_leaf, own, tree.children_right + root)
+        feature[nodes] = np.where(is_leaf, 0, tree.feature)
+        threshold[nodes] = np.where(is_leaf, 0.0, tree.threshold)
+        value[nodes] = tree.value[:, 0, 0]
+
+    np.savez(
+        arrays_path,
+        roots=roots, left=left, right=right,
+        feature=feature, threshold=threshold, value=value
+    )
+
+    meta = {
+        'format_version': 1,
+        'n_trees': len(trees),
+        'max_depth': int(max(tree.max_depth for tree in trees)),
+        'feature_names': list(feature_names),
+        'encoder_classes': {
+            col: [str(c) for c in encoder.classes_] for col, encoder in label_encoders.items()
+        }
+    }
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    return meta
+
+class ExportedForest:
+    """Dışa aktarılmış ormanı yalnızca NumPy ile değerlendiren model"""
+
+    def __init__(self, arrays, meta):
+        self.roots = arrays['roots']
+        self.left = arrays['left']
+        self.right = arrays['right']
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.value = arrays['value']
+        self.n_trees = meta['n_trees']
+        self.max_depth = meta['max_depth']
+        self.feature_names = meta['feature_names']
+        self.encoder_classes = meta['encoder_classes']
+        # Yapraklar kendilerini gösterir
+        self.is_leaf = self.left == np.arange(len(self.left))
+
+    def apply(self, X, trees=slice(None)):
+        """Her örnek ve ağaç için ulaşılan yaprağın global indeksini döndür
+
+        trees ile ağaçların yalnızca bir dilimi değerlendirilebilir (erken çıkış).
+        """
+        # scikit-learn ağaçları girdiyi float32 olarak karşılaştırır
+        X = np.asarray(X, dtype=np.float32)
+        n_samples, n_features = X.shape
+        roots = self.roots[trees].astype(np.intp)
+
+        # (ağaç, örnek) çiftleri ağaç sırasıyla düz dizilerde tutulur; aynı ağacın
+        # düğümlerine art arda erişilir
+        node = np.repeat(roots, n_samples)
+        leaves = node.copy()
+        offset = np.tile(np.arange(n_samples, dtype=np.intp) * n_features, len(roots))
+        active = np.arange(len(node))
+        X = X.ravel()
+
+        # Tüm çiftler aynı anda bir seviye aşağı iner; yaprağa ulaşanlar sonraki
+        # seviyelerde dolaşılmaz (yapraklar çoğunlukla max_depth'ten sığdır)
+        for _ in range(self.max_depth):
+            go_left = X[offset + self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+            done = self.is_leaf[node]
+            if done.any():
+                leaves[active[done]] = node[done]
+                walking = ~done
+                node, offset, active = node[walking], offset[walking], active[walking]
+                if not len(active):
+                    break
+
+        return leaves.reshape(len(roots), n_samples).T
+
+    def tree_predictions(self, X, trees=slice(None)):
+        """Ağaçların tahminlerini (n_ornek, n_agac) matrisi olarak döndür"""
+        return self.value[self.apply(X, trees)]
+
+    def predict(self, X):
+        """Ağaç tahminlerinin ortalaması (RandomForestRegressor.predict ile aynı)"""
+        return self.tree_predictions(X).mean(axis=1)
+
+def load_exported_forest(arrays_path=EXPORT_ARRAYS_PATH, meta_path=EXPORT_META_PATH):
+    """Dışa aktarılmış ormanı yükle"""
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+
+    with np.load(arrays_path) as data:
+        arrays = {key: data[key] for key in data.files}
+
+    return ExportedForest(arrays, meta)
+
+def main():
+    """Mevcut pickle modelini dışa aktarılmış formata çevir"""
+    import pickle
+
+    print("📦 Model dışa aktarılıyor...")
+    try:
+        with open('model/random_forest_model.pkl', 'rb') as f:
+            model = pickle.load(f)
+        with open('model/label_encoders.pkl', 'rb') as f:
+            label_encoders = pickle.load(f)
+        with open('model/feature_names.pkl', 'rb') as f:
+            feature_names = pickle.load(f)
+    except FileNotFoundError as e:
+        print(f"❌ Model dosyaları bulunamadı: {e}")
+        print("   Önce 'python train_and_save_model.py' komutunu çalıştırın.")
+        return
+
+    meta = export_forest(model, label_encoders, feature_names)
+    print(f"   ✅ {meta['n_trees']} ağaç dışa aktarıldı:")
+    print(f"      • {EXPORT_ARRAYS_PATH}")
+    print(f"      • {EXPORT_META_PATH}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Random Forest Ağaç Bazlı Tahmin Yardımcıları
+Ormandaki her ağacın tahminini tek bir toplu değerlendirmede toplar ve
+bu tahminlerden yüzdelik (P10/P50/P90 gibi) aralıklar üretir. Gecikmenin
+önemli olduğu isteklerde ağaçlar sırayla bloklar halinde değerlendirilip
+ortalamanın standart hatası yeterince küçülünce (ya da ağaç / süre bütçesi
+dolunca) durulabilir (erken çıkış).
+"""
+
+import time
+
+import numpy as np
+
+# Varsayılan tahmin aralığı yüzdelikleri
+DEFAULT_QUANTILES = (10.0, 50.0, 90.0)
+
+# Erken çıkış: ortalamanın standart hatasının tahmine oranı için varsayılan tolerans
+DEFAULT_TOLERANCE = 0.03
+
+# Erken çıkışta ilk blokta değerlendirilen ağaç sayısı (ilk blok her zaman değerlendirilir)
+TREE_BLOCK = 10
+
+def build_leaf_value_table(model):
+    """Her ağacın düğüm değerlerini (n_agac, max_dugum) boyutlu tek bir tabloya yerleştir
+
+    Tablo model yüklenirken bir kez oluşturulur; tahmin sırasında ağaçlar
+    Python'da tek tek dolaşılmaz.
+    """
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    max_nodes = max(tree.node_count for tree in trees)
+
+    table = np.zeros((len(trees), max_nodes), dtype=np.float64)
+    for i, tree in enumerate(trees):
+        table[i, :tree.node_count] = tree.value[:, 0, 0]
+
+    return table
+
+def per_tree_predictions(model, leaf_values, X):
+    """Tüm ağaçların tahminlerini (n_ornek, n_agac) matrisi olarak döndür
+
+    `model.apply` bütün ağaçlar için yaprak indekslerini tek çağrıda verir;
+    yaprak değerleri ise düzleştirilmiş tablodan tek bir indeksleme ile okunur.
+    """
+    leaves = model.apply(X)
+    n_trees, max_nodes = leaf_values.shape
+    offsets = np.arange(n_trees, dtype=leaves.dtype) * max_nodes
+    return leaf_values.ravel()[leaves + offsets]
+
+def tree_range_predictions(model, leaf_values, X, start, stop):
+    """start:stop aralığındaki ağaçların tahminlerini (n_ornek, stop - start) matrisi olarak döndür
+
+    `model.apply` her zaman tüm ormanı dolaştığından ağaçlar tek tek çağrılır;
+    girdi doğrulaması bir kez yapılıp ağaçların düşük seviyeli apply'ı kullanılır.
+    """
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    leaves = np.column_stack([est.tree_.apply(X) for est in model.estimators_[start:stop]])
+    return leaf_values[np.arange(start, stop), leaves]
+
+def early_exit_predictions(tree_block, n_trees, n_samples, tolerance=DEFAULT_TOLERANCE,
+                           max_trees=None, deadline=None, block=TREE_BLOCK):
+    """Ağaçları sırayla, boyutu ikiye katlanan bloklar halinde değerlendir; yakınsayan örneklerde dur
+
+    tree_block(start, stop, rows) verilen satırlar için start:stop ağaçlarının
+    tahminlerini döndürür. Her bloktan sonra bir örneğin ortalamasının standart
+    hatası `tolerance * |ortalama|` altına düştüyse o örnek için durulur. Ağaç
+    bütçesi (max_trees) ya da `time.perf_counter()` cinsinden bitiş zamanı
+    (deadline) dolunca kalan örnekler de o ana kadarki ağaçlarla sonuçlanır.
+
+    (n_ornek, n_agac) tahmin matrisi (değerlendirilmeyen ağaçlar NaN),
+    kullanılan ağaç sayıları ve standart hatalar döner.
+    """
+    limit = n_trees if max_trees is None else max(1, min(max_trees, n_trees))
+    predictions = np.full((n_samples, n_trees), np.nan)
+    totals = np.zeros(n_samples)
+    squares = np.zeros(n_samples)
+    used = np.zeros(n_samples, dtype=np.int64)
+    active = np.arange(n_samples)
+
+    start = 0
+    while len(active) and start < limit:
+        # Blok boyutu her adımda ikiye katlanır (10, 20, 40, ...): yakınsamayan
+        # örnekler için tam ormana az sayıda geçişte ulaşılır
+        stop = min(start * 2 if start else block, limit)
+        values = tree_block(start, stop, active)
+        predictions[active, start:stop] = values
+        totals[active] += values.sum(axis=1)
+        squares[active] += np.square(values).sum(axis=1)
+        used[active] = stop
+        start = stop
+
+        n = used[active]
+        mean = totals[active] / n
+        variance = np.maximum(squares[active] / n - mean ** 2, 0.0) * n / np.maximum(n - 1, 1)
+        converged = np.sqrt(variance / n) <= tolerance * np.abs(mean)
+        active = active[~converged]
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+
+    mean = totals / used
+    variance = np.maximum(squares / used - mean ** 2, 0.0) * used / np.maximum(used - 1, 1)
+    return predictions, used, np.sqrt(variance / used)
+
+def prediction_quantiles(tree_predictions, quantiles=DEFAULT_QUANTILES):
+    """Ağaç tahminlerinden nokta tahmini ve yüzdelik değerlerini hesapla
+
+    Nokta tahmini ağaçların ortalamasıdır, yani `model.predict` ile aynıdır.
+    Dönen yüzdelik matrisi (len(quantiles), n_ornek) boyutludur. Erken çıkışta
+    değerlendirilmeyen ağaçlar (NaN) hesaba katılmaz.
+    """
+    if np.isnan(tree_predictions).any():
+        return np.nanmean(tree_predictions, axis=1), np.nanpercentile(tree_predictions, quantiles, axis=1)
+    point = tree_predictions.mean(axis=1)
+    values = np.percentile(tree_predictions, quantiles, axis=1)
+    return point, values
+
+def quantile_label(q):
+    """Yüzdelik değeri için yanıt anahtarı üret (10 -> 'P10', 2.5 -> 'P2.5')"""
+    return f"P{q:g}"
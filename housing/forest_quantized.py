@@ -0,0 +1,276 @@
+"""
+Nicemlenmiş (Quantized) Orman Formatı
+Dışa aktarılmış ormanı (forest_export) daha küçük ve önbellek dostu bir düz
+dizi formatına çevirir. Her özellik için ağaçlarda kullanılan eşikler sıralı
+bir kutu listesinde toplanır; düğümler float64 eşik yerine bu listedeki sırayı
+(kutu indeksini) tutar. Girdi bir kez kutu koduna çevrilir ve ağaçlarda yalnızca
+tam sayı karşılaştırması yapılır. x <= eşik[k] ancak ve ancak kutu kodu <= k
+olduğundan yaprak seçimi birebir aynıdır; tek fark yaprak değerlerinin float32
+saklanmasıdır.
+
+Düğüm başına tutulanlar (eski formatta 28 bayt):
+    anahtar  uint16  özelliğin kutu bloğundaki eşik sırası + 1 (yaprakta 0)
+    sag      uint16  sağ çocuğun ağaç içi indeksi (yaprakta kendisi)
+    deger    float32 düğüm değeri
+Sol çocuk her zaman bir sonraki düğümdür (scikit-learn ağaçları derinlik
+öncelikli sırayla kurar); özellik ise anahtardan küçük bir tabloyla bulunur.
+
+Kullanım:
+    python forest_quantized.py     # mevcut dışa aktarımı nicemle ve veri setinde karşılaştır
+
+    from forest_quantized import load_quantized_forest
+    model = load_quantized_forest()
+    model.predict(X)
+"""
+
+import json
+import os
+
+import numpy as np
+
+from forest_export import ExportedForest, load_exported_forest
+
+# Nicemlenmiş dosyaların varsayılan yolları
+QUANTIZED_ARRAYS_PATH = 'model/forest_quantized.npz'
+QUANTIZED_META_PATH = 'model/forest_quantized.json'
+
+def _index_dtype(max_value):
+    """max_value değerini tutabilen en dar işaretsiz tam sayı tipi"""
+    return np.uint16 if max_value <= np.iinfo(np.uint16).max else np.uint32
+
+def _ordered_bits(values):
+    """float32 değerleri sıralamayı koruyan uint64 tam sayılara çevir"""
+    bits = np.ascontiguousarray(values, dtype=np.float32).view(np.uint32).astype(np.uint64)
+    negative = bits >= np.uint64(0x80000000)
+    return np.where(negative, np.uint64(0xFFFFFFFF) - bits, bits | np.uint64(0x80000000))
+
+def quantize_forest(forest, arrays_path=QUANTIZED_ARRAYS_PATH, meta_path=QUANTIZED_META_PATH):
+    """Dışa aktarılmış ormanı nicemlenmiş formatta kaydet (scikit-learn gerekmez)
+
+    Her özelliğin kutu bloğu anahtar uzayında ardışık yer alır: özellik f için
+    blok başı base[f] olmak üzere kod = base[f] + (eşik < x sayısı) ve düğüm
+    anahtarı = base[f] + eşik sırası + 1 olur. Böylece `kod < anahtar`
+    karşılaştırması x <= eşik ile aynıdır; yaprağın anahtarı 0 olduğundan
+    yapraklar her zaman sağa, yani kendilerine gider.
+    """
+    n_nodes = len(forest.left)
+    node_counts = np.diff(np.append(forest.roots, n_nodes))
+    tree_of_node = np.repeat(np.arange(forest.n_trees), node_counts)
+    own = np.arange(n_nodes)
+    internal = forest.left != own
+
+    if not (forest.left[internal] == own[internal] + 1).all():
+        raise ValueError("Sol çocuğu bir sonraki düğüm olmayan ağaçlar nicemlenemez (max_leaf_nodes?)")
+
+    n_features = len(forest.feature_names)
+    thresholds = [np.unique(forest.threshold[internal & (forest.feature == j)]) for j in range(n_features)]
+    # Anahtar 0 yapraklara ayrılır; her blokta n_esik + 1 farklı kod vardır
+    sizes = np.array([len(t) + 1 for t in thresholds])
+    base = np.concatenate([[1], 1 + np.cumsum(sizes)[:-1]])
+    n_keys = int(base[-1] + sizes[-1])
+    key_dtype = _index_dtype(n_keys)
+
+    key = np.zeros(n_nodes, dtype=key_dtype)
+    for j in range(n_features):
+        nodes = np.flatnonzero(internal & (forest.feature == j))
+        key[nodes] = base[j] + np.searchsorted(thresholds[j], forest.threshold[nodes]) + 1
+
+    # Anahtar -> özellik tablosu (yaprak anahtarı 0 için özellik 0)
+    key_feature = np.zeros(n_keys, dtype=np.uint8 if n_features < 256 else np.uint16)
+    for j in range(n_features):
+        key_feature[base[j]:base[j] + sizes[j]] = j
+
+    local_right = forest.right - forest.roots[tree_of_node]
+    right = local_right.astype(_index_dtype(int(node_counts.max())))
+
+    np.savez(
+        arrays_path,
+        roots=forest.roots, key=key, right=right, value=forest.value.astype(np.float32),
+        key_feature=key_feature, thresholds=np.concatenate(thresholds),
+        threshold_offsets=np.concatenate([[0], np.cumsum(sizes - 1)]).astype(np.int64),
+        key_base=base.astype(np.int64),
+    )
+
+    meta = {
+        'format_version': 1,
+        'n_trees': forest.n_trees,
+        'max_depth': forest.max_depth,
+        'feature_names': forest.feature_names,
+        'encoder_classes': forest.encoder_classes,
+    }
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    return meta
+
+class QuantizedForest(ExportedForest):
+    """Nicemlenmiş ormanı yalnızca NumPy ile değerlendiren model
+
+    ExportedForest ile aynı arayüzü (apply, tree_predictions, predict) sunar;
+    apply yaprakların global indeksini döndürür.
+    """
+
+    def __init__(self, arrays, meta):
+        self.roots = arrays['roots']
+        self.key = arrays['key']
+        self.right = arrays['right']
+        self.value = arrays['value']
+        self.key_feature = arrays['key_feature']
+        self.n_trees = meta['n_trees']
+        self.max_depth = meta['max_depth']
+        self.feature_names = meta['feature_names']
+        self.encoder_classes = meta['encoder_classes']
+
+        # Tüm özelliklerin eşikleri tek bir sıralı uint64 dizide: (özellik << 32) | sıralı float32 bitleri.
+        # Girdi float32 olduğundan "eşik < x" ile "eşikten büyük en küçük float32 <= x" aynıdır.
+        offsets = arrays['threshold_offsets']
+        n_features = len(offsets) - 1
+        thresholds = arrays['thresholds']
+        upper = thresholds.astype(np.float32)
+        below = upper <= thresholds
+        upper[below] = np.nextafter(upper[below], np.float32(np.inf))
+        feature_of = np.repeat(np.arange(n_features, dtype=np.uint64), np.diff(offsets))
+        self.search_keys = (feature_of << np.uint64(32)) | _ordered_bits(upper)
+        self.feature_shift = np.arange(n_features, dtype=np.uint64) << np.uint64(32)
+        self.code_shift = (arrays['key_base'] - offsets[:-1]).astype(np.int64)
+
+    def encode(self, X):
+        """Girdiyi her özelliğin kutu bloğundaki koda çevir: base + (eşik < x sayısı)
+
+        Tüm özellikler tek bir searchsorted çağrısında kodlanır.
+        """
+        # scikit-learn ağaçları girdiyi float32 olarak karşılaştırır (-0.0 -> 0.0)
+        X = np.asarray(X, dtype=np.float32) + np.float32(0.0)
+        positions = np.searchsorted(self.search_keys, self.feature_shift | _ordered_bits(X), side='right')
+        return (positions + self.code_shift).astype(self.key.dtype)
+
+    def apply(self, X, trees=slice(None)):
+        """Her örnek ve ağaç için ulaşılan yaprağın global indeksini döndür
+
+        Dolaşma ExportedForest.apply ile aynıdır: (ağaç, örnek) çiftleri düz
+        dizilerdedir ve yaprağa ulaşanlar sonraki seviyelerde dolaşılmaz.
+        """
+        codes = self.encode(X)
+        n_samples, n_features = codes.shape
+        roots = self.roots[trees].astype(np.intp)
+
+        node = np.repeat(roots, n_samples)
+        root = node.copy()
+        leaves = node.copy()
+        offset = np.tile(np.arange(n_samples, dtype=np.intp) * n_features, len(roots))
+        active = np.arange(len(node))
+        codes = codes.ravel()
+        key = self.key[node]
+
+        # Sol çocuk bir sonraki düğüm, sağ çocuk ağacın köküne göre saklanır; yaprağın anahtarı 0'dır
+        for _ in range(self.max_depth):
+            go_left = codes[offset + self.key_feature[key]] < key
+            node = np.where(go_left, node + 1, root + self.right[node])
+            key = self.key[node]
+            done = key == 0
+            if done.any():
+                leaves[active[done]] = node[done]
+                walking = ~done
+                node, key, root, offset, active = (
+                    node[walking], key[walking], root[walking], offset[walking], active[walking]
+                )
+                if not len(active):
+                    break
+
+        return leaves.reshape(len(roots), n_samples).T
+
+    def tree_predictions(self, X, trees=slice(None)):
+        """Ağaçların tahminlerini (n_ornek, n_agac) float64 matrisi olarak döndür"""
+        return self.value[self.apply(X, trees)].astype(np.float64)
+
+    @property
+    def nbytes(self):
+        """Düğüm dizilerinin toplam boyutu (bayt)"""
+        return sum(a.nbytes for a in (self.roots, self.key, self.right, self.value, self.key_feature))
+
+def load_quantized_forest(arrays_path=QUANTIZED_ARRAYS_PATH, meta_path=QUANTIZED_META_PATH):
+    """Nicemlenmiş ormanı yükle"""
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+
+    with np.load(arrays_path) as data:
+        arrays = {key: data[key] for key in data.files}
+
+    return QuantizedForest(arrays, meta)
+
+def quantized_model_available():
+    """Nicemlenmiş model dosyalarının var olup olmadığını kontrol et"""
+    return os.path.exists(QUANTIZED_ARRAYS_PATH) and os.path.exists(QUANTIZED_META_PATH)
+
+def parity_report(forest, quantized, X, batch_size=10000):
+    """İki formatın yaprak seçimlerini ve tahminlerini X üzerinde karşılaştır"""
+    same_leaves = 0
+    max_abs = 0.0
+    max_rel = 0.0
+    for start in range(0, len(X), batch_size):
+        batch = X[start:start + batch_size]
+        leaves = forest.apply(batch)
+        q_leaves = quantized.apply(batch)
+        same_leaves += int((leaves == q_leaves).all(axis=1).sum())
+
+        expected = forest.value[leaves].mean(axis=1)
+        actual = quantized.value[q_leaves].astype(np.float64).mean(axis=1)
+        diff = np.abs(actual - expected)
+        max_abs = max(max_abs, float(diff.max()))
+        max_rel = max(max_rel, float((diff / np.abs(expected)).max()))
+
+    return {
+        'n_rows': int(len(X)),
+        'same_leaves': same_leaves,
+        'max_abs_diff': max_abs,
+        'max_rel_diff': max_rel,
+    }
+
+def main():
+    """Mevcut dışa aktarımı nicemle ve veri setinde birebirlik raporu üret"""
+    import time
+
+    import pandas as pd
+    from comparables import encode_frame
+    from forest_export import EXPORT_ARRAYS_PATH
+
+    print("🗜️  Model nicemleniyor...")
+    try:
+        forest = load_exported_forest()
+        df = pd.read_csv('turkiye_ev_fiyatlari.csv')
+    except FileNotFoundError as e:
+        print(f"❌ Dosya bulunamadı: {e}")
+        print("   Önce 'python train_and_save_model.py' komutunu çalıştırın.")
+        return
+
+    quantize_forest(forest)
+    quantized = load_quantized_forest()
+
+    old_bytes = sum(a.nbytes for a in (forest.roots, forest.left, forest.right,
+                                       forest.feature, forest.threshold, forest.value))
+    print(f"   ✅ {forest.n_trees} ağaç, {len(forest.left):,} düğüm:")
+    print(f"      • Bellek: {old_bytes / 2**20:.1f} MB → {quantized.nbytes / 2**20:.1f} MB"
+          f" ({old_bytes / quantized.nbytes:.1f}x)")
+    print(f"      • Dosya: {os.path.getsize(EXPORT_ARRAYS_PATH) / 2**20:.1f} MB →"
+          f" {os.path.getsize(QUANTIZED_ARRAYS_PATH) / 2**20:.1f} MB")
+
+    X = encode_frame(df, forest.encoder_classes, forest.feature_names)
+    report = parity_report(forest, quantized, X)
+    print(f"\n📏 Birebirlik ({report['n_rows']:,} ev):")
+    print(f"   • Aynı yaprakları seçen evler: {report['same_leaves']:,}/{report['n_rows']:,}")
+    print(f"   • En büyük tahmin farkı: {report['max_abs_diff']:.4f} TL"
+          f" (göreli {report['max_rel_diff']:.2e}, float32 yaprak değerlerinden)")
+
+    print("\n⏱️  Tahmin süresi:")
+    for n_rows in (1, 100, 10000):
+        batch = X[:n_rows]
+        for name, model in (('float64', forest), ('nicemlenmiş', quantized)):
+            repeat = max(1, 2000 // n_rows)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                model.predict(batch)
+            elapsed = (time.perf_counter() - start) / repeat
+            print(f"   • {n_rows:>6} ev, {name:<12}: {elapsed * 1000:8.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Türkiye Ev Fiyat Tahmini API İstemcisi
+Her ev için ayrı `requests.post` açmak yerine bağlantıları yeniden kullanan
+(keep-alive havuzu) senkron ve asenkron istemci. Toplu çağrılar otomatik
+olarak parçalanır: JSON ile /toplu-tahmin sınırı olan 100'lük, ikili formatla
+(msgpack ya da Arrow IPC, bkz. binary_format.py) /toplu-tahmin/ikili sınırı
+olan MAX_ROWS'luk parçalar gönderilir. Asenkron istemci parçaları havuz
+boyutu kadar eşzamanlı gönderir.
+
+Kullanım:
+    from binary_format import ARROW_MEDIA_TYPE
+    from housing_client import HousingClient, AsyncHousingClient
+
+    with HousingClient("http://localhost:8000") as istemci:
+        istemci.predict(ev)                          # /tahmin yanıtı (sözlük)
+        istemci.predict_many(evler)                  # /toplu-tahmin yanıtı, parçalar birleştirilmiş
+        sonuc = istemci.predict_matrix(evler)        # {"tahmin_fiyat": ndarray, "hatalar": {...}}
+
+    async with AsyncHousingClient("http://localhost:8000") as istemci:
+        sonuc = await istemci.predict_matrix(df, media_type=ARROW_MEDIA_TYPE)
+"""
+
+import asyncio
+
+import numpy as np
+
+from binary_format import MAX_ROWS, MSGPACK_MEDIA_TYPE, decode_predictions, encode_houses
+
+# Varsayılan API adresi
+DEFAULT_BASE_URL = "http://localhost:8000"
+
+# JSON toplu tahminde istek başına en fazla ev (API sınırı)
+JSON_CHUNK_SIZE = 100
+
+# Havuzda tutulan bağlantı sayısı (asenkron istemcide eşzamanlı parça sayısı)
+POOL_SIZE = 8
+
+# İstek zaman aşımı (saniye)
+DEFAULT_TIMEOUT = 30.0
+
+class HousingAPIError(Exception):
+    """API 2xx dışında bir yanıt döndürdüğünde"""
+
+    def __init__(self, status_code, detail):
+        super().__init__(f"{status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+
+def _check(response):
+    """requests ya da httpx yanıtı başarısızsa API'nin hata ayrıntısıyla HousingAPIError fırlat"""
+    if response.status_code >= 300:
+        json_body = response.headers.get('content-type', '').startswith('application/json')
+        raise HousingAPIError(response.status_code, response.json().get('detail') if json_body else response.text)
+
+def _length(houses):
+    """Ev listesi, sütun sözlüğü ya da DataFrame'deki ev sayısı"""
+    if isinstance(houses, dict):
+        return len(next(iter(houses.values()), []))
+    return len(houses)
+
+def _chunks(houses, size):
+    """Ev listesini, sütun sözlüğünü ya da DataFrame'i (başlangıç, parça) çiftlerine böl"""
+    if isinstance(houses, dict):
+        for start in range(0, _length(houses), size):
+            yield start, {name: values[start:start + size] for name, values in houses.items()}
+    elif hasattr(houses, 'iloc'):
+        for start in range(0, len(houses), size):
+            yield start, houses.iloc[start:start + size]
+    else:
+        for start in range(0, len(houses), size):
+            yield start, houses[start:start + size]
+
+def _merge_json(parts, total):
+    """Parça yanıtlarını tek bir /toplu-tahmin yanıtında birleştir (indeksler genel sıraya çevrilir)"""
+    sonuclar = []
+    for start, yanit in parts:
+        for sonuc in yanit['sonuclar']:
+            sonuc['index'] += start
+            sonuclar.append(sonuc)
+    basarili = sum(yanit['basarili_tahmin'] for _, yanit in parts)
+    return {'toplam_ev': total, 'basarili_tahmin': basarili, 'hatali_tahmin': total - basarili, 'sonuclar': sonuclar}
+
+def _merge_matrix(parts):
+    """Parça sonuçlarının sütunlarını birleştir, satır hatalarını genel sıraya çevir"""
+    if not parts:
+        return {'tahmin_fiyat': np.empty(0), 'hatalar': {}}
+    columns = [name for name in parts[0][1] if name != 'hatalar']
+    result = {name: np.concatenate([sonuc[name] for _, sonuc in parts]) for name in columns}
+    result['hatalar'] = {start + i: mesaj for start, sonuc in parts for i, mesaj in sonuc['hatalar'].items()}
+    return result
+
+def _quantile_params(aralik, yuzdelikler):
+    params = {'aralik': 'true'} if aralik else {}
+    if aralik and yuzdelikler is not None:
+        params['yuzdelikler'] = list(yuzdelikler)
+    return params
+
+class HousingClient:
+    """requests.Session üzerinde keep-alive bağlantı havuzlu senkron istemci"""
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, pool_size=POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Havuzdaki bağlantıları kapat"""
+        self.session.close()
+
+    def _request(self, method, path, **kwargs):
+        response = self.session.request(method, self.base_url + path, timeout=self.timeout, **kwargs)
+        _check(response)
+        return response
+
+    def health(self):
+        """/health yanıtı"""
+        return self._request('GET', '/health').json()
+
+    def predict(self, ev, **params):
+        """Tek ev için /tahmin yanıtı (params: aralik, erken_cikis, agac_butcesi, ...)"""
+        return self._request('POST', '/tahmin', json=ev, params=params).json()
+
+    def predict_many(self, evler, aralik=False, yuzdelikler=None):
+        """Ev listesini 100'lük JSON parçalarıyla /toplu-tahmin'e gönder, yanıtları birleştir"""
+        params = _quantile_params(aralik, yuzdelikler)
+        parts = [
+            (start, self._request('POST', '/toplu-tahmin', json=parca, params=params).json())
+            for start, parca in _chunks(evler, JSON_CHUNK_SIZE)
+        ]
+        return _merge_json(parts, _length(evler))
+
+    def predict_matrix(self, evler, media_type=MSGPACK_MEDIA_TYPE, aralik=False, yuzdelikler=None,
+                       chunk_size=MAX_ROWS):
+        """Evleri ikili formatta /toplu-tahmin/ikili'ye gönder
+
+        evler ev sözlüklerinin listesi, {alan: değerler} sözlüğü ya da DataFrame
+        olabilir. {"tahmin_fiyat": ndarray, yüzdelikler..., "hatalar": {satır: mesaj}}
+        döner; geçersiz evlerin tahmini NaN'dır.
+        """
+        params = _quantile_params(aralik, yuzdelikler)
+        headers = {'Content-Type': media_type, 'Accept': media_type}
+        parts = []
+        for start, parca in _chunks(evler, min(chunk_size, MAX_ROWS)):
+            response = self._request('POST', '/toplu-tahmin/ikili', data=encode_houses(parca, media_type),
+                                     params=params, headers=headers)
+            parts.append((start, decode_predictions(response.content, media_type)))
+        return _merge_matrix(parts)
+
+class AsyncHousingClient:
+    """httpx.AsyncClient üzerinde keep-alive bağlantı havuzlu asenkron istemci
+
+    Toplu çağrılarda parçalar havuz boyutu kadar eşzamanlı gönderilir.
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, pool_size=POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+        import httpx
+
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        self.client = httpx.AsyncClient(base_url=base_url.rstrip('/'), limits=limits, timeout=timeout)
+        self._limit = asyncio.Semaphore(pool_size)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        """Havuzdaki bağlantıları kapat"""
+        await self.client.aclose()
+
+    async def _request(self, method, path, **kwargs):
+        async with self._limit:
+            response = await self.client.request(method, path, **kwargs)
+        _check(response)
+        return response
+
+    async def health(self):
+        """/health yanıtı"""
+        return (await self._request('GET', '/health')).json()
+
+    async def predict(self, ev, **params):
+        """Tek ev için /tahmin yanıtı"""
+        return (await self._request('POST', '/tahmin', json=ev, params=params)).json()
+
+    async def predict_many(self, evler, aralik=False, yuzdelikler=None):
+        """Ev listesini 100'lük JSON parçalarıyla eşzamanlı gönder, yanıtları birleştir"""
+        params = _quantile_params(aralik, yuzdelikler)
+
+        async def gonder(start, parca):
+            return start, (await self._request('POST', '/toplu-tahmin', json=parca, params=params)).json()
+
+        parts = await asyncio.gather(*(gonder(start, parca) for start, parca in _chunks(evler, JSON_CHUNK_SIZE)))
+        return _merge_json(parts, _length(evler))
+
+    async def predict_matrix(self, evler, media_type=MSGPACK_MEDIA_TYPE, aralik=False, yuzdelikler=None,
+                             chunk_size=MAX_ROWS):
+        """Evleri ikili formatta parçalar halinde eşzamanlı gönder (bkz. HousingClient.predict_matrix)"""
+        params = _quantile_params(aralik, yuzdelikler)
+        headers = {'Content-Type': media_type, 'Accept': media_type}
+
+        async def gonder(start, parca):
+            response = await self._request('POST', '/toplu-tahmin/ikili', content=encode_houses(parca, media_type),
+                                           params=params, headers=headers)
+            return start, decode_predictions(response.content, media_type)
+
+        parts = await asyncio.gather(*(
+            gonder(start, parca) for start, parca in _chunks(evler, min(chunk_size, MAX_ROWS))
+        ))
+        return _merge_matrix(list(parts))
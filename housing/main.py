@@ -147,8 +147,9 @@ def analyze_feature_importance(model, feature_names):
     
     return feature_importance_df
 
-def visualize_results(results, y_test, feature_importance_df):
-    """Sonuçları görselleştir"""
+def visualize_results(results, y_test, feature_importance_df,
+                      path='random_forest_results.png', dpi=300, show=True):
+    """Sonuçları görselleştir (show=False ile pencere açmadan yalnızca dosyaya kaydeder)"""
     print("\n📊 Sonuçlar görselleştiriliyor...")
     
     fig, axes = plt.subplots(2, 2, figsize=(16, 12))
@@ -195,10 +196,12 @@ def visualize_results(results, y_test, feature_importance_df):
     axes[1, 1].invert_yaxis()
     
     plt.tight_layout()
-    plt.savefig('random_forest_results.png', dpi=300, bbox_inches='tight')
-    plt.show()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    if show:
+        plt.show()
+    plt.close(fig)
     
-    print("   ✅ Grafikler 'random_forest_results.png' dosyasına kaydedildi")
+    print(f"   ✅ Grafikler '{path}' dosyasına kaydedildi")
 
 def make_sample_predictions(model, label_encoders, df_original):
     """Örnek tahminler yap"""
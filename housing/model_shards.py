@@ -0,0 +1,167 @@
+"""
+Şehir Bazlı Model Parçaları (Shard)
+Fiyat davranışı şehirden şehre çok farklıdır (bkz. generate_data.py içindeki
+cities_prices). Bu modül eğitimde her şehir için o şehrin satırlarıyla daha
+küçük bir Random Forest eğitir ve dışa aktarılmış formatta (forest_export)
+`model/shards/` altına kaydeder. Bir şehir modeli yalnızca test kümesindeki o
+şehre ait evlerde genel modelden daha iyi ise kullanılır; diğer şehirler genel
+modele düşer. API istekleri (ve toplu isteklerde şehre göre gruplanmış alt
+kümeleri) ilgili parçaya yönlendirir; parçalar ilk ihtiyaçta yüklenir ve bellek
+bütçesi aşılınca en uzun süredir kullanılmayan (LRU) parça bellekten atılır.
+
+Kullanım:
+    python train_and_save_model.py --shards    # genel model + şehir modelleri
+
+    from model_shards import load_shard_router
+    router = load_shard_router(feature_names, budget_mb=128)
+    for forest, rows in router.groups(X):        # forest None ise genel model
+        ...
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from forest_export import export_forest, load_exported_forest
+
+# Parça dosyalarının klasörü ve parça listesi
+SHARDS_DIR = 'model/shards'
+SHARD_MANIFEST_PATH = os.path.join(SHARDS_DIR, 'manifest.json')
+
+# Yüklü parçaların toplam dizi boyutu için varsayılan bütçe (MB)
+DEFAULT_BUDGET_MB = 128
+
+# Parçalama alanı
+SHARD_FEATURE = 'sehir'
+
+# Genel modelden alınan ve şehir modellerinde de kullanılan parametreler
+SHARED_PARAMS = ('n_estimators', 'max_depth', 'min_samples_split', 'min_samples_leaf', 'random_state')
+
+def forest_nbytes(forest):
+    """Dışa aktarılmış ormanın bellekteki dizi boyutu (bayt)"""
+    return sum(a.nbytes for a in (forest.roots, forest.left, forest.right,
+                                  forest.feature, forest.threshold, forest.value))
+
+def train_city_shards(X_train, y_train, X_test, y_test, global_model, feature_names, label_encoders,
+                      shards_dir=SHARDS_DIR):
+    """Her şehir için model eğit, test kümesinde genel modelle karşılaştır ve kaydet
+
+    Şehir modeli o şehrin test evlerinde genel modelden daha düşük MAE vermezse
+    kaydedilmez ve o şehir genel modele yönlendirilir. Parça listesini döndürür.
+    """
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.metrics import mean_absolute_error
+
+    # Önceki eğitimden kalan parçalar silinir
+    os.makedirs(shards_dir, exist_ok=True)
+    for name in os.listdir(shards_dir):
+        if name.endswith(('.npz', '.json')):
+            os.remove(os.path.join(shards_dir, name))
+
+    city_col = feature_names.index(SHARD_FEATURE)
+    params = {k: v for k, v in global_model.get_params().items() if k in SHARED_PARAMS}
+    cities = label_encoders[SHARD_FEATURE].classes_
+
+    manifest = {'feature': SHARD_FEATURE, 'params': params, 'shards': {}}
+    for code, city in enumerate(cities):
+        train_rows = X_train[:, city_col] == code
+        test_rows = X_test[:, city_col] == code
+        if not train_rows.any() or not test_rows.any():
+            continue
+
+        model = RandomForestRegressor(n_jobs=-1, **params).fit(X_train[train_rows], y_train[train_rows])
+        mae_shard = mean_absolute_error(y_test[test_rows], model.predict(X_test[test_rows]))
+        mae_global = mean_absolute_error(y_test[test_rows], global_model.predict(X_test[test_rows]))
+
+        entry = {'sehir': str(city), 'mae_sehir': float(mae_shard), 'mae_genel': float(mae_global),
+                 'egitim_ev': int(train_rows.sum()), 'kullan': bool(mae_shard < mae_global)}
+        if entry['kullan']:
+            arrays_path = os.path.join(shards_dir, f'{code}.npz')
+            meta_path = os.path.join(shards_dir, f'{code}.json')
+            meta = export_forest(model, label_encoders, feature_names, arrays_path, meta_path)
+            entry.update(arrays=os.path.basename(arrays_path), meta=os.path.basename(meta_path),
+                         max_depth=meta['max_depth'])
+        manifest['shards'][str(code)] = entry
+        print(f"      • {city}: şehir MAE {mae_shard:,.0f} TL, genel MAE {mae_global:,.0f} TL"
+              f" → {'şehir modeli' if entry['kullan'] else 'genel model'}")
+
+    with open(os.path.join(shards_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+class ShardRouter:
+    """Şehir kodlarını parçalara yönlendiren, parçaları tembel yükleyip LRU ile atan yönlendirici"""
+
+    def __init__(self, manifest, feature_names, shards_dir=SHARDS_DIR, budget_mb=DEFAULT_BUDGET_MB):
+        self.shards_dir = shards_dir
+        self.budget_bytes = int(budget_mb * 2 ** 20)
+        self.city_col = feature_names.index(manifest['feature'])
+        self.entries = {int(code): entry for code, entry in manifest['shards'].items() if entry['kullan']}
+        self._loaded = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def get(self, code):
+        """Şehir koduna ait parçayı döndür (parça yoksa None: genel model kullanılır)"""
+        entry = self.entries.get(code)
+        if entry is None:
+            return None
+        with self._lock:
+            forest = self._loaded.get(code)
+            if forest is not None:
+                self._loaded.move_to_end(code)
+                self.hits += 1
+                return forest
+
+            forest = load_exported_forest(os.path.join(self.shards_dir, entry['arrays']),
+                                          os.path.join(self.shards_dir, entry['meta']))
+            self._loaded[code] = forest
+            self._sizes[code] = forest_nbytes(forest)
+            self.loads += 1
+            # Yeni yüklenen parça bütçeyi tek başına aşsa bile tutulur
+            while len(self._loaded) > 1 and self.loaded_bytes > self.budget_bytes:
+                evicted, _ = self._loaded.popitem(last=False)
+                del self._sizes[evicted]
+                self.evictions += 1
+            return forest
+
+    @property
+    def loaded_bytes(self):
+        return sum(self._sizes.values())
+
+    def groups(self, X):
+        """Satırları şehre göre grupla; her grup için (parça ya da None, satır indeksleri) üret"""
+        codes = np.asarray(X)[:, self.city_col].astype(np.int64)
+        if len(codes) == 1:
+            yield self.get(int(codes[0])), np.zeros(1, dtype=np.int64)
+            return
+        for code in np.unique(codes):
+            yield self.get(int(code)), np.flatnonzero(codes == code)
+
+    def stats(self):
+        """Yüklü parçalar ve önbellek sayaçları"""
+        return {
+            'sehir_modeli_sayisi': len(self.entries),
+            'yuklu_parcalar': [self.entries[code]['sehir'] for code in self._loaded],
+            'yuklu_mb': round(self.loaded_bytes / 2 ** 20, 2),
+            'butce_mb': round(self.budget_bytes / 2 ** 20, 2),
+            'isabet': self.hits,
+            'yukleme': self.loads,
+            'atilan': self.evictions,
+        }
+
+def shards_available(manifest_path=SHARD_MANIFEST_PATH):
+    """Parça listesinin var olup olmadığını kontrol et"""
+    return os.path.exists(manifest_path)
+
+def load_shard_router(feature_names, budget_mb=DEFAULT_BUDGET_MB, manifest_path=SHARD_MANIFEST_PATH):
+    """Parça listesini oku ve yönlendirici oluştur (parçaların kendisi henüz yüklenmez)"""
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    return ShardRouter(manifest, feature_names, os.path.dirname(manifest_path), budget_mb)
@@ -0,0 +1,346 @@
+"""
+Türkiye Ev Fiyat Tahmini - Aşamalı Eğitim Hattı (Pipeline)
+`main.py` ve `train_and_save_model.py` her çalıştırmada yükleme → kodlama →
+ayırma → grid search → değerlendirme → grafik/kaydetme adımlarının hepsini
+baştan yapar. Bu modül aynı adımları ayrı aşamalar olarak tanımlar: her
+aşamanın anahtarı kendi ve işi devrettiği yardımcıların kaynak kodunun,
+parametrelerinin, okuduğu dosyaların ve bağımlı olduğu aşamaların
+anahtarlarının özetidir. Çıktılar bu anahtarla
+diske yazılır; anahtarı değişmeyen aşamalar yeniden çalıştırılmaz (çıktısına
+ihtiyaç duyulmuyorsa yüklenmez bile). Grafikler pencere açılmadan (Agg)
+çizilir ve istenirse atlanır; her çalıştırmanın aşama süreleri kaydedilir.
+
+Kullanım:
+    python pipeline.py                       # tüm aşamalar (değişmeyenler önbellekten)
+    python pipeline.py --only evaluate plot  # yalnızca değerlendirme ve grafik
+    python pipeline.py --no-plot --no-save   # grafik ve model kaydı olmadan
+    python pipeline.py --force grid_search   # aşamayı ve sonrasını yeniden çalıştır
+    python pipeline.py --quick               # küçük parametre ızgarası (hızlı deneme)
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import pickle
+import time
+from datetime import datetime
+
+import matplotlib
+matplotlib.use('Agg')  # Toplu çalıştırmada pencere açılmaz
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import GridSearchCV, train_test_split
+
+from comparables import COMPARABLES_ARRAYS_PATH, COMPARABLES_META_PATH
+from drift_monitor import DRIFT_REFERENCE_PATH
+from forest_export import EXPORT_ARRAYS_PATH, EXPORT_META_PATH
+from forest_quantized import QUANTIZED_ARRAYS_PATH, QUANTIZED_META_PATH
+from main import analyze_feature_importance, preprocess_data, visualize_results
+
+# Aşama çıktılarının ve çalıştırma kayıtlarının tutulduğu klasör
+CACHE_DIR = '.pipeline_cache'
+
+DATA_PATH = 'turkiye_ev_fiyatlari.csv'
+
+# main.py / train_and_save_model.py ile aynı hiperparametre ızgarası
+PARAM_GRID = {
+    'n_estimators': [100, 200, 300],
+    'max_depth': [10, 20, None],
+    'min_samples_split': [2, 5, 10],
+    'min_samples_leaf': [1, 2, 4]
+}
+
+# --quick ile kullanılan küçük ızgara
+QUICK_PARAM_GRID = {
+    'n_estimators': [50],
+    'max_depth': [10, None],
+    'min_samples_split': [2],
+    'min_samples_leaf': [1, 2]
+}
+
+def _file_hash(path):
+    """Dosya içeriğinin özeti (veri değiştiğinde aşama anahtarı da değişir)"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _code_source(code):
+    """Aşama anahtarına katılan kod: fonksiyonun kaynağı ya da modül adıysa modül dosyasının özeti
+
+    Modül adları import edilmeden dosyadan okunur (ör. ağır ya da yan etkili modüller).
+    """
+    if isinstance(code, str):
+        spec = importlib.util.find_spec(code)
+        if spec is None or spec.origin is None:
+            raise ValueError(f"Modül bulunamadı: {code}")
+        return f"{code}:{_file_hash(spec.origin)}"
+    return inspect.getsource(code)
+
+class Stage:
+    """Hattın tek bir adımı
+
+    func bağımlı aşamaların çıktılarını sırayla konumsal argüman, params'ı ise
+    anahtar kelime argümanı olarak alır. files aşamanın okuduğu, outputs ise
+    yazdığı dosyalardır (outputs'tan biri silinmişse aşama yeniden çalışır).
+    code, func'ın asıl işi devrettiği yardımcı fonksiyonlar ya da modül
+    adlarıdır; bunların kodu değişince de aşama yeniden çalışır.
+    """
+
+    def __init__(self, name, func, deps=(), params=None, files=(), outputs=(), code=()):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.params = params or {}
+        self.files = tuple(files)
+        self.outputs = tuple(outputs)
+        self.code = tuple(code)
+
+class Pipeline:
+    """Aşamaları bağımlılık sırasıyla çalıştıran, çıktıları içerik özetiyle önbelleğe alan hat"""
+
+    def __init__(self, stages, cache_dir=CACHE_DIR):
+        self.stages = {}
+        for stage in stages:
+            missing = [d for d in stage.deps if d not in self.stages]
+            if missing:
+                raise ValueError(f"'{stage.name}' aşaması tanımlanmamış aşamalara bağlı: {missing}")
+            self.stages[stage.name] = stage
+        self.cache_dir = cache_dir
+        self.timings = {}
+
+    def keys(self):
+        """Her aşamanın önbellek anahtarı (çalıştırmadan hesaplanır)"""
+        keys = {}
+        for name, stage in self.stages.items():
+            digest = hashlib.sha256()
+            digest.update(name.encode('utf-8'))
+            digest.update(inspect.getsource(stage.func).encode('utf-8'))
+            for code in stage.code:
+                digest.update(_code_source(code).encode('utf-8'))
+            digest.update(json.dumps(stage.params, sort_keys=True, default=repr).encode('utf-8'))
+            for dep in stage.deps:
+                digest.update(keys[dep].encode('utf-8'))
+            for path in stage.files:
+                digest.update(_file_hash(path).encode('utf-8'))
+            keys[name] = digest.hexdigest()[:16]
+        return keys
+
+    def _downstream(self, names):
+        """Verilen aşamalar ve onlara (dolaylı) bağlı tüm aşamalar"""
+        result = set(names)
+        for name, stage in self.stages.items():
+            if result.intersection(stage.deps):
+                result.add(name)
+        return result
+
+    def _cache_path(self, name, key):
+        return os.path.join(self.cache_dir, f'{name}_{key}.pkl')
+
+    def run(self, targets=None, force=()):
+        """Hedef aşamaları (varsayılan: hepsi) çalıştır; {aşama: çıktı} sözlüğü döndür
+
+        Önbellekteki hedeflerin çıktıları yalnızca yeniden çalışan bir aşama
+        onlara ihtiyaç duyarsa yüklenir; dönen sözlükte yalnızca çalışan ya da
+        yüklenen aşamalar bulunur.
+        """
+        targets = list(targets or self.stages)
+        unknown = [t for t in targets + list(force) if t not in self.stages]
+        if unknown:
+            raise ValueError(f"Bilinmeyen aşama(lar): {unknown}")
+
+        keys = self.keys()
+        forced = self._downstream(force)
+        values = {}
+        self.timings = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        def materialize(name, need_value):
+            if name in values:
+                return values[name]
+            stage = self.stages[name]
+            path = self._cache_path(name, keys[name])
+            cached = (name not in forced and os.path.exists(path)
+                      and all(os.path.exists(p) for p in stage.outputs))
+
+            if cached:
+                if not need_value:
+                    self.timings.setdefault(name, {'durum': 'onbellek', 'sure_s': 0.0})
+                    return None
+                start = time.perf_counter()
+                with open(path, 'rb') as f:
+                    values[name] = pickle.load(f)
+                self.timings[name] = {'durum': 'onbellek', 'sure_s': time.perf_counter() - start}
+                return values[name]
+
+            args = [materialize(dep, True) for dep in stage.deps]
+            print(f"\n▶️  {name}")
+            start = time.perf_counter()
+            values[name] = stage.func(*args, **stage.params)
+            elapsed = time.perf_counter() - start
+
+            # Yarım yazılmış dosya önbellek sanılmasın diye önce geçici dosyaya yazılır
+            with open(path + '.tmp', 'wb') as f:
+                pickle.dump(values[name], f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(path + '.tmp', path)
+            self.timings[name] = {'durum': 'calisti', 'sure_s': elapsed}
+            return values[name]
+
+        total = time.perf_counter()
+        for target in targets:
+            materialize(target, False)
+        total = time.perf_counter() - total
+
+        self._log_run(keys, total)
+        return values
+
+    def _log_run(self, keys, total):
+        """Aşama sürelerini yazdır ve çalıştırma kaydına ekle"""
+        print(f"\n⏱️  Aşama Süreleri:")
+        for name, timing in self.timings.items():
+            print(f"   • {name:<14} {timing['durum']:<9} {timing['sure_s']:8.2f} s")
+        print(f"   • {'toplam':<14} {'':<9} {total:8.2f} s")
+
+        record = {
+            'zaman': datetime.now().isoformat(),
+            'toplam_s': total,
+            'asamalar': {name: dict(timing, anahtar=keys[name]) for name, timing in self.timings.items()},
+        }
+        with open(os.path.join(self.cache_dir, 'runs.jsonl'), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+# Aşama fonksiyonları
+
+def load_stage(path):
+    """Veri setini yükle"""
+    df = pd.read_csv(path)
+    print(f"   ✅ {len(df):,} satır yüklendi")
+    return df
+
+def encode_stage(df):
+    """Kategorik değişkenleri kodla; (df_processed, label_encoders) döner"""
+    return preprocess_data(df)
+
+def split_stage(encoded, test_size, random_state):
+    """Eğitim-test ayrımının satır indekslerini üret (veri kopyalanmaz)"""
+    df_processed, _ = encoded
+    train_idx, test_idx = train_test_split(
+        np.arange(len(df_processed)), test_size=test_size, random_state=random_state
+    )
+    print(f"   • Eğitim seti: {len(train_idx):,} örnek")
+    print(f"   • Test seti: {len(test_idx):,} örnek")
+    return train_idx, test_idx
+
+def _xy(encoded, idx):
+    df_processed, _ = encoded
+    part = df_processed.iloc[idx]
+    return part.drop('fiyat_tl', axis=1), part['fiyat_tl']
+
+def baseline_stage(encoded, split, n_estimators, random_state):
+    """Temel Random Forest modelini eğit (main.py'deki karşılaştırma modeli)"""
+    X_train, y_train = _xy(encoded, split[0])
+    model = RandomForestRegressor(n_estimators=n_estimators, random_state=random_state, n_jobs=-1)
+    return model.fit(X_train, y_train)
+
+def grid_search_stage(encoded, split, param_grid, cv, random_state):
+    """Hiperparametre optimizasyonu; (en iyi model, en iyi parametreler) döner"""
+    X_train, y_train = _xy(encoded, split[0])
+    grid_search = GridSearchCV(
+        RandomForestRegressor(random_state=random_state, n_jobs=-1), param_grid, cv=cv,
+        scoring='neg_mean_absolute_error', n_jobs=-1, verbose=1
+    )
+    grid_search.fit(X_train, y_train)
+    print(f"   • En iyi parametreler: {grid_search.best_params_}")
+    return grid_search.best_estimator_, grid_search.best_params_
+
+def _metrics(y_true, y_pred):
+    return {
+        'mae': mean_absolute_error(y_true, y_pred),
+        'rmse': np.sqrt(mean_squared_error(y_true, y_pred)),
+        'r2': r2_score(y_true, y_pred),
+    }
+
+def evaluate_stage(encoded, split, baseline, grid):
+    """Test setinde iki modeli ölç; main.visualize_results'ın beklediği sonuç sözlüğünü döndür"""
+    X_test, y_test = _xy(encoded, split[1])
+    best_model, best_params = grid
+    basic_predictions = baseline.predict(X_test)
+    best_predictions = best_model.predict(X_test)
+    results = {
+        'basic_predictions': basic_predictions,
+        'best_predictions': best_predictions,
+        'basic_metrics': _metrics(y_test, basic_predictions),
+        'best_metrics': _metrics(y_test, best_predictions),
+        'best_params': best_params,
+        'y_test': y_test,
+        'feature_importance': analyze_feature_importance(best_model, X_test.columns),
+    }
+    for label, key in (('Temel RF', 'basic_metrics'), ('Optimize RF', 'best_metrics')):
+        m = results[key]
+        print(f"   🏆 {label}: MAE {m['mae']:,.0f} TL | RMSE {m['rmse']:,.0f} TL | R² {m['r2']:.4f}")
+    return results
+
+def plot_stage(results, path, dpi):
+    """Sonuç grafiklerini pencere açmadan dosyaya çiz"""
+    visualize_results(results, results['y_test'], results['feature_importance'],
+                      path=path, dpi=dpi, show=False)
+    return path
+
+def save_stage(df, encoded, grid):
+    """Modeli ve API dosyalarını model/ klasörüne kaydet (train_and_save_model.py ile aynı çıktılar)"""
+    from train_and_save_model import save_model_and_encoders
+
+    df_processed, label_encoders = encoded
+    best_model, _ = grid
+    feature_names = df_processed.drop('fiyat_tl', axis=1).columns.tolist()
+    save_model_and_encoders(best_model, label_encoders, feature_names, df)
+    return feature_names
+
+def build_pipeline(data_path=DATA_PATH, param_grid=None, plot_path='random_forest_results.png',
+                   dpi=300, cache_dir=CACHE_DIR):
+    """Ev fiyatı modelinin aşamalarını tanımla"""
+    return Pipeline([
+        Stage('load', load_stage, params={'path': data_path}, files=[data_path]),
+        Stage('encode', encode_stage, deps=['load'], code=[preprocess_data]),
+        Stage('split', split_stage, deps=['encode'], params={'test_size': 0.2, 'random_state': 42}),
+        Stage('baseline', baseline_stage, deps=['encode', 'split'],
+              params={'n_estimators': 100, 'random_state': 42}, code=[_xy]),
+        Stage('grid_search', grid_search_stage, deps=['encode', 'split'],
+              params={'param_grid': param_grid or PARAM_GRID, 'cv': 3, 'random_state': 42}, code=[_xy]),
+        Stage('evaluate', evaluate_stage, deps=['encode', 'split', 'baseline', 'grid_search'],
+              code=[_xy, _metrics, analyze_feature_importance]),
+        Stage('plot', plot_stage, deps=['evaluate'], params={'path': plot_path, 'dpi': dpi},
+              outputs=[plot_path], code=[visualize_results]),
+        Stage('save', save_stage, deps=['load', 'encode', 'grid_search'],
+              outputs=['model/random_forest_model.pkl', 'model/label_encoders.pkl',
+                       'model/feature_names.pkl', 'model/categorical_values.pkl',
+                       EXPORT_ARRAYS_PATH, EXPORT_META_PATH, QUANTIZED_ARRAYS_PATH, QUANTIZED_META_PATH,
+                       COMPARABLES_ARRAYS_PATH, COMPARABLES_META_PATH, DRIFT_REFERENCE_PATH],
+              code=['train_and_save_model', 'forest_export', 'forest_quantized', 'comparables',
+                    'drift_monitor', 'model_shards']),
+    ], cache_dir=cache_dir)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ev fiyatı modeli aşamalı eğitim hattı")
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--only', nargs='+', help="Yalnızca bu aşamaları (ve gerekirse bağımlılıklarını) çalıştır")
+    parser.add_argument('--force', nargs='+', default=[], help="Önbelleği yok sayılacak aşamalar")
+    parser.add_argument('--no-plot', action='store_true', help="Grafik aşamasını atla")
+    parser.add_argument('--no-save', action='store_true', help="Model kaydetme aşamasını atla")
+    parser.add_argument('--quick', action='store_true', help="Küçük hiperparametre ızgarası kullan")
+    parser.add_argument('--dpi', type=int, default=300)
+    args = parser.parse_args()
+
+    pipeline = build_pipeline(args.data, QUICK_PARAM_GRID if args.quick else None, dpi=args.dpi)
+    targets = args.only or [
+        name for name in pipeline.stages
+        if not (args.no_plot and name == 'plot') and not (args.no_save and name == 'save')
+    ]
+    pipeline.run(targets, force=args.force)
@@ -0,0 +1,206 @@
+"""
+İstek İzleme ve Örnekleyici CPU Profili
+Tahmin isteklerinin ayarlanabilir bir oranını örnekler ve her örnek için aşama
+sürelerini (doğrulama, kodlama, matris, tahmin, serileştirme, gönderim) sınırlı
+bir halka tamponda (ring buffer) tutar; en yavaş N iz ve aşama yüzdelikleri
+kuyruk gecikmesinin hangi aşamadan geldiğini gösterir. Örneklenmeyen istekler
+için maliyet bir rastgele sayı ve bir contextvar okumasıdır.
+
+CPU profili istatistikseldir: ayrı bir iş parçacığı belirli aralıklarla tüm
+iş parçacıklarının yığınlarını (sys._current_frames) okur ve sayar. Sonuç
+flamegraph araçlarının okuduğu "folded" metin formatındadır (her satır
+`iş_parçacığı;çerçeve;...;çerçeve sayı`).
+
+Kullanım:
+    from request_tracing import RequestTracer, TracingMiddleware, current_trace, sample_cpu_profile
+    tracer = RequestTracer(sample_rate=0.05)
+    app.add_middleware(TracingMiddleware, tracer=tracer, paths=('/tahmin',))
+
+    iz = current_trace()            # örneklenmediyse hiçbir şey yapmayan iz
+    iz.mark('kodlama')              # önceki işaretten bu yana geçen süre
+    profil = sample_cpu_profile(10) # 10 saniyelik folded profil metni
+"""
+
+import contextvars
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+
+import numpy as np
+
+# Tamponda tutulan en fazla iz sayısı
+DEFAULT_CAPACITY = 1000
+
+# CPU profili için varsayılan örnekleme aralığı ve en uzun süre
+DEFAULT_PROFILE_INTERVAL_MS = 5.0
+MAX_PROFILE_SECONDS = 60
+
+# Yanıt gövdesi gönderilene kadar geçen son aşamanın adı
+SEND_STAGE = 'gonderim'
+
+_current = contextvars.ContextVar('istek_izi', default=None)
+
+class Trace:
+    """Tek bir örneklenmiş isteğin aşama süreleri"""
+
+    __slots__ = ('path', 'started_at', 'start', 'last', 'stages', 'fields')
+
+    def __init__(self, path):
+        self.path = path
+        self.started_at = datetime.now().isoformat()
+        self.start = self.last = time.perf_counter()
+        self.stages = {}
+        self.fields = {}
+
+    def mark(self, stage):
+        """Önceki işaretten bu yana geçen süreyi aşamaya ekle (ms)"""
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + (now - self.last) * 1000
+        self.last = now
+
+    def note(self, **fields):
+        """İze ek bilgi ekle (ör. ev sayısı)"""
+        self.fields.update(fields)
+
+    def finish(self, status):
+        """Son aşamayı kapat ve izi sözlük olarak döndür"""
+        self.mark(SEND_STAGE)
+        return {
+            'endpoint': self.path,
+            'baslangic': self.started_at,
+            'durum': status,
+            'toplam_ms': round((self.last - self.start) * 1000, 3),
+            'asamalar': {stage: round(ms, 3) for stage, ms in self.stages.items()},
+            **self.fields,
+        }
+
+class _NullTrace:
+    """Örneklenmeyen istekler için hiçbir şey kaydetmeyen iz"""
+
+    __slots__ = ()
+
+    def mark(self, stage):
+        pass
+
+    def note(self, **fields):
+        pass
+
+NULL_TRACE = _NullTrace()
+
+def current_trace():
+    """Bu isteğin izi; istek örneklenmediyse NULL_TRACE"""
+    return _current.get() or NULL_TRACE
+
+class RequestTracer:
+    """Örnekleme kararı ve tamamlanan izlerin halka tamponu
+
+    İzler olay döngüsünde (tek iş parçacığında) eklendiğinden kilit kullanılmaz.
+    """
+
+    def __init__(self, sample_rate=0.0, capacity=DEFAULT_CAPACITY):
+        self.sample_rate = sample_rate
+        self.traces = deque(maxlen=capacity)
+        self.sampled = 0
+
+    def should_sample(self):
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def record(self, trace):
+        self.traces.append(trace)
+        self.sampled += 1
+
+    def slowest(self, n, path=None):
+        """Tampondaki en yavaş n iz (isteğe bağlı olarak tek endpoint için)"""
+        traces = [t for t in self.traces if path is None or t['endpoint'] == path]
+        return sorted(traces, key=lambda t: t['toplam_ms'], reverse=True)[:n]
+
+    def stage_summary(self, path=None):
+        """Her aşama için tampondaki izler üzerinden p50 / p99 / en büyük süre (ms)"""
+        durations = {}
+        for trace in self.traces:
+            if path is None or trace['endpoint'] == path:
+                for stage, ms in trace['asamalar'].items():
+                    durations.setdefault(stage, []).append(ms)
+        summary = {}
+        for stage, values in durations.items():
+            p50, p99 = np.percentile(values, [50, 99])
+            summary[stage] = {'p50_ms': round(float(p50), 3), 'p99_ms': round(float(p99), 3),
+                              'max_ms': round(max(values), 3), 'adet': len(values)}
+        return summary
+
+    def reset(self):
+        """Tampondaki izleri sil"""
+        self.traces.clear()
+        self.sampled = 0
+
+class TracingMiddleware:
+    """Belirtilen yollardaki isteklerin bir kısmını örnekleyen ASGI ara katmanı
+
+    İz, istek gelir gelmez başlar; uç nokta fonksiyonuna girene kadar geçen süre
+    (gövde okuma, JSON ayrıştırma, şema doğrulaması) ilk işaretle ölçülür. Yanıt
+    gövdesinin son parçası gönderildiğinde iz tamamlanır.
+    """
+
+    def __init__(self, app, tracer, paths):
+        self.app = app
+        self.tracer = tracer
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] not in self.paths or not self.tracer.should_sample():
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(scope['path'])
+        status = [500]
+
+        async def traced_send(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        token = _current.set(trace)
+        try:
+            await self.app(scope, receive, traced_send)
+        finally:
+            _current.reset(token)
+            self.tracer.record(trace.finish(status[0]))
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+def sample_cpu_profile(seconds, interval_ms=DEFAULT_PROFILE_INTERVAL_MS):
+    """seconds boyunca tüm iş parçacıklarının yığınlarını örnekle; folded profil metnini döndür
+
+    Çağıran iş parçacığı (örnekleyicinin kendisi) sayılmaz. Satırlar en sık
+    görülen yığından başlayarak sıralanır.
+    """
+    own = threading.get_ident()
+    names = {}
+    stacks = Counter()
+    interval = interval_ms / 1000
+    deadline = time.perf_counter() + seconds
+    n_samples = 0
+
+    while time.perf_counter() < deadline:
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            frames = []
+            while frame is not None:
+                frames.append(_frame_label(frame))
+                frame = frame.f_back
+            if ident not in names:
+                names = {t.ident: t.name for t in threading.enumerate()}
+            frames.append(names.get(ident, str(ident)))
+            stacks[';'.join(reversed(frames))] += 1
+        n_samples += 1
+        time.sleep(interval)
+
+    header = f"# {n_samples} örnek, {interval_ms:g} ms aralık, {seconds:g} sn\n"
+    return header + ''.join(f"{stack} {count}\n" for stack, count in stacks.most_common())
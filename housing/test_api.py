@@ -4,12 +4,31 @@ API'nin çalışıp çalışmadığını test eder ve örnek kullanımları gös
 """
 
 import requests
+import argparse
+import asyncio
+import csv
 import json
+import random
 import time
 
 # API base URL
 BASE_URL = "http://localhost:8000"
 
+# Trafik tekrarı (replay) için varsayılan veri seti
+VERI_SETI = "turkiye_ev_fiyatlari.csv"
+
+# CSV'deki sayısal alanlar ve tipleri (diğer alanlar metin olarak gönderilir)
+SAYISAL_ALANLAR = {
+    "net_metrekare": float,
+    "brut_metrekare": float,
+    "kat_sayisi": int,
+    "banyo_sayisi": int
+}
+
+# Geçersiz değer üretilirken bozulabilecek kategorik alanlar
+KATEGORIK_ALANLAR = ['sehir', 'semt', 'ev_tipi', 'oda_sayisi', 'bina_yasi', 'bulundugu_kat',
+                     'balkon', 'isitma_tipi', 'otopark', 'site_ici', 'esyali_durum']
+
 def test_api_health():
     """API sağlık kontrolü"""
     print("🔍 API Sağlık Kontrolü...")
@@ -210,7 +229,8 @@ def test_hata_durumu():
             headers={"Content-Type": "application/json"}
         )
         
-        if response.status_code == 400:
+        # Geçersiz kategorik değerler şema doğrulamasında yakalanır (422)
+        if response.status_code in (400, 422):
             print("   ✅ Hata durumu doğru şekilde yakalandı")
             print(f"   📄 Hata mesajı: {response.json()['detail']}")
         else:
@@ -218,8 +238,183 @@ def test_hata_durumu():
     except Exception as e:
         print(f"   ❌ Test hatası: {e}")
 
+def veri_setini_yukle(dosya=VERI_SETI):
+    """CSV'deki evleri API istek gövdesi formatında yükle (fiyat sütunu hariç)"""
+    evler = []
+    with open(dosya, encoding="utf-8-sig", newline="") as f:
+        for satir in csv.DictReader(f):
+            satir.pop("fiyat_tl", None)
+            for alan, tip in SAYISAL_ALANLAR.items():
+                satir[alan] = tip(satir[alan])
+            evler.append(satir)
+    return evler
+
+class TrafikUretici:
+    """Veri setinden gerçekçi istek akışı örnekler
+
+    Evlerin bir kısmı daha önce gönderilmiş evlerin tekrarı, bir kısmı da
+    geçersiz kategorik değer içeren bozuk evlerdir.
+    """
+
+    def __init__(self, evler, gecersiz_oran=0.05, tekrar_oran=0.2, seed=42):
+        self.evler = evler
+        self.gecersiz_oran = gecersiz_oran
+        self.tekrar_oran = tekrar_oran
+        self.rng = random.Random(seed)
+        self.gonderilenler = []
+
+    def ev(self):
+        """Akıştaki bir sonraki evi üret"""
+        if self.gonderilenler and self.rng.random() < self.tekrar_oran:
+            return self.rng.choice(self.gonderilenler)
+
+        ev = dict(self.rng.choice(self.evler))
+        if self.rng.random() < self.gecersiz_oran:
+            alan = self.rng.choice(KATEGORIK_ALANLAR)
+            ev[alan] = f"Geçersiz{alan.capitalize()}"
+
+        self.gonderilenler.append(ev)
+        return ev
+
+    def istek(self, toplu_oran, toplu_boyut):
+        """(endpoint, gövde) çifti üret; isteklerin bir kısmı toplu tahmindir"""
+        if self.rng.random() < toplu_oran:
+            return "/toplu-tahmin", [self.ev() for _ in range(toplu_boyut)]
+        return "/tahmin", self.ev()
+
+def gecikme_ozeti(gecikmeler_ms):
+    """Gecikme listesinden yüzdelik özeti hesapla"""
+    import numpy as np
+
+    dizi = np.asarray(gecikmeler_ms, dtype=np.float64)
+    p50, p90, p99 = np.percentile(dizi, [50, 90, 99])
+    return {
+        "adet": int(dizi.size),
+        "ortalama_ms": float(dizi.mean()),
+        "p50_ms": float(p50),
+        "p90_ms": float(p90),
+        "p99_ms": float(p99),
+        "max_ms": float(dizi.max())
+    }
+
+async def trafik_tekrari(istekler, rps, base_url=BASE_URL, eszamanli_limit=256):
+    """İstekleri hedef RPS'te açık döngü (open-loop) olarak gönder ve gecikmeleri kaydet
+
+    Her isteğin gönderim zamanı önceden planlanır; yavaş yanıtlar sonraki
+    isteklerin gönderimini geciktirmez, böylece gerçek yük şekli korunur.
+    """
+    import httpx
+
+    sonuclar = {}
+    limit = asyncio.Semaphore(eszamanli_limit)
+
+    async def gonder(client, planlanan, endpoint, govde):
+        await asyncio.sleep(max(0.0, planlanan - time.perf_counter()))
+        async with limit:
+            baslangic = time.perf_counter()
+            try:
+                response = await client.post(endpoint, json=govde)
+                durum = response.status_code
+            except httpx.HTTPError as e:
+                durum = type(e).__name__
+            gecikme = (time.perf_counter() - baslangic) * 1000
+
+        kayit = sonuclar.setdefault(endpoint, {"gecikmeler": [], "durumlar": {}})
+        kayit["gecikmeler"].append(gecikme)
+        kayit["durumlar"][str(durum)] = kayit["durumlar"].get(str(durum), 0) + 1
+
+    limits = httpx.Limits(max_connections=eszamanli_limit, max_keepalive_connections=eszamanli_limit)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        baslangic = time.perf_counter()
+        gorevler = [
+            asyncio.create_task(gonder(client, baslangic + i / rps, endpoint, govde))
+            for i, (endpoint, govde) in enumerate(istekler)
+        ]
+        await asyncio.gather(*gorevler)
+        toplam_sure = time.perf_counter() - baslangic
+
+    return sonuclar, toplam_sure
+
+def test_trafik_tekrari(rps=50, sure=10, gecersiz_oran=0.05, tekrar_oran=0.2,
+                        toplu_oran=0.1, toplu_boyut=20, cikti=None):
+    """Veri setinden örneklenen trafiği hedef RPS'te tekrar oynat ve gecikmeleri raporla"""
+    print(f"\n🚦 Trafik Tekrarı ({rps} RPS, {sure} sn)...")
+
+    uretici = TrafikUretici(veri_setini_yukle(), gecersiz_oran, tekrar_oran)
+    istekler = [uretici.istek(toplu_oran, toplu_boyut) for _ in range(int(rps * sure))]
+
+    sonuclar, toplam_sure = asyncio.run(trafik_tekrari(istekler, rps))
+
+    print(f"   📊 {len(istekler)} istek {toplam_sure:.1f} sn'de gönderildi "
+          f"(gerçekleşen: {len(istekler) / toplam_sure:.1f} RPS)")
+
+    rapor = {}
+    for endpoint, kayit in sorted(sonuclar.items()):
+        ozet = gecikme_ozeti(kayit["gecikmeler"])
+        ozet["durumlar"] = kayit["durumlar"]
+        rapor[endpoint] = ozet
+
+        print(f"   🔗 {endpoint}: {ozet['adet']} istek, durumlar: {ozet['durumlar']}")
+        print(f"      • ortalama: {ozet['ortalama_ms']:.1f} ms | p50: {ozet['p50_ms']:.1f} ms | "
+              f"p90: {ozet['p90_ms']:.1f} ms | p99: {ozet['p99_ms']:.1f} ms | max: {ozet['max_ms']:.1f} ms")
+
+    if cikti:
+        with open(cikti, "w", encoding="utf-8") as f:
+            json.dump(rapor, f, ensure_ascii=False, indent=2)
+        print(f"   💾 Gecikme dağılımları '{cikti}' dosyasına kaydedildi")
+
+    return rapor
+
+def test_istemci_karsilastirmasi(adet=2000):
+    """Aynı evleri tek tek requests.post, havuzlu JSON ve ikili formatlarla gönderip süreleri karşılaştır"""
+    from binary_format import ARROW_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, PayloadError, encode_houses
+    from housing_client import HousingClient
+
+    print(f"\n📦 İstemci Karşılaştırması ({adet} ev)...")
+    evler = veri_setini_yukle()[:adet]
+
+    # Tek tek istek pahalı olduğundan ilk 200 ev üzerinden ölçülüp ölçeklenir
+    ornek = evler[:200]
+    baslangic = time.perf_counter()
+    for ev in ornek:
+        requests.post(f"{BASE_URL}/tahmin", json=ev)
+    tek_tek = (time.perf_counter() - baslangic) * len(evler) / len(ornek)
+    print(f"   • Ev başına requests.post (tahmini): {tek_tek:6.2f} sn | gövde {len(json.dumps(evler).encode()):>9,} bayt")
+
+    with HousingClient(BASE_URL) as istemci:
+        baslangic = time.perf_counter()
+        istemci.predict_many(evler)
+        print(f"   • Havuzlu JSON (/toplu-tahmin, 100'lük):   {time.perf_counter() - baslangic:6.2f} sn")
+
+        for media_type in (MSGPACK_MEDIA_TYPE, ARROW_MEDIA_TYPE):
+            try:
+                boyut = len(encode_houses(evler, media_type))
+                baslangic = time.perf_counter()
+                istemci.predict_matrix(evler, media_type)
+            except PayloadError as e:
+                print(f"   ⚠️ {media_type}: {e}")
+                continue
+            print(f"   • {media_type:<36}: {time.perf_counter() - baslangic:6.2f} sn | gövde {boyut:>9,} bayt")
+
+def argumanlari_oku():
+    """Komut satırı argümanlarını oku"""
+    parser = argparse.ArgumentParser(description="Türkiye Ev Fiyat Tahmini API test scripti")
+    parser.add_argument("--replay", action="store_true", help="Veri setinden örneklenen trafiği tekrar oynat")
+    parser.add_argument("--rps", type=float, default=50, help="Hedef istek/saniye")
+    parser.add_argument("--sure", type=float, default=10, help="Tekrar süresi (saniye)")
+    parser.add_argument("--gecersiz-oran", type=float, default=0.05, help="Geçersiz değer içeren ev oranı")
+    parser.add_argument("--tekrar-oran", type=float, default=0.2, help="Daha önce gönderilmiş evlerin tekrar oranı")
+    parser.add_argument("--toplu-oran", type=float, default=0.1, help="Toplu tahmin isteklerinin oranı")
+    parser.add_argument("--toplu-boyut", type=int, default=20, help="Toplu istek başına ev sayısı")
+    parser.add_argument("--cikti", help="Gecikme raporunun yazılacağı JSON dosyası")
+    parser.add_argument("--istemci", action="store_true", help="Tek tek, havuzlu JSON ve ikili format isteklerini karşılaştır")
+    parser.add_argument("--adet", type=int, default=2000, help="İstemci karşılaştırmasındaki ev sayısı")
+    return parser.parse_args()
+
 def main():
     """Ana test fonksiyonu"""
+    args = argumanlari_oku()
+    
     print("🧪 Türkiye Ev Fiyat Tahmini API Test Scripti")
     print("=" * 50)
     
@@ -229,6 +424,21 @@ def main():
         print("   python api.py")
         return
     
+    # Trafik tekrarı modu
+    if args.replay:
+        test_trafik_tekrari(
+            rps=args.rps, sure=args.sure,
+            gecersiz_oran=args.gecersiz_oran, tekrar_oran=args.tekrar_oran,
+            toplu_oran=args.toplu_oran, toplu_boyut=args.toplu_boyut,
+            cikti=args.cikti
+        )
+        return
+    
+    # İstemci ve format karşılaştırması
+    if args.istemci:
+        test_istemci_karsilastirmasi(args.adet)
+        return
+    
     # Diğer testleri çalıştır
     test_model_info()
     test_kategorik_degerler()
@@ -5,8 +5,12 @@ Bu script modeli eğitir ve API'de kullanmak üzere kaydeder.
 
 import pandas as pd
 import numpy as np
+import argparse
+import multiprocessing
 import pickle
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from sklearn.model_selection import train_test_split, GridSearchCV
 from sklearn.preprocessing import LabelEncoder
 from sklearn.ensemble import RandomForestRegressor
@@ -14,45 +18,148 @@ from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import warnings
 warnings.filterwarnings('ignore')
 
-def load_and_preprocess_data():
-    """Veri setini yükle ve ön işleme yap"""
+from forest_export import export_forest, load_exported_forest, EXPORT_ARRAYS_PATH, EXPORT_META_PATH
+from forest_quantized import quantize_forest, QUANTIZED_ARRAYS_PATH, QUANTIZED_META_PATH
+from comparables import build_comparables_index, encode_frame, COMPARABLES_ARRAYS_PATH, COMPARABLES_META_PATH
+from drift_monitor import build_drift_reference, DRIFT_REFERENCE_PATH
+from model_shards import train_city_shards, SHARD_MANIFEST_PATH
+
+# Kategorik sütunlar: pandas category kodları LabelEncoder ile aynı sıralı kodlardır
+CATEGORICAL_COLUMNS = ['sehir', 'semt', 'ev_tipi', 'oda_sayisi', 'bina_yasi',
+                       'balkon', 'isitma_tipi', 'otopark', 'site_ici', 'esyali_durum']
+
+TARGET = 'fiyat_tl'
+
+# Eğitim için kullanılan veri seti
+DATA_PATH = 'turkiye_ev_fiyatlari.csv'
+
+def peak_rss_mb():
+    """Sürecin şimdiye kadarki en yüksek bellek kullanımı (MB); desteklenmeyen sistemlerde None"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux'ta KB, macOS'ta bayt
+    return peak / 1024 / (1024 if sys.platform == 'darwin' else 1)
+
+def load_and_preprocess_data(path=DATA_PATH):
+    """Veri setini dar veri tipleriyle yükle ve encoder'ları oluştur
+
+    Metin sütunları doğrudan category olarak okunur (uint8/int16 kodlar), tam
+    sayı sütunları en dar işaretsiz tipe indirilir; ayrı bir kodlanmış kopya
+    tutulmaz. (df, label_encoders) döner.
+    """
     print("📊 Veri yükleniyor ve işleniyor...")
     
-    # Veri setini yükle
-    df = pd.read_csv('turkiye_ev_fiyatlari.csv')
+    # Veri setini yükle (bulundugu_kat da 'Bahçe Katı' içerdiğinden category okunur)
+    df = pd.read_csv(path, dtype={col: 'category' for col in CATEGORICAL_COLUMNS + ['bulundugu_kat']})
+    for col in df.columns:
+        if pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast='unsigned')
     
-    # Kategorik değişkenleri encode et
-    categorical_columns = ['sehir', 'semt', 'ev_tipi', 'oda_sayisi', 'bina_yasi', 
-                          'balkon', 'isitma_tipi', 'otopark', 'site_ici', 'esyali_durum']
+    # Encoder'lar API ve dışa aktarma için yalnızca sınıf listeleri üzerinden kurulur
+    label_encoders = {col: LabelEncoder().fit(df[col].cat.categories.to_numpy()) for col in CATEGORICAL_COLUMNS}
     
-    df_processed = df.copy()
-    label_encoders = {}
+    print(f"   ✅ {len(df)} satır veri işlendi")
     
-    for col in categorical_columns:
-        le = LabelEncoder()
-        df_processed[col] = le.fit_transform(df_processed[col])
-        label_encoders[col] = le
+    return df, label_encoders
+
+def build_feature_matrix(df, feature_names, order=None):
+    """Özellikleri tek bir C sıralı float32 matrise yaz; (X, y) döner
+
+    order verilirse satırlar bu sırayla yazılır (ayrım için ek kopya gerekmez).
+    Random Forest ağaçları zaten float32 üzerinde çalıştığından eğitimde
+    matris yeniden kopyalanmaz.
+    """
+    n_rows = len(df) if order is None else len(order)
+    X = np.empty((n_rows, len(feature_names)), dtype=np.float32)
+    for j, col in enumerate(feature_names):
+        if col in CATEGORICAL_COLUMNS:
+            values = df[col].cat.codes.to_numpy()
+        elif col == 'bulundugu_kat':
+            # Bahçe Katı = 0, diğer katlar sayısal değeri
+            categories = df[col].cat.categories
+            kat_kodlari = np.array([0 if c == 'Bahçe Katı' else int(c) for c in categories], dtype=np.float32)
+            values = kat_kodlari[df[col].cat.codes.to_numpy()]
+        else:
+            values = df[col].to_numpy()
+        X[:, j] = values if order is None else values[order]
     
-    # Bulunduğu kat sütununu işle (Bahçe Katı = 0)
-    df_processed['bulundugu_kat'] = df_processed['bulundugu_kat'].replace('Bahçe Katı', 0)
-    df_processed['bulundugu_kat'] = pd.to_numeric(df_processed['bulundugu_kat'])
+    y = df[TARGET].to_numpy(dtype=np.float64)
+    return X, y if order is None else y[order]
+
+def split_feature_matrix(df, feature_names):
+    """Eğitim-test ayrımı; (X_train, X_test, y_train, y_test) döner
+
+    Matris eğitim satırları önde olacak şekilde bir kez yazılır, eğitim ve test
+    kümeleri bu matrisin dilimleridir (kopya değil).
+    """
+    train_idx, test_idx = train_test_split(np.arange(len(df)), test_size=0.2, random_state=42)
+    X, y = build_feature_matrix(df, feature_names, np.concatenate([train_idx, test_idx]))
+    n_train = len(train_idx)
+    return X[:n_train], X[n_train:], y[:n_train], y[n_train:]
+
+def legacy_split(path=DATA_PATH):
+    """Eski hazırlık yolu (yalnızca bellek karşılaştırması için)
+
+    Ham df, kodlanmış df.copy(), drop ile oluşan özellik tablosu ve kopyalanan
+    eğitim-test kümeleri aynı anda bellekte tutulur. (df, df_processed, X, bölümler) döner.
+    """
+    df = pd.read_csv(path)
+    df_processed = df.copy()
+    for col in CATEGORICAL_COLUMNS:
+        df_processed[col] = LabelEncoder().fit_transform(df_processed[col])
+    df_processed['bulundugu_kat'] = pd.to_numeric(df_processed['bulundugu_kat'].replace('Bahçe Katı', 0))
     
-    print(f"   ✅ {len(df)} satır veri işlendi")
+    X = df_processed.drop(TARGET, axis=1)
+    y = df_processed[TARGET]
+    return df, df_processed, X, train_test_split(X, y, test_size=0.2, random_state=42)
+
+def compact_split(path=DATA_PATH):
+    """Yeni hazırlık yolu: dar tipli df ve tek float32 matristen dilim bölümler"""
+    df, _ = load_and_preprocess_data(path)
+    feature_names = [col for col in df.columns if col != TARGET]
+    return df, split_feature_matrix(df, feature_names)
+
+def _split_peak_rss(legacy, path):
+    """Ayrı süreçte hazırlık yolunu çalıştır; (içe aktarma sonrası, hazırlık sonrası) peak RSS döner"""
+    baseline = peak_rss_mb()
+    data = legacy_split(path) if legacy else compact_split(path)
+    peak = peak_rss_mb()
+    del data
+    return baseline, peak
+
+def compare_legacy_memory(path=DATA_PATH):
+    """Eski ve yeni veri hazırlığının peak RSS değerlerini karşılaştır; (eski, yeni) MB döner
+
+    Her yol kendi spawn sürecinde çalışır, böylece peak değerleri birbirine
+    karışmaz. Değerler içe aktarmaların (pandas, scikit-learn) üzerindeki
+    artıştır; orman eğitimi ölçüme dahil değildir.
+    """
+    print("📏 Veri hazırlığının bellek kullanımı karşılaştırılıyor...")
+    increases = []
+    for legacy in (True, False):
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            baseline, peak = pool.submit(_split_peak_rss, legacy, path).result()
+        if baseline is None:
+            print("   ⚠️  Bu sistemde peak RSS ölçülemiyor")
+            return None
+        increases.append(peak - baseline)
+        print(f"   • {'Eski (df.copy/drop/train_test_split)' if legacy else 'Yeni (tek float32 matris)'}: "
+              f"{peak:,.0f} MB peak RSS (+{peak - baseline:,.0f} MB)")
     
-    return df_processed, label_encoders, df
+    old, new = increases
+    print(f"   📉 Hazırlık belleği: {old:,.1f} MB → {new:,.1f} MB ({old / max(new, 1e-9):.1f}x daha az)")
+    return old, new
 
-def train_model(df_processed):
+def train_model(df):
     """Random Forest modelini eğit"""
     print("🌲 Random Forest modeli eğitiliyor...")
     
     # Özellikler ve hedef değişken
-    X = df_processed.drop('fiyat_tl', axis=1)
-    y = df_processed['fiyat_tl']
-    
-    # Eğitim-test ayrımı
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42
-    )
+    feature_names = [col for col in df.columns if col != TARGET]
+    X_train, X_test, y_train, y_test = split_feature_matrix(df, feature_names)
     
     # Hiperparametre optimizasyonu
     param_grid = {
@@ -86,7 +193,7 @@ def train_model(df_processed):
     print(f"      • R² Score: {r2:.4f}")
     print(f"      • En iyi parametreler: {grid_search.best_params_}")
     
-    return best_model, X.columns.tolist()
+    return best_model, feature_names
 
 def save_model_and_encoders(model, label_encoders, feature_names, original_df):
     """Modeli ve encoder'ları kaydet"""
@@ -109,10 +216,7 @@ def save_model_and_encoders(model, label_encoders, feature_names, original_df):
     
     # Kategorik değişkenlerin benzersiz değerlerini kaydet (API validasyonu için)
     categorical_values = {}
-    categorical_columns = ['sehir', 'semt', 'ev_tipi', 'oda_sayisi', 'bina_yasi', 
-                          'balkon', 'isitma_tipi', 'otopark', 'site_ici', 'esyali_durum']
-    
-    for col in categorical_columns:
+    for col in CATEGORICAL_COLUMNS:
         categorical_values[col] = sorted(original_df[col].unique().tolist())
     
     # Bulundugu_kat için özel değerler
@@ -123,23 +227,67 @@ def save_model_and_encoders(model, label_encoders, feature_names, original_df):
     with open('model/categorical_values.pkl', 'wb') as f:
         pickle.dump(categorical_values, f)
     
+    # API'nin pandas/scikit-learn olmadan servis yapabilmesi için dışa aktar
+    export_forest(model, label_encoders, feature_names)
+    
+    # Aynı ormanın nicemlenmiş, daha küçük kopyası (API varsa bunu tercih eder)
+    quantize_forest(load_exported_forest())
+    
+    # /benzer-evler için şehre göre bölümlenmiş emsal indeksi
+    encoder_classes = {col: [str(c) for c in le.classes_] for col, le in label_encoders.items()}
+    X = encode_frame(original_df, encoder_classes, feature_names)
+    build_comparables_index(X, original_df['fiyat_tl'].to_numpy(), feature_names, encoder_classes)
+    
+    # /drift için eğitim dağılımının referans histogramları
+    predictions = model.predict(X)
+    build_drift_reference(X, predictions, feature_names, encoder_classes)
+    
+    # Eski şehir modelleri yeni genel modelle uyumsuzdur; yeniden eğitilene kadar devre dışı
+    if os.path.exists(SHARD_MANIFEST_PATH):
+        os.remove(SHARD_MANIFEST_PATH)
+    
     print(f"   ✅ Model dosyaları 'model/' klasörüne kaydedildi:")
     print(f"      • random_forest_model.pkl")
     print(f"      • label_encoders.pkl")
     print(f"      • feature_names.pkl")
     print(f"      • categorical_values.pkl")
+    print(f"      • {os.path.basename(EXPORT_ARRAYS_PATH)}, {os.path.basename(EXPORT_META_PATH)}")
+    print(f"      • {os.path.basename(QUANTIZED_ARRAYS_PATH)}, {os.path.basename(QUANTIZED_META_PATH)}")
+    print(f"      • {os.path.basename(COMPARABLES_ARRAYS_PATH)}, {os.path.basename(COMPARABLES_META_PATH)}")
+    print(f"      • {os.path.basename(DRIFT_REFERENCE_PATH)}")
 
-def main():
+def train_shards(df, model, feature_names, label_encoders):
+    """Her şehir için ayrı model eğit ve kaydet (genel model yedek olarak kalır)"""
+    print("🏙️  Şehir modelleri eğitiliyor...")
+    X_train, X_test, y_train, y_test = split_feature_matrix(df, feature_names)
+    manifest = train_city_shards(X_train, y_train, X_test, y_test, model, feature_names, label_encoders)
+    used = sum(entry['kullan'] for entry in manifest['shards'].values())
+    print(f"   ✅ {used}/{len(manifest['shards'])} şehir için ayrı model kaydedildi: {os.path.dirname(SHARD_MANIFEST_PATH)}/")
+
+def main(shards=False, compare_legacy=None):
     """Ana fonksiyon"""
     try:
+        # Yalnızca bellek karşılaştırması (eğitim yapılmaz); compare_legacy CSV yoludur
+        if compare_legacy:
+            compare_legacy_memory(compare_legacy)
+            return
+        
         # Veri yükleme ve ön işleme
-        df_processed, label_encoders, original_df = load_and_preprocess_data()
+        df, label_encoders = load_and_preprocess_data()
         
         # Model eğitimi
-        model, feature_names = train_model(df_processed)
+        model, feature_names = train_model(df)
         
         # Model ve encoder'ları kaydet
-        save_model_and_encoders(model, label_encoders, feature_names, original_df)
+        save_model_and_encoders(model, label_encoders, feature_names, df)
+        
+        # Şehir modelleri (isteğe bağlı); kaydetme eski şehir modellerini devre dışı bırakır
+        if shards:
+            train_shards(df, model, feature_names, label_encoders)
+        
+        peak = peak_rss_mb()
+        if peak is not None:
+            print(f"   📈 En yüksek bellek kullanımı (peak RSS): {peak:,.0f} MB")
         
         print(f"\n🎉 Model başarıyla eğitildi ve kaydedildi!")
         print(f"   Artık 'python api.py' komutu ile API'yi başlatabilirsiniz.")
@@ -151,4 +299,9 @@ def main():
         print(f"❌ Beklenmeyen hata: {e}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Ev fiyatı modelini eğit ve kaydet")
+    parser.add_argument('--shards', action='store_true', help="Genel modele ek olarak her şehir için ayrı model eğit")
+    parser.add_argument('--compare-legacy', nargs='?', const=DATA_PATH, metavar='CSV',
+                        help="Eğitim yapmadan eski ve yeni veri hazırlığının peak RSS değerlerini karşılaştır")
+    args = parser.parse_args()
+    main(shards=args.shards, compare_legacy=args.compare_legacy) 
\ No newline at end of file
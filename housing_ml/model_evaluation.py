@@ -0,0 +1,207 @@
+"""
+Model Değerlendirme Düzeneği - Ortak Katmanlar (Fold) Üzerinde Paralel Karşılaştırma
+`Untitled.ipynb` içindeki LinearRegression ve `intro/decision_tree.ipynb` içindeki
+DecisionTreeRegressor / RandomForestRegressor denemeleri her biri kendi
+train_test_split'i ve elle hesaplanan metriklerle yapılıyordu. Bu modül
+`HousingData_Clean.csv` dosyasını bir kez sayısal matrislere çevirip katmanlarla
+(KFold) birlikte önbelleğe alır, aday modelleri aynı katmanlarda paralel çalıştırır
+ve eğitim süresi, tahmin gecikmesi, bellek, MAE / MSE / R² değerlerini tek bir
+karşılaştırma tablosunda toplar. Değişmeyen adayların sonuçları yeniden kullanılır.
+
+Kullanım (notebook içinden):
+    from model_evaluation import compare_models, DEFAULT_CANDIDATES
+    table = compare_models(DEFAULT_CANDIDATES)
+    table
+
+Komut satırından:
+    python model_evaluation.py --splits 5 --jobs 4
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import KFold, train_test_split
+from sklearn.tree import DecisionTreeRegressor
+
+DATA_PATH = "HousingData_Clean.csv"
+TARGET = "MEDV"
+
+# Önbellek klasörü (matrisler, katmanlar, sonuçlar)
+CACHE_DIR = ".eval_cache"
+
+# Notebook'lardaki modeller
+DEFAULT_CANDIDATES = {
+    "LinearRegression": LinearRegression(),
+    "DecisionTree(max_depth=4)": DecisionTreeRegressor(max_depth=4, random_state=42),
+    "RandomForest(n=11, max_depth=4)": RandomForestRegressor(n_estimators=11, max_depth=4, random_state=42),
+}
+
+# Tek satır tahmin gecikmesi için tekrar sayısı
+LATENCY_REPEATS = 50
+
+def _file_hash(path):
+    """Dosya içeriğinin kısa özeti (veri değiştiğinde önbellek geçersiz olur)"""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+def _estimator_key(estimator):
+    """Modelin sınıfı ve parametrelerinden kararlı bir anahtar üret"""
+    params = sorted((k, repr(v)) for k, v in estimator.get_params(deep=True).items())
+    raw = repr((type(estimator).__module__, type(estimator).__name__, params))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+def load_matrices(path=DATA_PATH, target=TARGET, cache_dir=CACHE_DIR):
+    """CSV'yi float64 X, y matrislerine çevir; sonuç dosya özetine göre .npz olarak önbelleğe alınır
+
+    (X, y, özellik adları, veri anahtarı) döner.
+    """
+    data_key = _file_hash(path)
+    cache_path = os.path.join(cache_dir, f"matrices_{data_key}.npz")
+    if os.path.exists(cache_path):
+        cached = np.load(cache_path, allow_pickle=False)
+        return cached["X"], cached["y"], list(cached["features"]), data_key
+
+    df = pd.read_csv(path, index_col=0)
+    features = [c for c in df.columns if c != target]
+    X = np.ascontiguousarray(df[features].to_numpy(dtype=np.float64))
+    y = df[target].to_numpy(dtype=np.float64)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    np.savez(cache_path, X=X, y=y, features=np.array(features))
+    return X, y, features, data_key
+
+def make_folds(n_samples, data_key, n_splits=5, random_state=42, cache_dir=CACHE_DIR):
+    """Katman indekslerini üret ya da önbellekten yükle; [(train_idx, test_idx), ...] döner
+
+    n_splits=1 notebook'lardaki tek bölmeyi (test_size=0.3, random_state=42) verir.
+    """
+    cache_path = os.path.join(cache_dir, f"folds_{data_key}_{n_splits}_{random_state}.npz")
+    if os.path.exists(cache_path):
+        cached = np.load(cache_path)
+        return [(cached[f"train_{i}"], cached[f"test_{i}"]) for i in range(n_splits)]
+
+    if n_splits == 1:
+        folds = [tuple(train_test_split(np.arange(n_samples), test_size=0.3, random_state=random_state))]
+    else:
+        folds = list(KFold(n_splits, shuffle=True, random_state=random_state).split(np.arange(n_samples)))
+
+    os.makedirs(cache_dir, exist_ok=True)
+    arrays = {}
+    for i, (train_idx, test_idx) in enumerate(folds):
+        arrays[f"train_{i}"] = train_idx
+        arrays[f"test_{i}"] = test_idx
+    np.savez(cache_path, **arrays)
+    return folds
+
+def evaluate_fold(name, estimator, X, y, train_idx, test_idx, fold):
+    """Tek bir modeli tek bir katmanda eğit ve ölç"""
+    model = clone(estimator)
+    X_train, y_train = X[train_idx], y[train_idx]
+    X_test, y_test = X[test_idx], y[test_idx]
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_time = time.perf_counter() - start
+    _, fit_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    y_pred = model.predict(X_test)
+    batch_time = time.perf_counter() - start
+
+    # Tek satır (API'deki gibi) tahmin gecikmesi: tekrarların medyanı
+    row = X_test[:1]
+    timings = []
+    for _ in range(LATENCY_REPEATS):
+        start = time.perf_counter()
+        model.predict(row)
+        timings.append(time.perf_counter() - start)
+
+    return {
+        "model": name,
+        "fold": fold,
+        "mae": mean_absolute_error(y_test, y_pred),
+        "mse": mean_squared_error(y_test, y_pred),
+        "r2": r2_score(y_test, y_pred),
+        "fit_s": fit_time,
+        "predict_us_per_row": batch_time / len(test_idx) * 1e6,
+        "single_row_ms": float(np.median(timings)) * 1e3,
+        "fit_peak_mb": fit_peak / 2 ** 20,
+        "model_kb": len(pickle.dumps(model)) / 1024,
+    }
+
+def summarize(results):
+    """Katman sonuçlarını model başına ortalama (± std) tek tabloda topla; R²'ye göre sıralı"""
+    df = pd.DataFrame(results)
+    metrics = [c for c in df.columns if c not in ("model", "fold")]
+    table = df.groupby("model")[metrics].mean()
+    for col in ("mae", "r2"):
+        table[f"{col}_std"] = df.groupby("model")[col].std(ddof=0)
+    return table.sort_values("r2", ascending=False)
+
+def compare_models(candidates=None, path=DATA_PATH, target=TARGET, n_splits=5, random_state=42,
+                   n_jobs=-1, cache_dir=CACHE_DIR, reuse_results=True):
+    """Aday modelleri aynı katmanlarda paralel değerlendir ve karşılaştırma tablosunu döndür
+
+    candidates: {ad: sklearn regresörü}. reuse_results=True iken aynı veri, katman
+    ve parametrelerle daha önce ölçülmüş adaylar yeniden çalıştırılmaz.
+    """
+    candidates = candidates or DEFAULT_CANDIDATES
+    X, y, _, data_key = load_matrices(path, target, cache_dir)
+    folds = make_folds(len(y), data_key, n_splits, random_state, cache_dir)
+
+    results_path = os.path.join(cache_dir, f"results_{data_key}_{n_splits}_{random_state}.json")
+    stored = {}
+    if reuse_results and os.path.exists(results_path):
+        with open(results_path, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+
+    keys = {name: _estimator_key(est) for name, est in candidates.items()}
+    pending = [name for name in candidates if keys[name] not in stored]
+
+    # Her (model, katman) çifti ayrı bir iş; hızlı modeller yavaş olanları beklemez
+    fresh = Parallel(n_jobs=n_jobs)(
+        delayed(evaluate_fold)(name, candidates[name], X, y, train_idx, test_idx, fold)
+        for name in pending
+        for fold, (train_idx, test_idx) in enumerate(folds)
+    )
+    for row in fresh:
+        stored.setdefault(keys[row["model"]], []).append(row)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(results_path, "w", encoding="utf-8") as f:
+        json.dump(stored, f, ensure_ascii=False)
+
+    results = []
+    for name in candidates:
+        # Önbellekteki satırlar farklı bir adla kaydedilmiş olabilir
+        results.extend(dict(row, model=name) for row in stored[keys[name]])
+    return summarize(results)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HousingData model karşılaştırması")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--splits", type=int, default=5, help="KFold katman sayısı (1 = notebook bölmesi)")
+    parser.add_argument("--jobs", type=int, default=-1)
+    parser.add_argument("--no-cache", action="store_true", help="Önceki sonuçları kullanma")
+    args = parser.parse_args()
+
+    pd.set_option("display.width", 200)
+    print(compare_models(path=args.data, n_splits=args.splits, n_jobs=args.jobs,
+                         reuse_results=not args.no_cache).round(4))
@@ -0,0 +1,337 @@
+"""
+Veri Temizleme Motoru - Bildirimsel (Declarative) Kurallar + Parça Parça İşleme
+`pandas.ipynb` ve `housing_ml/Untitled.ipynb` içinde elle yapılan temizlik
+adımlarını (para birimi dönüşümü, tarih okuma, ortalama / mod / ffill-bfill ile
+doldurma) tek bir kural sözlüğü (spec) ile tanımlar. Dosya sabit boyutlu
+parçalar halinde okunur, her sütunun ayrıştırıcısı (parser) bir kez hazırlanır
+ve doldurma istatistikleri akış halinde hesaplanıp JSON olarak kaydedilir.
+Yeni dosyalar kaydedilmiş istatistiklerle tek geçişte temizlenir; çok GB'lık
+dışa aktarımlar belleğe sığmasa da işlenebilir.
+
+Kullanım:
+    from data_cleaning import CleaningEngine, SALES_SPEC
+    engine = CleaningEngine(SALES_SPEC).fit("Chocolate Sales2.csv")
+    engine.save("sales_stats.json")
+    df = engine.transform("Chocolate Sales2.csv")
+    engine.transform("yeni_satislar.csv", out_path="yeni_satislar_clean.parquet")
+
+    # Ya da tek çağrıyla (istatistikler varsa yeniden kullanılır):
+    clean_csv("Chocolate Sales2.csv", SALES_SPEC, "sales_clean.csv", "sales_stats.json")
+"""
+
+import io
+import json
+import os
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+# Varsayılan parça boyutu (satır)
+CHUNK_SIZE = 200_000
+
+# Sütun türleri ve doldurma stratejileri
+COLUMN_TYPES = ("number", "currency", "date", "category")
+IMPUTE_STRATEGIES = ("mean", "mode", "ffill_bfill", "constant", "none")
+
+# Chocolate Sales.csv: "$5,320 " tutarlar, "04-Jan-22" tarihler
+SALES_SPEC = {
+    "columns": {
+        "Sales Person": {"type": "category", "impute": "mode"},
+        "Country": {"type": "category", "impute": "mode"},
+        "Product": {"type": "category", "impute": "mode"},
+        "Date": {"type": "date", "format": "%d-%b-%y", "impute": "ffill_bfill"},
+        "Amount": {"type": "currency", "impute": "mean"},
+        "Boxes Shipped": {"type": "number", "impute": "mean"},
+    },
+}
+
+# HousingData.csv: tüm sütunlar sayısal, boşluklar ortalama ile (df.fillna(df.mean()))
+HOUSING_SPEC = {
+    "default": {"type": "number", "impute": "mean"},
+}
+
+def _validate_rule(column, rule):
+    """Bir sütun kuralını kontrol et ve varsayılanlarla tamamla"""
+    rule = {"type": "number", "impute": "none", **rule}
+    if rule["type"] not in COLUMN_TYPES:
+        raise ValueError(f"{column}: bilinmeyen tür '{rule['type']}' (geçerli: {COLUMN_TYPES})")
+    if rule["impute"] not in IMPUTE_STRATEGIES:
+        raise ValueError(f"{column}: bilinmeyen doldurma '{rule['impute']}' (geçerli: {IMPUTE_STRATEGIES})")
+    if rule["impute"] == "mean" and rule["type"] not in ("number", "currency"):
+        raise ValueError(f"{column}: 'mean' yalnızca sayısal sütunlarda kullanılabilir")
+    if rule["impute"] == "constant" and "value" not in rule:
+        raise ValueError(f"{column}: 'constant' için 'value' verilmelidir")
+    return rule
+
+def _compile_parser(rule):
+    """Kurala göre ham (metin) sütunu dönüştüren fonksiyonu bir kez hazırla"""
+    kind = rule["type"]
+
+    if kind == "currency":
+        # "$5,320 " -> 5320.0: sembol, binlik ayırıcı ve boşluklar tek C seviyesinde translate ile silinir
+        table = str.maketrans("", "", rule.get("symbols", "$€£₺, "))
+
+        def parse(s):
+            return pd.to_numeric(s.astype("string").str.translate(table), errors="coerce").astype("float64")
+        return parse
+
+    if kind == "date":
+        fmt = rule.get("format")
+
+        def parse(s):
+            # cache=True: tekrar eden tarih metinleri bir kez ayrıştırılır
+            return pd.to_datetime(s, format=fmt, errors="coerce", cache=True)
+        return parse
+
+    if kind == "category":
+        def parse(s):
+            return s.astype("object").where(s.notna(), None)
+        return parse
+
+    def parse(s):
+        return pd.to_numeric(s, errors="coerce").astype("float64")
+    return parse
+
+class _RangeReader(io.RawIOBase):
+    """Dosyanın [start, end) bayt aralığını okunabilir akış olarak sunar"""
+
+    def __init__(self, f, start, end):
+        self._f = f
+        self._f.seek(start)
+        self._remaining = None if end is None else max(end - start, 0)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        view = memoryview(buffer)
+        if self._remaining is not None:
+            view = view[:self._remaining]
+        n = self._f.readinto(view)
+        if self._remaining is not None:
+            self._remaining -= n
+        return n
+
+def _json_value(value):
+    """İstatistik değerini JSON'a yazılabilir hale getir"""
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+class CleaningEngine:
+    """Spec'teki kurallarla CSV dosyalarını parça parça temizleyen motor
+
+    Doldurma istatistikleri (toplam/adet, değer sayıları, ilk/son değer) akış
+    halinde birikir; böylece fit birden fazla dosya üzerinde artımlı yapılabilir.
+    """
+
+    def __init__(self, spec, stats=None):
+        self.spec = spec
+        self.stats = stats or {}
+        self._rules = {col: _validate_rule(col, rule) for col, rule in spec.get("columns", {}).items()}
+        self._default = _validate_rule("<default>", spec["default"]) if spec.get("default") else None
+        self._parsers = {}
+
+    def rules_for(self, columns):
+        """Dosyadaki sütunlar için geçerli kuralları döndür (spec'te olmayanlar varsayılan kurala düşer)"""
+        rules = {}
+        for col in columns:
+            if col in self._rules:
+                rules[col] = self._rules[col]
+            elif self._default is not None:
+                rules[col] = self._default
+        return rules
+
+    def _parser(self, column, rule):
+        if column not in self._parsers:
+            self._parsers[column] = _compile_parser(rule)
+        return self._parsers[column]
+
+    def iter_parsed(self, path, chunksize=CHUNK_SIZE, start=0, end=None):
+        """Dosyayı parçalar halinde oku ve kurallı sütunları ayrıştır (doldurmadan)
+
+        start > 0 ise okuma o bayt konumundan (bir satır başı olmalı) başlar ve
+        başlık dosyanın ilk satırından alınır; end verilirse o bayta kadar okunur.
+        Dosyaya sonradan eklenen satırları işlemek için kullanılır.
+        """
+        header = pd.read_csv(path, nrows=0, encoding="utf-8-sig").columns
+        rules = self.rules_for(header)
+        # Ayrıştırılacak metin sütunları pandas'ın tür tahmini yapmaması için str okunur
+        dtype = {col: str for col, rule in rules.items() if rule["type"] != "number"}
+
+        with open(path, "rb") as raw:
+            f = io.BufferedReader(_RangeReader(raw, start, end)) if start or end is not None else raw
+            if start:
+                reader = pd.read_csv(f, chunksize=chunksize, dtype=dtype, header=None,
+                                     names=list(header), encoding="utf-8")
+            else:
+                reader = pd.read_csv(f, chunksize=chunksize, dtype=dtype, encoding="utf-8-sig")
+
+            for chunk in reader:
+                for col, rule in rules.items():
+                    chunk[col] = self._parser(col, rule)(chunk[col])
+                yield chunk, rules
+
+    def partial_fit(self, path, chunksize=CHUNK_SIZE, start=0, end=None):
+        """Dosyadaki (ya da [start, end) bayt aralığındaki) değerlerle istatistikleri güncelle"""
+        for chunk, rules in self.iter_parsed(path, chunksize, start, end):
+            for col, rule in rules.items():
+                self._update_stats(col, rule, chunk[col])
+        return self
+
+    def fit(self, path, chunksize=CHUNK_SIZE):
+        """İstatistikleri sıfırdan hesapla"""
+        self.stats = {}
+        return self.partial_fit(path, chunksize)
+
+    def _update_stats(self, column, rule, s):
+        stats = self.stats.setdefault(column, {})
+        # Boş değer sayısı: bu hücreler doldurma değeriyle temizlenir
+        stats["missing"] = stats.get("missing", 0) + int(s.isna().sum())
+        valid = s.dropna()
+        if valid.empty:
+            return
+
+        if rule["impute"] == "mean":
+            stats["sum"] = stats.get("sum", 0.0) + float(valid.sum())
+            stats["count"] = stats.get("count", 0) + int(len(valid))
+        elif rule["impute"] == "mode":
+            counts = Counter(stats.get("counts", {}))
+            counts.update({str(k): int(v) for k, v in valid.value_counts(sort=False).items()})
+            stats["counts"] = dict(counts)
+        elif rule["impute"] == "ffill_bfill":
+            stats.setdefault("first", _json_value(valid.iloc[0]))
+            stats["last"] = _json_value(valid.iloc[-1])
+
+    def fill_value(self, column, rule):
+        """Sütunun sabit doldurma değeri (mean / mode / constant); yoksa None"""
+        stats = self.stats.get(column, {})
+        if rule["impute"] == "mean" and stats.get("count"):
+            return stats["sum"] / stats["count"]
+        if rule["impute"] == "mode" and stats.get("counts"):
+            # Eşitlikte pandas mode() gibi sıralamada ilk gelen değer seçilir
+            counts = stats["counts"]
+            best = max(counts.values())
+            return min(k for k, v in counts.items() if v == best)
+        if rule["impute"] == "constant":
+            return rule["value"]
+        return None
+
+    def imputed_fill_values(self, path):
+        """Boşlukları mean / mode ile doldurulan sütunların güncel doldurma değerleri
+
+        Yalnızca fit sırasında boş değer görülen sütunlar döner (boş değer sayısı
+        kaydedilmemiş eski istatistiklerde sütun boş değer içeriyor sayılır).
+        Bu değerler değişirse daha önce temizlenmiş satırlar yeniden temizlendiğinde
+        farklı sonuç verir.
+        """
+        values = {}
+        for col, rule in self.rules_for(pd.read_csv(path, nrows=0, encoding="utf-8-sig").columns).items():
+            if rule["impute"] in ("mean", "mode") and self.stats.get(col, {}).get("missing", 1):
+                values[col] = self.fill_value(col, rule)
+        return values
+
+    def carry_values(self, path):
+        """ffill_bfill sütunlarında fit sırasında görülen son değerler
+
+        Eklenen satırlar temizlenirken ffill bu değerlerden devam eder. Eklenen
+        aralık partial_fit ile istatistiklere katılmadan önce okunmalıdır; aksi
+        halde "last" eklenen aralığın son değeri olur.
+        """
+        carry = {}
+        for col, rule in self.rules_for(pd.read_csv(path, nrows=0, encoding="utf-8-sig").columns).items():
+            last = self.stats.get(col, {}).get("last")
+            if rule["impute"] == "ffill_bfill" and last is not None:
+                carry[col] = pd.Timestamp(last) if rule["type"] == "date" else last
+        return carry
+
+    def transform_chunks(self, path, chunksize=CHUNK_SIZE, start=0, end=None, carry=None):
+        """Temizlenmiş parçaları sırayla üret
+
+        start > 0 ise (eklenen satırlar) ffill, carry verilmişse ondan, yoksa fit
+        sırasında görülen son değerden (carry_values) devam eder.
+        """
+        if carry is not None:
+            carry = dict(carry)
+        else:
+            carry = self.carry_values(path) if start else {}
+
+        for chunk, rules in self.iter_parsed(path, chunksize, start, end):
+            for col, rule in rules.items():
+                s = chunk[col]
+                if rule["impute"] == "ffill_bfill":
+                    # Önceki parçanın son değeri taşınır; dosya başındaki boşluklar
+                    # parçanın ilk dolu değeriyle, o da yoksa fit'teki ilk değerle dolar
+                    s = s.ffill()
+                    if col in carry:
+                        s = s.fillna(carry[col])
+                    else:
+                        s = s.bfill()
+                        first = self.stats.get(col, {}).get("first")
+                        if first is not None and s.isna().any():
+                            s = s.fillna(pd.Timestamp(first) if rule["type"] == "date" else first)
+                    if s.notna().any():
+                        carry[col] = s.dropna().iloc[-1]
+                elif rule["impute"] != "none":
+                    value = self.fill_value(col, rule)
+                    if value is not None:
+                        s = s.fillna(value)
+                chunk[col] = s
+            yield chunk
+
+    def transform(self, path, out_path=None, chunksize=CHUNK_SIZE):
+        """Dosyayı temizle; out_path yoksa DataFrame döndür, varsa CSV/Parquet olarak yaz"""
+        chunks = self.transform_chunks(path, chunksize)
+        if out_path is None:
+            frames = list(chunks)
+            return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+        tmp_path = out_path + ".tmp"
+        if out_path.endswith(".parquet"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            writer = None
+            try:
+                for chunk in chunks:
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(tmp_path, table.schema)
+                    writer.write_table(table.cast(writer.schema))
+            finally:
+                if writer is not None:
+                    writer.close()
+        else:
+            header = True
+            with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+                for chunk in chunks:
+                    chunk.to_csv(f, index=False, header=header)
+                    header = False
+
+        os.replace(tmp_path, out_path)
+        return out_path
+
+    def save(self, path):
+        """Spec ve istatistikleri JSON olarak kaydet"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"spec": self.spec, "stats": self.stats}, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        """Kaydedilmiş motoru yükle"""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["spec"], data["stats"])
+
+def clean_csv(path, spec, out_path=None, stats_path=None, chunksize=CHUNK_SIZE):
+    """Dosyayı temizle; stats_path varsa kayıtlı istatistikler kullanılır, yoksa fit edilip kaydedilir"""
+    if stats_path and os.path.exists(stats_path):
+        engine = CleaningEngine.load(stats_path)
+    else:
+        engine = CleaningEngine(spec).fit(path, chunksize)
+        if stats_path:
+            engine.save(stats_path)
+    return engine.transform(path, out_path, chunksize)
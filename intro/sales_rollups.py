@@ -0,0 +1,278 @@
+"""
+Satış Verisi - Ön Toplama (Rollup) Önbelleği
+`df.groupby("Product")["Amount"].mean()` gibi sorguları her seferinde ham CSV
+üzerinden yeniden hesaplamak yerine `Chocolate Sales.csv` için Sales Person x
+Country x Product x Month kırılımında bir kez toplam / adet / kare toplamı /
+min / max değerlerini tutan sütunsal bir küp oluşturur. Bu boyutların herhangi
+bir alt kümesine göre sorgular küpten milisaniyeler içinde cevaplanır; tekil
+boyut rollup'ları hazır tutulur. Dosyaya yeni satır eklendiğinde yalnızca
+eklenen kısım okunup küpe eklenir; eklenen satırlar küpte zaten doldurulmuş
+boş hücrelerin doldurma değerini (ortalama / mod) değiştirirse küp sıfırdan
+kurulur, böylece sonuç her zaman rebuild() ile aynıdır. Küpte olmayan kırılımlar (ör. günlük tarih)
+için temizlenmiş veri üzerinde parça parça vektörel tarama yapılır.
+
+Kullanım:
+    from sales_rollups import SalesRollups
+    rollups = SalesRollups.open("Chocolate Sales.csv")      # ilk seferde küp oluşturulur
+    rollups.query("Product", "Amount", ("mean",))             # df.groupby("Product")["Amount"].mean()
+    rollups.query(["Country", "Month"], "Boxes Shipped")
+    rollups.refresh()                                          # dosyaya eklenen satırları işle
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data_cleaning import CHUNK_SIZE, SALES_SPEC, CleaningEngine
+
+# Küpün kırılımları (Month, Date sütunundan türetilir)
+CUBE_DIMENSIONS = ("Sales Person", "Country", "Product", "Month")
+
+# Toplanan ölçüler
+MEASURES = ("Amount", "Boxes Shipped")
+
+METRICS = ("count", "sum", "mean", "min", "max", "std")
+
+# Önbellek klasörü (CSV ile aynı klasörde)
+CACHE_DIRNAME = ".sales_rollups"
+
+# Dosyanın yeniden yazıldığını anlamak için özeti alınan baş kısım (bayt)
+HEAD_BYTES = 64 * 1024
+
+def _head_hash(path, length):
+    """Dosyanın ilk length baytının özeti"""
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read(length)).hexdigest()
+
+def _complete_size(path):
+    """Dosyanın son tam satırının bittiği bayt konumu (yarım yazılmış satır okunmaz)"""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        pos = size
+        while pos > 0:
+            step = min(64 * 1024, pos)
+            f.seek(pos - step)
+            block = f.read(step)
+            idx = block.rfind(b"\n")
+            if idx >= 0:
+                return pos - step + idx + 1
+            pos -= step
+    return 0
+
+def _with_month(chunk):
+    """Date sütunundan 'YYYY-MM' biçiminde Month sütunu türet"""
+    chunk["Month"] = chunk["Date"].dt.strftime("%Y-%m")
+    return chunk
+
+def partial_aggregate(chunk, by, measures=MEASURES):
+    """Bir parçayı by kırılımına göre birleştirilebilir ara toplamlara indir"""
+    values = {}
+    for m in measures:
+        v = chunk[m].astype("float64")
+        values[f"{m}|count"] = v.notna().astype("int64")
+        values[f"{m}|sum"] = v
+        values[f"{m}|sumsq"] = v * v
+        values[f"{m}|min"] = v
+        values[f"{m}|max"] = v
+    frame = pd.DataFrame(values)
+    frame[list(by)] = chunk[list(by)].to_numpy()
+    frame["rows"] = 1
+    return merge_aggregates([frame], by)
+
+def merge_aggregates(frames, by):
+    """Ara toplam tablolarını (aynı kırılımda) tek tabloda birleştir"""
+    frame = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    agg = {}
+    for col in frame.columns:
+        if col in by:
+            continue
+        kind = col.rsplit("|", 1)[-1]
+        agg[col] = kind if kind in ("min", "max") else "sum"
+    return frame.groupby(list(by), sort=True, dropna=False).agg(agg).reset_index()
+
+def finalize(aggregate, by, measure, metrics):
+    """Ara toplamlardan istenen metrikleri hesapla; by'a göre indekslenmiş DataFrame döndür"""
+    n = aggregate[f"{measure}|count"].to_numpy(dtype="float64")
+    s = aggregate[f"{measure}|sum"].to_numpy(dtype="float64")
+    out = {}
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for metric in metrics:
+            if metric == "count":
+                out[metric] = n.astype("int64")
+            elif metric == "sum":
+                out[metric] = s
+            elif metric == "mean":
+                out[metric] = s / n
+            elif metric in ("min", "max"):
+                out[metric] = aggregate[f"{measure}|{metric}"].to_numpy(dtype="float64")
+            elif metric == "std":
+                # Örneklem standart sapması (pandas std ile aynı, ddof=1)
+                var = (aggregate[f"{measure}|sumsq"].to_numpy(dtype="float64") - s * s / n) / (n - 1)
+                out[metric] = np.sqrt(np.maximum(var, 0.0))
+            else:
+                raise ValueError(f"Bilinmeyen metrik '{metric}' (geçerli: {METRICS})")
+
+    index = pd.MultiIndex.from_frame(aggregate[list(by)]) if len(by) > 1 else pd.Index(aggregate[by[0]], name=by[0])
+    return pd.DataFrame(out, index=index)
+
+class SalesRollups:
+    """Chocolate Sales CSV'si için artımlı güncellenen rollup küpü"""
+
+    def __init__(self, csv_path, cache_dir=None, chunksize=CHUNK_SIZE):
+        self.csv_path = os.path.abspath(csv_path)
+        self.cache_dir = cache_dir or os.path.join(os.path.dirname(self.csv_path), CACHE_DIRNAME)
+        self.chunksize = chunksize
+        self.engine = None
+        self.cube = None
+        self.state = {}
+        self._rollups = {}
+        self._results = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(cls, csv_path, cache_dir=None, chunksize=CHUNK_SIZE):
+        """Kayıtlı küpü yükle ve dosyaya eklenen satırları işle (küp yoksa oluştur)"""
+        rollups = cls(csv_path, cache_dir, chunksize)
+        if not rollups._load():
+            rollups.rebuild()
+        else:
+            rollups.refresh()
+        return rollups
+
+    @property
+    def _paths(self):
+        name = os.path.splitext(os.path.basename(self.csv_path))[0]
+        base = os.path.join(self.cache_dir, name)
+        return base + "_cube.parquet", base + "_state.json", base + "_clean_stats.json"
+
+    def _load(self):
+        cube_path, state_path, stats_path = self._paths
+        if not all(os.path.exists(p) for p in self._paths):
+            return False
+        with open(state_path, "r", encoding="utf-8") as f:
+            self.state = json.load(f)
+        self.cube = pd.read_parquet(cube_path)
+        self.engine = CleaningEngine.load(stats_path)
+        self._build_rollups()
+        return True
+
+    def _save(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        cube_path, state_path, stats_path = self._paths
+        self.cube.to_parquet(cube_path + ".tmp", index=False)
+        os.replace(cube_path + ".tmp", cube_path)
+        self.engine.save(stats_path)
+        with open(state_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+
+    def rebuild(self):
+        """Temizlik istatistiklerini ve küpü sıfırdan oluştur"""
+        with self._lock:
+            end = _complete_size(self.csv_path)
+            self.engine = CleaningEngine(SALES_SPEC)
+            self.engine.partial_fit(self.csv_path, self.chunksize, end=end)
+            partials = [
+                partial_aggregate(_with_month(chunk), CUBE_DIMENSIONS)
+                for chunk in self.engine.transform_chunks(self.csv_path, self.chunksize, end=end)
+            ]
+            self.cube = merge_aggregates(partials, CUBE_DIMENSIONS)
+            head_len = min(HEAD_BYTES, end)
+            self.state = {"offset": end, "head": _head_hash(self.csv_path, head_len),
+                          "head_len": head_len, "version": 1}
+            self._build_rollups()
+            self._save()
+        return self
+
+    def refresh(self):
+        """Dosyaya son okumadan sonra eklenen satırları küpe ekle; eklenen satır sayısını döndür
+
+        Dosya kısalmış ya da baş kısmı değişmişse (yeniden yazılmış) küp sıfırdan
+        kurulur. Eklenen satırlar, küpteki boş hücrelerin doldurulduğu ortalama ya
+        da mod değerini değiştirirse de küp sıfırdan kurulur; aksi halde eski
+        satırlar eski değerle doldurulmuş kalırdı.
+        """
+        size = _complete_size(self.csv_path)
+        head = _head_hash(self.csv_path, self.state.get("head_len", HEAD_BYTES))
+        if size < self.state.get("offset", 0) or head != self.state.get("head"):
+            self.rebuild()
+            return int(self.cube["rows"].sum())
+        if size == self.state["offset"]:
+            return 0
+
+        with self._lock:
+            start = self.state["offset"]
+            # ffill eklenen satırlardan önceki son değerden devam etmeli; partial_fit
+            # bu değeri eklenen aralığın son değeriyle değiştirdiği için önce okunur
+            carry = self.engine.carry_values(self.csv_path)
+            fills = self.engine.imputed_fill_values(self.csv_path)
+            # Yeni satırlar sonra istatistiklere eklenir (ortalamalar, mod)
+            self.engine.partial_fit(self.csv_path, self.chunksize, start, size)
+            updated = self.engine.imputed_fill_values(self.csv_path)
+            stale = any(updated.get(col) != value for col, value in fills.items())
+            if not stale:
+                added = self._append(start, size, carry)
+        if stale:
+            rows = int(self.cube["rows"].sum())
+            self.rebuild()
+            return int(self.cube["rows"].sum()) - rows
+        return added
+
+    def _append(self, start, size, carry):
+        """[start, size) bayt aralığındaki satırları küpe ekle (kilit tutulurken çağrılır)"""
+        partials, added = [], 0
+        for chunk in self.engine.transform_chunks(self.csv_path, self.chunksize, start, size, carry):
+            added += len(chunk)
+            partials.append(partial_aggregate(_with_month(chunk), CUBE_DIMENSIONS))
+        if partials:
+            self.cube = merge_aggregates([self.cube] + partials, CUBE_DIMENSIONS)
+        self.state.update(offset=size, version=self.state["version"] + 1)
+        self._build_rollups()
+        self._save()
+        return added
+
+    def _build_rollups(self):
+        """Tekil boyut rollup'larını küpten hazırla ve sorgu önbelleğini temizle"""
+        self._rollups = {}
+        for dim in CUBE_DIMENSIONS:
+            others = [d for d in CUBE_DIMENSIONS if d != dim]
+            self._rollups[(dim,)] = merge_aggregates([self.cube.drop(columns=others)], (dim,))
+        self._results = {}
+
+    def _aggregate_for(self, by):
+        """by kırılımı için ara toplamlar: hazır rollup, küpten toplama ya da tarama"""
+        if by in self._rollups:
+            return self._rollups[by]
+        if set(by) <= set(CUBE_DIMENSIONS):
+            others = [d for d in CUBE_DIMENSIONS if d not in by]
+            return merge_aggregates([self.cube.drop(columns=others)], by)
+        return self.scan(by)
+
+    def scan(self, by):
+        """Küpte olmayan kırılımlar için temizlenmiş dosya üzerinde parça parça vektörel toplama"""
+        partials = []
+        # Küple tutarlı olması için yalnızca küpe işlenmiş bayt aralığı taranır
+        for chunk in self.engine.transform_chunks(self.csv_path, self.chunksize, end=self.state["offset"]):
+            chunk = _with_month(chunk)
+            missing = [c for c in by if c not in chunk.columns]
+            if missing:
+                raise KeyError(f"Bilinmeyen sütun(lar): {missing}")
+            partials.append(partial_aggregate(chunk, by))
+        return merge_aggregates(partials, by)
+
+    def query(self, by, measure="Amount", metrics=("count", "sum", "mean")):
+        """by kırılımında measure için metrikleri döndür (ör. query("Product", "Amount", ("mean",)))"""
+        by = (by,) if isinstance(by, str) else tuple(by)
+        metrics = tuple(metrics)
+        if measure not in MEASURES:
+            raise ValueError(f"Bilinmeyen ölçü '{measure}' (geçerli: {MEASURES})")
+
+        key = (by, measure, metrics)
+        result = self._results.get(key)
+        if result is None:
+            result = finalize(self._aggregate_for(by), by, measure, metrics)
+            self._results[key] = result
+        return result.copy()
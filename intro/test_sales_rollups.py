@@ -0,0 +1,77 @@
+"""
+sales_rollups testleri
+
+Kullanım:
+    python -m pytest test_sales_rollups.py
+"""
+
+from sales_rollups import SalesRollups
+
+HEADER = "Sales Person,Country,Product,Date,Amount,Boxes Shipped\n"
+
+def _write(path, rows, mode="w"):
+    with open(path, mode, encoding="utf-8") as f:
+        if mode == "w":
+            f.write(HEADER)
+        f.writelines(row + "\n" for row in rows)
+
+def test_refresh_eklenen_bos_tarihi_onceki_satirdan_doldurur(tmp_path):
+    """Eklenen ilk satırdaki boş tarih, eklenen bloğun son tarihiyle değil önceki satırın tarihiyle dolar"""
+    csv_path = str(tmp_path / "sales.csv")
+    _write(csv_path, [
+        'Ali,UK,Mint Chip Choco,01-May-22,"$100 ",10',
+        'Ali,UK,Mint Chip Choco,14-Jun-22,"$200 ",20',
+    ])
+    rollups = SalesRollups.open(csv_path, cache_dir=str(tmp_path / "cache"))
+
+    _write(csv_path, [
+        'Ali,UK,Mint Chip Choco,,"$300 ",30',
+        'Ali,UK,Mint Chip Choco,20-Jul-22,"$400 ",40',
+    ], mode="a")
+    assert rollups.refresh() == 2
+
+    months = rollups.query("Month", "Amount", ("sum",))["sum"]
+    assert months.to_dict() == {"2022-05": 100.0, "2022-06": 500.0, "2022-07": 400.0}
+
+    # Sıfırdan kurulan küple aynı sonuç
+    rebuilt = SalesRollups(csv_path, cache_dir=str(tmp_path / "cache2")).rebuild()
+    assert rebuilt.query("Month", "Amount", ("sum",))["sum"].to_dict() == months.to_dict()
+
+def test_refresh_doldurma_degeri_degisirse_rebuild_ile_ayni(tmp_path):
+    """Eklenen satırlar ortalama / modu değiştirince önceden doldurulan boş Amount ve Country hücreleri de güncellenir"""
+    csv_path = str(tmp_path / "sales.csv")
+    _write(csv_path, [
+        'Ali,UK,Mint Chip Choco,01-May-22,"$100 ",10',
+        'Ali,UK,Mint Chip Choco,02-May-22,,20',
+        'Ayse,,Mint Chip Choco,03-May-22,"$300 ",30',
+        'Ayse,India,Mint Chip Choco,04-May-22,"$500 ",40',
+    ])
+    rollups = SalesRollups.open(csv_path, cache_dir=str(tmp_path / "cache"))
+
+    # Ortalama 300'den 600'e çıkar, Country modu UK'den India'ya döner
+    _write(csv_path, [
+        'Veli,India,Eclairs,14-Jun-22,"$1,200 ",50',
+        'Veli,India,Eclairs,15-Jun-22,,60',
+        'Veli,,Eclairs,16-Jun-22,"$900 ",70',
+    ], mode="a")
+    assert rollups.refresh() == 3
+
+    rebuilt = SalesRollups(csv_path, cache_dir=str(tmp_path / "cache2")).rebuild()
+    for by in ("Country", ("Sales Person", "Month")):
+        for measure in ("Amount", "Boxes Shipped"):
+            expected = rebuilt.query(by, measure, ("count", "sum", "min", "max"))
+            assert rollups.query(by, measure, ("count", "sum", "min", "max")).equals(expected)
+    assert rollups.query("Country", "Amount", ("sum",))["sum"].to_dict() == {"India": 3500.0, "UK": 700.0}
+
+def test_refresh_bos_hucre_yoksa_artimli_kalir(tmp_path):
+    """Küpte doldurulmuş hücre yoksa ortalama değişse de küp yeniden kurulmaz"""
+    csv_path = str(tmp_path / "sales.csv")
+    _write(csv_path, ['Ali,UK,Mint Chip Choco,01-May-22,"$100 ",10'])
+    rollups = SalesRollups.open(csv_path, cache_dir=str(tmp_path / "cache"))
+
+    _write(csv_path, ['Ali,UK,Mint Chip Choco,02-May-22,,20', 'Ali,UK,Mint Chip Choco,03-May-22,"$500 ",30'], mode="a")
+    assert rollups.refresh() == 2
+    assert rollups.state["version"] == 2
+
+    rebuilt = SalesRollups(csv_path, cache_dir=str(tmp_path / "cache2")).rebuild()
+    assert rollups.query("Product", "Amount", ("sum",)).equals(rebuilt.query("Product", "Amount", ("sum",)))
@@ -0,0 +1,259 @@
+"""
+Müşteri Segmentasyonu - k Seçim Motoru
+Elbow (inertia), Silhouette ve Davies-Bouldin eğrilerini k = 2..10 için
+paralel ve önceki k'nın merkezlerinden ısıtarak (warm-start) hesaplar.
+
+Kullanım (notebook içinden):
+    from segmentation import load_customers, select_k, plot_k_curves
+    X = load_customers("Mall_Customers.csv")
+    sonuc = select_k(X)
+    plot_k_curves(sonuc)
+"""
+
+import os
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+
+# Notebook'ta kullanılan özellikler
+DEFAULT_FEATURES = ["Annual Income (k$)", "Spending Score (1-100)"]
+
+# Bu satır sayısının üstünde MiniBatchKMeans kullanılır
+MINIBATCH_THRESHOLD = 50_000
+
+# Silhouette için küme bazlı tabakalı örneklem boyutu
+SILHOUETTE_SAMPLE_SIZE = 5_000
+
+# Uzaklık hesaplarında bellek kullanımını sınırlayan blok boyutu
+CHUNK_SIZE = 65_536
+
+# MiniBatchKMeans adım ayarları
+MINIBATCH_SIZE = 4096
+MINIBATCH_MAX_STEPS = 500
+MINIBATCH_TOL = 1e-4
+
+# Isıtmada yeni merkez için denenecek aday sayısı
+WARM_START_CANDIDATES = 32
+
+# Bir süreçte eğitilen en az ardışık k sayısı; bloğun ilk k'sı dışındakiler
+# bir önceki k'dan ısıtıldığından tekli bloklarda ısıtma hiç gerçekleşmez
+MIN_BLOCK_SIZE = 2
+
+def load_customers(path="Mall_Customers.csv", features=DEFAULT_FEATURES):
+    """Müşteri verisinden kümeleme özelliklerini float64 matris olarak yükle"""
+    import pandas as pd
+
+    return pd.read_csv(path, usecols=features)[features].to_numpy(dtype=np.float64)
+
+def _add_center(X, centers, rng, sample_size=10_000, n_candidates=WARM_START_CANDIDATES):
+    """k-1 merkeze bir merkez ekleyerek k için başlangıç merkezlerini üret
+
+    Adaylar k-means++ gibi uzaklığın karesiyle orantılı olasılıkla seçilir;
+    örneklem üzerindeki inertia'yı en çok düşüren aday yeni merkez olur.
+    """
+    sample = X[rng.choice(len(X), size=min(sample_size, len(X)), replace=False)]
+    nearest = ((sample[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2).min(axis=1)
+
+    total = nearest.sum()
+    if total == 0:
+        return np.vstack([centers, sample[0]])
+
+    candidates = sample[rng.choice(len(sample), size=n_candidates, p=nearest / total)]
+    candidate_dist = ((sample[None, :, :] - candidates[:, None, :]) ** 2).sum(axis=2)
+    candidate_inertia = np.minimum(nearest[None, :], candidate_dist).sum(axis=1)
+    return np.vstack([centers, candidates[np.argmin(candidate_inertia)]])
+
+def assign_labels(X, centers, chunk_size=CHUNK_SIZE):
+    """Her noktayı en yakın merkeze ata; etiketleri ve toplam inertia'yı döndür"""
+    labels = np.empty(len(X), dtype=np.int32)
+    inertia = 0.0
+    for start in range(0, len(X), chunk_size):
+        block = X[start:start + chunk_size]
+        dist = ((block[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        block_labels = dist.argmin(axis=1)
+        labels[start:start + chunk_size] = block_labels
+        inertia += float(dist[np.arange(len(block)), block_labels].sum())
+    return labels, inertia
+
+def _fit_minibatch(X, k, init, rng, random_state):
+    """MiniBatchKMeans'i düzgün (uniform) örneklenen partial_fit adımlarıyla eğit
+
+    Merkezler yeterince değişmeyi bıraktığında erken durulur; etiketler ve
+    inertia sonunda tüm veri üzerinde blok blok hesaplanır.
+    """
+    model = MiniBatchKMeans(
+        n_clusters=k, init=init if init is not None else "k-means++",
+        n_init=1, batch_size=MINIBATCH_SIZE, random_state=random_state
+    )
+    scale = float(np.mean(X[rng.choice(len(X), size=min(len(X), MINIBATCH_SIZE))].var(axis=0)))
+
+    previous = None
+    for _ in range(MINIBATCH_MAX_STEPS):
+        model.partial_fit(X[rng.integers(0, len(X), size=MINIBATCH_SIZE)])
+        centers = model.cluster_centers_
+        if previous is not None and ((centers - previous) ** 2).sum() <= MINIBATCH_TOL * scale:
+            break
+        previous = centers.copy()
+
+    labels, inertia = assign_labels(X, model.cluster_centers_)
+    return model.cluster_centers_, labels, inertia
+
+def _fit_one(X, k, init, rng, random_state, minibatch):
+    """Tek bir k için eğit (init verilirse tek başlatma ile ısıtılmış)"""
+    if minibatch:
+        return _fit_minibatch(X, k, init, rng, random_state)
+
+    if init is None:
+        model = KMeans(n_clusters=k, random_state=random_state)
+    else:
+        model = KMeans(n_clusters=k, init=init, n_init=1, random_state=random_state)
+    model.fit(X)
+    return model.cluster_centers_, model.labels_.astype(np.int32), float(model.inertia_)
+
+def _fit_k_block(X, k_values, random_state, minibatch, silhouette_sample_size):
+    """Ardışık k değerlerini tek süreçte, her k'yı bir öncekinin merkezleriyle ısıtarak eğit
+
+    Skorlar da aynı süreçte hesaplanır; ana sürece etiketler taşınmaz.
+    """
+    rng = np.random.default_rng(random_state)
+    results = []
+    centers = None
+
+    for k in k_values:
+        start = time.perf_counter()
+        init = None
+        if centers is not None and len(centers) == k - 1:
+            init = _add_center(X, centers, rng)
+
+        centers, labels, inertia = _fit_one(X, k, init, rng, random_state, minibatch)
+        fit_seconds = time.perf_counter() - start
+
+        results.append({
+            "k": k,
+            "inertia": inertia,
+            "silhouette": sampled_silhouette(X, labels, silhouette_sample_size, random_state),
+            "davies_bouldin": chunked_davies_bouldin(X, labels),
+            "centers": centers,
+            "fit_seconds": fit_seconds,
+            "warm_start": init is not None
+        })
+
+    return results
+
+def stratified_sample(labels, sample_size, rng):
+    """Her kümeden boyutuyla orantılı (en az 2) örnek seçerek indeks döndür"""
+    n = len(labels)
+    if n <= sample_size:
+        return np.arange(n)
+
+    order = np.argsort(labels, kind="stable")
+    counts = np.bincount(labels)
+    quotas = np.maximum(np.round(counts * sample_size / n).astype(np.int64), np.minimum(counts, 2))
+
+    picks = []
+    start = 0
+    for count, quota in zip(counts, quotas):
+        if count:
+            picks.append(order[start + rng.choice(count, size=min(quota, count), replace=False)])
+        start += count
+    return np.concatenate(picks)
+
+def sampled_silhouette(X, labels, sample_size=SILHOUETTE_SAMPLE_SIZE, random_state=42):
+    """Silhouette skorunu küme bazlı tabakalı örneklem üzerinde hesapla"""
+    idx = stratified_sample(labels, sample_size, np.random.default_rng(random_state))
+    if len(np.unique(labels[idx])) < 2:
+        return float("nan")
+    return float(silhouette_score(X[idx], labels[idx]))
+
+def chunked_davies_bouldin(X, labels, chunk_size=CHUNK_SIZE):
+    """Davies-Bouldin skorunu tüm veri üzerinde blok blok hesapla (O(n·k) zaman, O(k²) bellek)
+
+    sklearn.metrics.davies_bouldin_score ile aynı tanımı kullanır: küme
+    merkezleri küme ortalamalarıdır.
+    """
+    n_clusters = int(labels.max()) + 1
+    counts = np.bincount(labels, minlength=n_clusters).astype(np.float64)
+
+    # Küme ortalamaları
+    centroids = np.column_stack([
+        np.bincount(labels, weights=X[:, j], minlength=n_clusters) for j in range(X.shape[1])
+    ]) / np.maximum(counts, 1)[:, None]
+
+    # Küme içi ortalama uzaklık
+    intra = np.zeros(n_clusters)
+    for start in range(0, len(X), chunk_size):
+        block_labels = labels[start:start + chunk_size]
+        dist = np.linalg.norm(X[start:start + chunk_size] - centroids[block_labels], axis=1)
+        intra += np.bincount(block_labels, weights=dist, minlength=n_clusters)
+    intra /= np.maximum(counts, 1)
+
+    centroid_dist = np.linalg.norm(centroids[:, None, :] - centroids[None, :, :], axis=2)
+    if np.allclose(intra, 0) or np.allclose(centroid_dist, 0):
+        return 0.0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratios = (intra[:, None] + intra[None, :]) / centroid_dist
+    ratios[~np.isfinite(ratios)] = 0.0
+    np.fill_diagonal(ratios, 0.0)
+    return float(ratios.max(axis=1).mean())
+
+def _split_blocks(k_values, n_blocks, min_block_size=MIN_BLOCK_SIZE):
+    """k değerlerini en fazla süreç sayısı kadar, her biri en az min_block_size uzunlukta ardışık bloğa böl"""
+    n_blocks = max(1, min(n_blocks, len(k_values) // min_block_size))
+    return [block.tolist() for block in np.array_split(np.asarray(k_values), n_blocks) if len(block)]
+
+def select_k(X, k_values=range(2, 11), n_jobs=None, random_state=42,
+             minibatch_threshold=MINIBATCH_THRESHOLD, silhouette_sample_size=SILHOUETTE_SAMPLE_SIZE):
+    """Tüm k değerleri için inertia, silhouette ve Davies-Bouldin eğrilerini hesapla
+
+    k değerleri en az MIN_BLOCK_SIZE uzunlukta ardışık bloklara bölünüp ayrı
+    süreçlerde eğitilir; her blok içinde k, k-1'in merkezlerine seçilen bir
+    yeni merkez eklenerek başlatılır (sonuçtaki "warm_start" bunu gösterir).
+    Büyük veride MiniBatchKMeans kullanılır, silhouette tabakalı örneklemde,
+    Davies-Bouldin ise tüm veride blok blok hesaplanır.
+    """
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    k_values = list(k_values)
+    minibatch = len(X) > minibatch_threshold
+
+    if n_jobs is None:
+        n_jobs = min(len(k_values), os.cpu_count() or 1)
+    blocks = _split_blocks(k_values, max(1, n_jobs))
+
+    # Büyük X, joblib tarafından süreçler arasında memmap ile paylaşılır
+    block_results = Parallel(n_jobs=len(blocks))(
+        delayed(_fit_k_block)(X, block, random_state, minibatch, silhouette_sample_size)
+        for block in blocks
+    )
+    fits = sorted((r for block in block_results for r in block), key=lambda r: r["k"])
+
+    return {
+        "k": np.array([r["k"] for r in fits]),
+        "inertia": np.array([r["inertia"] for r in fits]),
+        "silhouette": np.array([r["silhouette"] for r in fits]),
+        "davies_bouldin": np.array([r["davies_bouldin"] for r in fits]),
+        "fit_seconds": np.array([r["fit_seconds"] for r in fits]),
+        "centers": {r["k"]: r["centers"] for r in fits},
+        "warm_start": np.array([r["warm_start"] for r in fits]),
+        "minibatch": minibatch
+    }
+
+def plot_k_curves(result):
+    """Elbow, Silhouette ve Davies-Bouldin eğrilerini yan yana çiz"""
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(1, 3, figsize=(15, 3))
+    curves = [
+        ("inertia", "Elbow (Inertia)"),
+        ("silhouette", "Silhouette (yüksek iyi)"),
+        ("davies_bouldin", "Davies-Bouldin (düşük iyi)")
+    ]
+    for ax, (key, title) in zip(axes, curves):
+        ax.plot(result["k"], result[key], marker="o")
+        ax.set_title(title)
+        ax.set_xlabel("k")
+    plt.tight_layout()
+    plt.show()
@@ -0,0 +1,160 @@
+"""
+Müşteri Segmentasyonu - Akan Veri ile Güncellenen Küme Merkezleri
+Yeni müşteri kayıtları geldikçe küme merkezlerini mini-batch'lerle günceller ve
+müşteri gruplarını tek bir vektörel uzaklık hesabıyla en yakın merkeze atar.
+Böylece segmentler gece boyu tam yeniden eğitime gerek kalmadan güncel kalır.
+
+Kullanım (notebook içinden):
+    from streaming_segments import StreamingSegmenter
+    segmenter = StreamingSegmenter.from_model(model2)   # eğitilmiş KMeans'ten başla
+    segmenter.partial_fit(yeni_musteriler)               # yeni kayıtlarla güncelle
+    etiketler = segmenter.assign(yeni_musteriler)
+"""
+
+import threading
+
+import numpy as np
+
+from segmentation import DEFAULT_FEATURES
+
+class StreamingSegmenter:
+    """Mini-batch k-means merkezlerini çevrimiçi güncelleyen ve atama yapan bileşen
+
+    Her merkez, kendisine atanan tüm noktaların ortalamasıdır; yeni batch bu
+    ortalamaya sayılarla ağırlıklandırılarak eklenir (tekil örnek için 1/n
+    öğrenme oranlı mini-batch k-means güncellemesinin batch hali). `decay`
+    1'den küçük verilirse eski kayıtların ağırlığı her batch'te azalır ve
+    merkezler davranış değişimlerini daha hızlı izler.
+    """
+
+    def __init__(self, n_clusters=5, features=DEFAULT_FEATURES, decay=1.0, random_state=42):
+        if not 0.0 < decay <= 1.0:
+            raise ValueError("decay 0 ile 1 arasında olmalıdır")
+
+        self.n_clusters = n_clusters
+        self.features = list(features)
+        self.decay = decay
+        self.rng = np.random.default_rng(random_state)
+
+        self.counts = np.zeros(n_clusters, dtype=np.float64)
+        self.n_seen = 0
+        # (merkezler, merkez normlarının kareleri): tek bir değiştirilemez çift olarak
+        # yayımlanır; kilitsiz okuyucular hiçbir zaman yeni merkezi eski normla eşlemez
+        self._state = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_model(cls, model, features=DEFAULT_FEATURES, decay=1.0):
+        """Eğitilmiş bir KMeans/MiniBatchKMeans modelinin merkezleriyle başlat"""
+        segmenter = cls(model.n_clusters, features, decay)
+        counts = np.bincount(model.labels_, minlength=model.n_clusters)
+        segmenter._set_centers(np.asarray(model.cluster_centers_, dtype=np.float64), counts.astype(np.float64))
+        segmenter.n_seen = int(counts.sum())
+        return segmenter
+
+    @property
+    def centers(self):
+        """Güncel küme merkezleri (henüz eğitilmediyse None)"""
+        state = self._state
+        return None if state is None else state[0]
+
+    def _snapshot(self):
+        """Atamada kullanılacak (merkezler, normlar) çiftini tek okumayla al"""
+        state = self._state
+        if state is None:
+            raise RuntimeError("Segmenter henüz eğitilmedi; önce partial_fit çağırın")
+        return state
+
+    def _as_matrix(self, X):
+        """DataFrame veya dizi girdisini (n, d) float64 matrise çevir"""
+        if hasattr(X, "loc"):
+            X = X[self.features].to_numpy()
+        X = np.asarray(X, dtype=np.float64)
+        return X.reshape(1, -1) if X.ndim == 1 else X
+
+    def _set_centers(self, centers, counts):
+        """Merkezleri ve atamada kullanılan normları birlikte güncelle"""
+        self.counts = counts
+        self._state = (centers, (centers ** 2).sum(axis=1))
+
+    def _init_centers(self, X):
+        """İlk batch'ten k-means++ ile başlangıç merkezlerini seç"""
+        from sklearn.cluster import kmeans_plusplus
+
+        if len(X) < self.n_clusters:
+            raise ValueError(f"İlk batch en az {self.n_clusters} kayıt içermelidir")
+        centers, _ = kmeans_plusplus(X, self.n_clusters, random_state=int(self.rng.integers(2**31)))
+        self._set_centers(centers, np.zeros(self.n_clusters, dtype=np.float64))
+
+    def _nearest(self, X, centers, centers_sq):
+        """Tek matris çarpımıyla en yakın merkezi ve uzaklığın karesini bul"""
+        # ||x - c||² = ||x||² - 2·x·c + ||c||²
+        dist = (X ** 2).sum(axis=1)[:, None] - 2.0 * (X @ centers.T) + centers_sq[None, :]
+        labels = dist.argmin(axis=1)
+        return labels, np.maximum(dist[np.arange(len(X)), labels], 0.0)
+
+    def assign(self, X, return_distance=False):
+        """Müşteri grubunu en yakın küme merkezine ata"""
+        centers, centers_sq = self._snapshot()
+        X = self._as_matrix(X)
+        labels, dist_sq = self._nearest(X, centers, centers_sq)
+        if return_distance:
+            return labels, np.sqrt(dist_sq)
+        return labels
+
+    def partial_fit(self, X):
+        """Yeni müşteri kayıtlarıyla merkezleri güncelle; kayıtların etiketlerini döndür"""
+        X = self._as_matrix(X)
+        if len(X) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        with self._lock:
+            if self._state is None:
+                self._init_centers(X)
+
+            centers, centers_sq = self._state
+            labels, _ = self._nearest(X, centers, centers_sq)
+            batch_counts = np.bincount(labels, minlength=self.n_clusters).astype(np.float64)
+            batch_sums = np.column_stack([
+                np.bincount(labels, weights=X[:, j], minlength=self.n_clusters)
+                for j in range(X.shape[1])
+            ])
+
+            old_counts = self.counts * self.decay
+            new_counts = old_counts + batch_counts
+            updated = batch_counts > 0
+
+            centers = centers.copy()
+            centers[updated] = (
+                centers[updated] * old_counts[updated, None] + batch_sums[updated]
+            ) / new_counts[updated, None]
+
+            self._set_centers(centers, new_counts)
+            self.n_seen += len(X)
+
+        return labels
+
+    def inertia(self, X):
+        """Verilen kayıtların en yakın merkezlerine uzaklık karelerinin toplamı"""
+        centers, centers_sq = self._snapshot()
+        X = self._as_matrix(X)
+        _, dist_sq = self._nearest(X, centers, centers_sq)
+        return float(dist_sq.sum())
+
+    def save(self, path):
+        """Merkezleri ve sayıları .npz dosyasına kaydet (servis yeniden başlatmaları için)"""
+        with self._lock:
+            centers, counts, n_seen = self.centers, self.counts, self.n_seen
+        np.savez(
+            path, centers=centers, counts=counts,
+            n_seen=n_seen, decay=self.decay, features=np.array(self.features)
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Kaydedilmiş segmenter durumunu yükle"""
+        with np.load(path) as data:
+            segmenter = cls(len(data["centers"]), data["features"].tolist(), float(data["decay"]))
+            segmenter._set_centers(data["centers"], data["counts"])
+            segmenter.n_seen = int(data["n_seen"])
+        return segmenter
@@ -0,0 +1,30 @@
+"""
+segmentation k seçim motorunun testleri
+
+Kullanım:
+    python -m pytest test_segmentation.py
+"""
+
+import numpy as np
+
+import segmentation
+from segmentation import load_customers, select_k
+
+def test_varsayilan_ayarlarla_isitma_kullanilir(monkeypatch):
+    """Çok çekirdekli makinede de (n_jobs varsayılan) bloklar tekli kalmaz ve k'lar ısıtılır"""
+    monkeypatch.setattr(segmentation.os, "cpu_count", lambda: 16)
+    sonuc = select_k(load_customers())
+
+    assert sonuc["k"].tolist() == list(range(2, 11))
+    soguk = ~sonuc["warm_start"]
+    # Her bloğun yalnızca ilk k'sı soğuk başlar; ardışık iki soğuk başlangıç olmaz
+    assert soguk[0] and sonuc["warm_start"].sum() >= len(soguk) // 2
+    assert not np.any(soguk[:-1] & soguk[1:])
+
+def test_bloklar_en_az_iki_ardisik_k_icerir():
+    """Süreç sayısı k sayısını aşsa da her blok en az MIN_BLOCK_SIZE ardışık k içerir"""
+    bloklar = segmentation._split_blocks(list(range(2, 11)), 16)
+
+    assert [k for blok in bloklar for k in blok] == list(range(2, 11))
+    assert all(len(blok) >= segmentation.MIN_BLOCK_SIZE for blok in bloklar)
+    assert segmentation._split_blocks([2], 4) == [[2]]
@@ -0,0 +1,225 @@
+"""
+Yorum Veri Seti - Parça Parça Veri Alma (Ingestion) Katmanı
+`pd.read_sql("Select * from users", connection)` yerine yalnızca `review` ve
+`rating` sütunlarını sunucu taraflı (named) cursor ile sabit boyutlu parçalar
+halinde okur, sonucu tablo anlık görüntüsüne (snapshot) göre anahtarlanmış bir
+Parquet dosyasında önbelleğe alır ve bağlantıları havuzdan (pool) kullanır.
+Bellek kullanımı tablo büyüdükçe sabit kalır.
+
+Kullanım (notebook içinden):
+    from review_ingest import ReviewStore
+    store = ReviewStore()                     # PostgreSQL, ayarlar ortam değişkenlerinden
+    reviews, ratings = store.load("users")    # önbellek güncelse veritabanına gidilmez
+
+Test için yerel SQLite kullanılabilir:
+    store = ReviewStore(backend="sqlite", sqlite_path="reviews.db")
+"""
+
+import hashlib
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+# Varsayılan parça boyutu (satır)
+CHUNK_SIZE = 10_000
+
+# Eğitimde kullanılan sütunlar
+REVIEW_COLUMNS = ("review", "rating")
+
+# Parquet önbellek klasörü
+CACHE_DIR = ".review_cache"
+
+# Aynı bağlantı ayarlarıyla oluşturulan mağazalar aynı havuzu paylaşır
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+def postgres_params_from_env():
+    """PostgreSQL bağlantı ayarlarını ortam değişkenlerinden oku (PG* değişkenleri)"""
+    return {
+        "dbname": os.environ.get("PGDATABASE", "testdb"),
+        "user": os.environ.get("PGUSER", "postgres"),
+        "password": os.environ.get("PGPASSWORD", ""),
+        "host": os.environ.get("PGHOST", "localhost"),
+        "port": os.environ.get("PGPORT", "5432"),
+    }
+
+class _SQLitePool:
+    """psycopg2 havuzuyla aynı getconn/putconn arayüzüne sahip basit SQLite havuzu"""
+
+    def __init__(self, path, maxconn):
+        self.path = path
+        self._idle = queue.LifoQueue(maxsize=maxconn)
+
+    def getconn(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return sqlite3.connect(self.path, check_same_thread=False)
+
+    def putconn(self, conn):
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+def _quote_sqlite(identifier):
+    """SQLite tanımlayıcısını güvenli şekilde tırnakla"""
+    return '"' + identifier.replace('"', '""') + '"'
+
+class ReviewStore:
+    """Yorum tablosunu parça parça okuyan ve Parquet önbelleği tutan veri kaynağı"""
+
+    def __init__(self, backend="postgres", sqlite_path=None, minconn=1, maxconn=4, **pg_params):
+        if backend not in ("postgres", "sqlite"):
+            raise ValueError("backend 'postgres' veya 'sqlite' olmalıdır")
+        if backend == "sqlite" and not sqlite_path:
+            raise ValueError("SQLite için sqlite_path verilmelidir")
+
+        self.backend = backend
+        self.sqlite_path = sqlite_path
+        self.pg_params = pg_params or postgres_params_from_env()
+        self.pool = self._get_pool(minconn, maxconn)
+
+    def _get_pool(self, minconn, maxconn):
+        """Bu bağlantı ayarları için paylaşılan havuzu döndür (yoksa oluştur)"""
+        if self.backend == "sqlite":
+            key = ("sqlite", os.path.abspath(self.sqlite_path))
+        else:
+            key = ("postgres",) + tuple(sorted(self.pg_params.items()))
+
+        with _POOLS_LOCK:
+            if key not in _POOLS:
+                if self.backend == "sqlite":
+                    _POOLS[key] = _SQLitePool(self.sqlite_path, maxconn)
+                else:
+                    from psycopg2.pool import ThreadedConnectionPool
+                    _POOLS[key] = ThreadedConnectionPool(minconn, maxconn, **self.pg_params)
+            return _POOLS[key]
+
+    @contextmanager
+    def connection(self):
+        """Havuzdan bağlantı al, iş bitince havuza geri bırak"""
+        conn = self.pool.getconn()
+        try:
+            yield conn
+        finally:
+            if self.backend == "postgres":
+                # Açık kalan okuma transaction'ı havuza taşınmasın
+                conn.rollback()
+            self.pool.putconn(conn)
+
+    def _select_query(self, table, columns):
+        """Yalnızca istenen sütunları okuyan sorguyu oluştur"""
+        if self.backend == "sqlite":
+            cols = ", ".join(_quote_sqlite(c) for c in columns)
+            return f"SELECT {cols} FROM {_quote_sqlite(table)}"
+
+        from psycopg2 import sql
+        return sql.SQL("SELECT {} FROM {}").format(
+            sql.SQL(", ").join(sql.Identifier(c) for c in columns), sql.Identifier(table)
+        )
+
+    def snapshot_key(self, table="users", columns=REVIEW_COLUMNS):
+        """Tablonun içeriği değiştiğinde değişen kısa bir anahtar üret
+
+        PostgreSQL'de tablo istatistik sayaçları (eklenen/güncellenen/silinen
+        satır) ve dosya numarası (TRUNCATE sonrası değişir) kullanılır; tabloyu
+        taramaya gerek yoktur. SQLite'ta satır sayısı ve en büyük rowid kullanılır.
+        """
+        with self.connection() as conn:
+            cur = conn.cursor()
+            if self.backend == "sqlite":
+                cur.execute(f"SELECT COUNT(*), MAX(rowid) FROM {_quote_sqlite(table)}")
+            else:
+                cur.execute(
+                    "SELECT s.n_tup_ins, s.n_tup_upd, s.n_tup_del, c.relfilenode "
+                    "FROM pg_stat_user_tables s JOIN pg_class c ON c.oid = s.relid "
+                    "WHERE s.relname = %s",
+                    (table,)
+                )
+            state = cur.fetchone()
+            cur.close()
+
+        raw = repr((self.backend, table, tuple(columns), state)).encode("utf-8")
+        return hashlib.sha1(raw).hexdigest()[:16]
+
+    def iter_chunks(self, table="users", columns=REVIEW_COLUMNS, chunk_size=CHUNK_SIZE):
+        """Tabloyu sabit boyutlu parçalar halinde oku; her parça satır listesi olarak döner
+
+        PostgreSQL'de named (sunucu taraflı) cursor kullanılır, böylece istemci
+        aynı anda yalnızca bir parçayı bellekte tutar.
+        """
+        with self.connection() as conn:
+            if self.backend == "sqlite":
+                cur = conn.cursor()
+            else:
+                cur = conn.cursor(name=f"review_stream_{threading.get_ident()}")
+                cur.itersize = chunk_size
+
+            try:
+                cur.execute(self._select_query(table, columns))
+                while True:
+                    rows = cur.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                cur.close()
+
+    def cache_path(self, table="users", columns=REVIEW_COLUMNS, cache_dir=CACHE_DIR):
+        """Tablonun güncel anlık görüntüsüne karşılık gelen önbellek dosyasının yolu"""
+        return os.path.join(cache_dir, f"{table}_{self.snapshot_key(table, columns)}.parquet")
+
+    def build_cache(self, table="users", columns=REVIEW_COLUMNS, cache_dir=CACHE_DIR,
+                    chunk_size=CHUNK_SIZE):
+        """Önbellek güncel değilse tabloyu parça parça Parquet dosyasına yaz; yolu döndür"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        path = self.cache_path(table, columns, cache_dir)
+        if os.path.exists(path):
+            return path
+
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = path + ".tmp"
+        writer = None
+        try:
+            for rows in self.iter_chunks(table, columns, chunk_size):
+                batch = pa.table({
+                    col: pa.array([row[i] for row in rows]) for i, col in enumerate(columns)
+                })
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, batch.schema)
+                writer.write_table(batch)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        if writer is None:
+            # Boş tablo: yine de şemalı boş bir dosya yaz
+            pq.write_table(pa.table({col: pa.array([], pa.null()) for col in columns}), tmp_path)
+        os.replace(tmp_path, path)
+        return path
+
+    def iter_cached_chunks(self, table="users", columns=REVIEW_COLUMNS, cache_dir=CACHE_DIR,
+                           chunk_size=CHUNK_SIZE):
+        """Önbellekten (gerekirse oluşturarak) sütun parçalarını sözlük olarak oku"""
+        import pyarrow.parquet as pq
+
+        path = self.build_cache(table, columns, cache_dir, chunk_size)
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=list(columns)):
+            yield {col: batch.column(col).to_numpy(zero_copy_only=False) for col in columns}
+
+    def load(self, table="users", cache_dir=CACHE_DIR, chunk_size=CHUNK_SIZE):
+        """Eğitim için (reviews, ratings) dizilerini döndür (notebook'taki `.values` karşılığı)"""
+        import pyarrow.parquet as pq
+
+        path = self.build_cache(table, REVIEW_COLUMNS, cache_dir, chunk_size)
+        data = pq.read_table(path, columns=list(REVIEW_COLUMNS))
+        reviews = data.column("review").to_numpy(zero_copy_only=False)
+        ratings = np.asarray(data.column("rating").to_numpy(zero_copy_only=False))
+        return reviews, ratings
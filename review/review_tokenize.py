@@ -0,0 +1,217 @@
+"""
+Yorum Metinleri - Hızlı Toplu Tokenizasyon ve Doldurma (Padding)
+Keras `Tokenizer(num_words=10000, oov_token='<OOV>')` + `pad_sequences(maxlen=50,
+padding='post')` ile aynı sonucu üretir; ancak kelime sayımı parçalar halinde
+paralel yapılır ve yorumlar ara liste oluşturmadan doğrudan önceden ayrılmış
+int32 (N, 50) diziye kodlanır. Sözlük ve kodlanmış diziler diske kaydedilerek
+sonraki eğitimlerde yeniden kullanılır.
+
+Kullanım (notebook içinden):
+    from review_tokenize import build_vocabulary, encode_texts, save_tokenized
+    vocab = build_vocabulary(reviews)
+    X = encode_texts(reviews, vocab)
+    save_tokenized("tokenized", vocab, X, ratings)
+"""
+
+import json
+import os
+from collections import Counter
+
+import numpy as np
+from joblib import Parallel, delayed
+
+# Notebook'taki Tokenizer/pad_sequences ayarları
+NUM_WORDS = 10_000
+MAX_LEN = 50
+OOV_TOKEN = "<OOV>"
+
+# Keras Tokenizer'ın varsayılan olarak sildiği karakterler
+KERAS_FILTERS = '!"#$%&()*+,-./:;<=>?@[\\]^_`{|}~\t\n'
+
+# Paralel işlerde bir işe düşen yorum sayısı
+CHUNK_SIZE = 50_000
+
+# Tüm filtre karakterlerini boşluğa çeviren tablo
+_TRANSLATE_TABLE = str.maketrans({c: " " for c in KERAS_FILTERS})
+
+def split_words(text):
+    """Keras `text_to_word_sequence` ile aynı kurallarla metni kelimelere ayır"""
+    return [w for w in str(text).lower().translate(_TRANSLATE_TABLE).split(" ") if w]
+
+# Parça içinde yorumları ayıran işaret (filtrelerde yok, kelime olarak ayrılır)
+_SEPARATOR = "\x00"
+
+def _joined_words(texts):
+    """Parçadaki tüm yorumları tek seferde küçültüp filtreleyerek kelimelere ayır
+
+    Yorumlar arasına ayırıcı işaret konur; boş dizgiler (art arda boşluklar)
+    listede kalır ve çağıran tarafta atlanır.
+    """
+    texts = [str(text) for text in texts]
+    joined = f" {_SEPARATOR} ".join(texts)
+    if joined.count(_SEPARATOR) != len(texts) - 1:
+        # Yorumlardan biri ayırıcıyı içeriyor: yorum yorum ayır
+        return None
+    return joined.lower().translate(_TRANSLATE_TABLE).split(" ")
+
+def _count_chunk(texts):
+    """Bir parçadaki kelime sayılarını ilk görülme sırasını koruyarak say"""
+    words = _joined_words(texts)
+    if words is None:
+        counts = Counter()
+        for text in texts:
+            counts.update(split_words(text))
+        return counts
+
+    counts = Counter(words)
+    counts.pop("", None)
+    counts.pop(_SEPARATOR, None)
+    return counts
+
+def _chunks(texts, chunk_size):
+    """Yorumları ardışık parçalara böl"""
+    return [texts[start:start + chunk_size] for start in range(0, len(texts), chunk_size)]
+
+class Vocabulary:
+    """Keras Tokenizer'ın word_index'i ile aynı sıralamaya sahip kelime sözlüğü
+
+    0 doldurma için, 1 OOV için ayrılmıştır; kelimeler frekansa göre 2'den
+    başlayarak numaralanır. Yalnızca indeksi num_words'ten küçük kelimeler
+    kodlamada kullanılır, diğerleri OOV olur.
+    """
+
+    def __init__(self, words, num_words=NUM_WORDS, oov_token=OOV_TOKEN):
+        self.words = list(words)
+        self.num_words = num_words
+        self.oov_token = oov_token
+        self.oov_index = 1
+        # Kodlamada kullanılan kelimeler (Keras: i < num_words)
+        used = self.words if num_words is None else self.words[:max(num_words - 2, 0)]
+        self.index = {w: i for i, w in enumerate(used, start=2)}
+
+    @property
+    def word_index(self):
+        """Keras Tokenizer.word_index ile aynı tam sözlük"""
+        word_index = {self.oov_token: self.oov_index}
+        word_index.update((w, i) for i, w in enumerate(self.words, start=2))
+        return word_index
+
+    def save(self, path):
+        """Sözlüğü JSON olarak kaydet"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"num_words": self.num_words, "oov_token": self.oov_token, "words": self.words},
+                f, ensure_ascii=False
+            )
+
+    @classmethod
+    def load(cls, path):
+        """Kaydedilmiş sözlüğü yükle"""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["words"], data["num_words"], data["oov_token"])
+
+def build_vocabulary(texts, num_words=NUM_WORDS, oov_token=OOV_TOKEN,
+                     n_jobs=None, chunk_size=CHUNK_SIZE):
+    """Kelime sayımını parçalar üzerinde paralel yapıp birleştirerek sözlük oluştur
+
+    Parçalar sırayla birleştirildiği için eşit frekanslı kelimelerin sırası
+    Keras'taki gibi ilk görülme sırasıdır.
+    """
+    texts = list(texts)
+    chunks = _chunks(texts, chunk_size)
+    if n_jobs is None:
+        n_jobs = min(len(chunks), os.cpu_count() or 1)
+
+    if n_jobs <= 1 or len(chunks) <= 1:
+        partial_counts = [_count_chunk(chunk) for chunk in chunks]
+    else:
+        partial_counts = Parallel(n_jobs=n_jobs)(delayed(_count_chunk)(chunk) for chunk in chunks)
+
+    counts = Counter()
+    for partial in partial_counts:
+        counts.update(partial)
+
+    # sorted kararlıdır: eşit sayılarda ilk görülme sırası korunur
+    words = [w for w, _ in sorted(counts.items(), key=lambda item: item[1], reverse=True)]
+    return Vocabulary(words, num_words, oov_token)
+
+class _EncodingTable(dict):
+    """Sözlükte olmayan kelimeler için OOV indeksini döndüren arama tablosu"""
+
+    def __init__(self, index, oov_index):
+        super().__init__(index)
+        self.oov_index = oov_index
+        self[""] = -2
+        self[_SEPARATOR] = -1
+
+    def __missing__(self, word):
+        return self.oov_index
+
+def _encode_chunk(texts, index, oov_index, maxlen):
+    """Bir parçayı (n, maxlen) int32 diziye kodla (padding='post', truncating='pre')"""
+    words = _joined_words(texts)
+    if words is None:
+        words = [w for text in texts for w in [_SEPARATOR] + split_words(text)][1:]
+
+    table = _EncodingTable(index, oov_index)
+    flat = np.fromiter(map(table.__getitem__, words), dtype=np.int32, count=len(words))
+    flat = flat[flat != -2]
+
+    # Ayırıcıların konumlarından her yorumun başlangıcı ve uzunluğu
+    bounds = np.concatenate([[-1], np.flatnonzero(flat == -1), [len(flat)]])
+    lengths = np.diff(bounds) - 1
+
+    out = np.zeros((len(texts), maxlen), dtype=np.int32)
+    kept = np.minimum(lengths, maxlen)
+    total = int(kept.sum())
+    if total == 0:
+        return out
+
+    # Uzun yorumlarda Keras gibi son maxlen kelime tutulur
+    starts = bounds[:-1] + 1 + (lengths - kept)
+    rows = np.repeat(np.arange(len(texts)), kept)
+    cols = np.arange(total) - np.repeat(np.cumsum(kept) - kept, kept)
+    out[rows, cols] = flat[np.repeat(starts, kept) + cols]
+    return out
+
+def encode_texts(texts, vocab, maxlen=MAX_LEN, n_jobs=None, chunk_size=CHUNK_SIZE, out=None):
+    """Yorumları doğrudan int32 (N, maxlen) diziye kodla
+
+    `out` verilirse (örneğin np.lib.format.open_memmap ile açılmış bir dosya)
+    sonuç bu diziye yazılır.
+    """
+    texts = list(texts)
+    chunks = _chunks(texts, chunk_size)
+    if out is None:
+        out = np.zeros((len(texts), maxlen), dtype=np.int32)
+    if n_jobs is None:
+        n_jobs = min(len(chunks), os.cpu_count() or 1)
+
+    args = (vocab.index, vocab.oov_index, maxlen)
+    if n_jobs <= 1 or len(chunks) <= 1:
+        encoded = (_encode_chunk(chunk, *args) for chunk in chunks)
+    else:
+        encoded = Parallel(n_jobs=n_jobs, return_as="generator")(
+            delayed(_encode_chunk)(chunk, *args) for chunk in chunks
+        )
+
+    for start, block in zip(range(0, len(texts), chunk_size), encoded):
+        out[start:start + len(block)] = block
+    return out
+
+def save_tokenized(directory, vocab, X, y=None):
+    """Sözlüğü ve kodlanmış dizileri klasöre kaydet"""
+    os.makedirs(directory, exist_ok=True)
+    vocab.save(os.path.join(directory, "vocab.json"))
+    np.save(os.path.join(directory, "sequences.npy"), X)
+    if y is not None:
+        np.save(os.path.join(directory, "ratings.npy"), np.asarray(y))
+
+def load_tokenized(directory, mmap_mode="r"):
+    """Kaydedilmiş sözlük ve dizileri yükle; diziler varsayılan olarak bellek eşlemeli açılır"""
+    vocab = Vocabulary.load(os.path.join(directory, "vocab.json"))
+    X = np.load(os.path.join(directory, "sequences.npy"), mmap_mode=mmap_mode)
+    ratings_path = os.path.join(directory, "ratings.npy")
+    y = np.load(ratings_path, mmap_mode=mmap_mode) if os.path.exists(ratings_path) else None
+    return vocab, X, y
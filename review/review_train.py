@@ -0,0 +1,176 @@
+"""
+Yorum Modeli - tf.data Eğitim Hattı (Bucketing + Checkpoint)
+Notebook'taki `model.fit(X_train_pad, y_train, epochs=3, batch_size=2)` yerine
+`review_tokenize` ile kaydedilmiş dizileri bellek eşlemeli dosyadan parça parça
+akıtır, her yorumu gerçek uzunluğuna kırpar ve benzer uzunluktaki yorumları aynı
+batch'e koyarak (bucketing) doldurma (padding) adımlarını en aza indirir.
+Batch boyutu ayarlanabilir; okuma paralel map ve prefetch ile eğitimle örtüşür.
+Eğitim her epoch sonunda yedeklenir, yarıda kalırsa kaldığı yerden devam eder.
+Yalnızca CPU üzerinde çalışacak şekilde ayarlanmıştır.
+
+Kullanım (notebook içinden):
+    from review_train import train
+    model, history = train("tokenized", epochs=3, batch_size=256)
+
+Komut satırından:
+    python review_train.py tokenized --epochs 3 --batch-size 256
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+from review_tokenize import MAX_LEN, NUM_WORDS, load_tokenized
+
+# Varsayılan batch boyutu (notebook'taki 2 yerine)
+BATCH_SIZE = 256
+
+# Uzunluk kovaları: [1-10], [11-20], [21-30], [31-40], [41-50] kelime
+BUCKET_BOUNDARIES = (11, 21, 31, 41)
+
+# Bellek eşlemeli dosyadan tek seferde okunan yorum sayısı
+READ_CHUNK = 8192
+
+# Eğitim verisini karıştırma tamponu (yorum)
+SHUFFLE_BUFFER = 16_384
+
+# Yedek ve en iyi ağırlıkların tutulduğu klasör
+CHECKPOINT_DIR = "review_checkpoints"
+
+def configure_cpu(intra_op_threads=None, inter_op_threads=None):
+    """TensorFlow'u yalnızca CPU kullanacak şekilde ayarla (ilk TF işleminden önce çağrılmalı)"""
+    import tensorflow as tf
+
+    tf.config.set_visible_devices([], "GPU")
+    if intra_op_threads:
+        tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+    if inter_op_threads:
+        tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+
+def train_test_indices(n, test_size=0.3, random_state=42):
+    """Notebook'taki train_test_split oranıyla tekrarlanabilir bölme
+
+    İndeksler sıralı döner; böylece parçalar dosyada ardışık bölgelerden okunur.
+    """
+    order = np.random.default_rng(random_state).permutation(n)
+    n_test = int(np.ceil(n * test_size))
+    return np.sort(order[n_test:]), np.sort(order[:n_test])
+
+def sequence_lengths(X):
+    """padding='post' ile doldurulmuş dizilerde yorumların gerçek uzunluğu
+
+    Kelime indeksleri 1'den başladığı için sıfır olmayan eleman sayısı uzunluğa eşittir.
+    """
+    return np.count_nonzero(X, axis=1).astype(np.int32)
+
+def make_dataset(X, y, indices, batch_size=BATCH_SIZE, bucket_boundaries=BUCKET_BOUNDARIES,
+                 shuffle=False, seed=42, read_chunk=READ_CHUNK):
+    """Seçilen yorumları uzunluğa göre kovalanmış batch'ler halinde akıtan tf.data hattı
+
+    X bellek eşlemeli (N, MAX_LEN) dizi olabilir; tamamı belleğe alınmaz.
+    """
+    import tensorflow as tf
+
+    indices = np.asarray(indices, dtype=np.int64)
+    maxlen = X.shape[1]
+    n_chunks = (len(indices) + read_chunk - 1) // read_chunk
+
+    def read(chunk_id):
+        idx = indices[chunk_id * read_chunk:(chunk_id + 1) * read_chunk]
+        block = np.asarray(X[idx], dtype=np.int32)
+        # Boş yorumlar da modele en az bir (doldurma) adımıyla girer
+        lengths = np.maximum(sequence_lengths(block), 1)
+        return block, np.asarray(y[idx], dtype=np.float32), lengths
+
+    def read_chunk_fn(chunk_id):
+        block, ratings, lengths = tf.numpy_function(
+            read, [chunk_id], (tf.int32, tf.float32, tf.int32), stateful=False
+        )
+        block.set_shape([None, maxlen])
+        ratings.set_shape([None])
+        lengths.set_shape([None])
+        return block, ratings, lengths
+
+    ds = tf.data.Dataset.range(n_chunks)
+    if shuffle:
+        ds = ds.shuffle(n_chunks, seed=seed, reshuffle_each_iteration=True)
+    ds = ds.map(read_chunk_fn, num_parallel_calls=tf.data.AUTOTUNE, deterministic=not shuffle)
+    ds = ds.unbatch()
+    if shuffle:
+        ds = ds.shuffle(SHUFFLE_BUFFER, seed=seed, reshuffle_each_iteration=True)
+
+    # Sondaki doldurmayı at; kova içinde yalnızca en uzun yoruma kadar doldurulur
+    ds = ds.map(lambda seq, rating, length: (seq[:length], rating),
+                num_parallel_calls=tf.data.AUTOTUNE, deterministic=not shuffle)
+    ds = ds.bucket_by_sequence_length(
+        element_length_func=lambda seq, rating: tf.shape(seq)[0],
+        bucket_boundaries=list(bucket_boundaries),
+        bucket_batch_sizes=[batch_size] * (len(bucket_boundaries) + 1),
+    )
+    return ds.prefetch(tf.data.AUTOTUNE)
+
+def build_model(num_words=NUM_WORDS, embedding_dim=64, lstm_units=64):
+    """Notebook'taki Embedding + Bidirectional(LSTM) modeli (değişken uzunluklu girişle)"""
+    import tensorflow as tf
+
+    model = tf.keras.Sequential([
+        tf.keras.layers.Input(shape=(None,), dtype="int32"),
+        tf.keras.layers.Embedding(input_dim=num_words, output_dim=embedding_dim),
+        tf.keras.layers.Bidirectional(tf.keras.layers.LSTM(lstm_units)),
+        tf.keras.layers.Dense(32, activation="relu"),
+        tf.keras.layers.Dropout(0.4),
+        tf.keras.layers.Dense(1, activation="linear"),
+    ])
+    model.compile(loss="mean_squared_error", metrics=["mae"], optimizer="adam")
+    return model
+
+def train(directory="tokenized", epochs=3, batch_size=BATCH_SIZE,
+          bucket_boundaries=BUCKET_BOUNDARIES, checkpoint_dir=CHECKPOINT_DIR,
+          test_size=0.3, random_state=42, intra_op_threads=None, inter_op_threads=None):
+    """Kaydedilmiş dizilerle modeli eğit; yarıda kalan eğitim kaldığı epoch'tan devam eder
+
+    En iyi (en düşük val_loss) ağırlıklar `checkpoint_dir/best.weights.h5` dosyasına yazılır.
+    """
+    configure_cpu(intra_op_threads, inter_op_threads)
+    import tensorflow as tf
+
+    vocab, X, y = load_tokenized(directory)
+    if y is None:
+        raise ValueError(f"{directory} klasöründe ratings.npy bulunamadı")
+    if X.shape[1] != MAX_LEN:
+        print(f"Uyarı: diziler {X.shape[1]} uzunluğunda kaydedilmiş (beklenen {MAX_LEN})")
+
+    train_idx, test_idx = train_test_indices(len(X), test_size, random_state)
+    train_ds = make_dataset(X, y, train_idx, batch_size, bucket_boundaries,
+                            shuffle=True, seed=random_state)
+    val_ds = make_dataset(X, y, test_idx, batch_size, bucket_boundaries)
+
+    model = build_model(vocab.num_words or len(vocab.words) + 2)
+
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    callbacks = [
+        # Her epoch sonunda model + optimizer durumunu yedekler; yeniden
+        # çalıştırıldığında son tamamlanan epoch'tan devam eder
+        tf.keras.callbacks.BackupAndRestore(os.path.join(checkpoint_dir, "backup")),
+        tf.keras.callbacks.ModelCheckpoint(
+            os.path.join(checkpoint_dir, "best.weights.h5"),
+            monitor="val_loss", save_best_only=True, save_weights_only=True,
+        ),
+    ]
+
+    history = model.fit(train_ds, epochs=epochs, validation_data=val_ds, callbacks=callbacks)
+    return model, history
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Yorum modeli eğitimi (tf.data + bucketing, CPU)")
+    parser.add_argument("directory", nargs="?", default="tokenized",
+                        help="review_tokenize.save_tokenized ile kaydedilmiş klasör")
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--checkpoint-dir", default=CHECKPOINT_DIR)
+    parser.add_argument("--threads", type=int, default=None, help="intra-op thread sayısı")
+    args = parser.parse_args()
+
+    train(args.directory, epochs=args.epochs, batch_size=args.batch_size,
+          checkpoint_dir=args.checkpoint_dir, intra_op_threads=args.threads)